@@ -0,0 +1 @@
+"""Init benchmarks Module for Benchmarks Package."""
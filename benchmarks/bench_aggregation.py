@@ -0,0 +1,80 @@
+"""Micro-benchmark of the aggregation of transactions.
+
+Compare the loop of `group_mount_transactions` (before the aggregation
+engine) with the engine, in plain Python and with NumPy. The time to build
+the columns (`frame`) and to compute the groups (`kernel`) are measured
+apart, the kernel is what runs again over a cached frame.
+
+Run it from the root of the project:
+
+```bash
+python -m benchmarks.bench_aggregation
+```
+"""
+
+import random
+import timeit
+
+from src.analytics.aggregation import HAS_NUMPY, TransactionFrame
+
+ROWS = (10_000, 100_000)
+GROUP_BY = ("category", "type", "month")
+
+
+def fake_transactions(rows: int) -> list:
+    """Create transactions with a few categories and merchants."""
+    rng = random.Random(0)
+    categories = [f"category_{number}" for number in range(20)]
+    return [
+        {
+            "type": rng.choice(["INFLOW", "OUTFLOW"]),
+            "category": rng.choice(categories),
+            "merchant": {"name": f"merchant_{rng.randrange(2000)}"},
+            "account": {"id": f"account_{rng.randrange(5)}"},
+            "amount": round(rng.uniform(1, 5000), 2),
+            "value_date": f"20{rng.randrange(18, 24)}-"
+                          f"{rng.randrange(1, 13):02d}-01",
+        }
+        for _ in range(rows)
+    ]
+
+
+def dict_loop(transactions: list) -> dict:
+    """Sum by category/type/month with a loop over the dicts."""
+    grouped = {}
+    for transaction in transactions:
+        key = (
+            transaction.get("category"), transaction.get("type"),
+            transaction.get("value_date")[:7]
+        )
+        grouped[key] = grouped.get(key, 0) + transaction.get("amount", 0)
+    return grouped
+
+
+def best(statement, repeat: int = 5) -> float:
+    """Obtain the best time in ms of the statement."""
+    return min(timeit.repeat(statement, repeat=repeat, number=1)) * 1000
+
+
+def main() -> None:
+    """Print the time of each implementation and number of rows."""
+    backends = [False, True] if HAS_NUMPY else [False]
+    for rows in ROWS:
+        transactions = fake_transactions(rows)
+        print(f"rows={rows}")
+        print(f"  {'dict loop':>16}: {best(lambda: dict_loop(transactions)):8.2f} ms")  # noqa: E501
+        for use_numpy in backends:
+            name = "numpy" if use_numpy else "python"
+            frame = TransactionFrame.from_transactions(
+                transactions, GROUP_BY, use_numpy=use_numpy
+            )
+            build = best(lambda: TransactionFrame.from_transactions(
+                transactions, GROUP_BY, use_numpy=use_numpy
+            ))
+            kernel = best(lambda: frame.groups(GROUP_BY))
+            print(f"  {name + ' frame':>16}: {build:8.2f} ms")
+            print(f"  {name + ' kernel':>16}: {kernel:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
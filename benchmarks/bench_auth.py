@@ -0,0 +1,104 @@
+"""Benchmark of the requests per second of a protected endpoint.
+
+Send the same token to `/v1/auth/users/me` (decode the JWT and get the
+user) with and without the cache of verified tokens, through the ASGI app
+in process (no network). The user of the token is cached in both runs, so
+only the verification of the token changes. The time of a single
+`decode_access_token` is printed too.
+
+Run it from the root of the project, with the `.env` file. The user is
+registered in a temporary SQLite database in memory, not in the configured
+database:
+
+```bash
+python -m benchmarks.bench_auth
+```
+"""
+
+import time
+import timeit
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.core.auth import auth
+from src.core.cache import TTLCache
+from src.core.database import Base, get_session
+from src.main import app
+
+REQUESTS = 2000
+
+
+def temporary_engine():
+    """Create a temporary database in memory, with all the tables."""
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool,
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def register(client: TestClient) -> str:
+    """Register a user for the benchmark and obtain its token."""
+    username = f"bench_{uuid.uuid4().hex[:12]}"
+    response = client.post(
+        "/v1/auth/register",
+        json={
+            "username": username, "password": "password",
+            "email": f"{username}@example.com",
+        }
+    )
+    return response.json()["access_token"]
+
+
+def requests_per_second(client: TestClient, token: str) -> float:
+    """Send the requests with the token and obtain the rate."""
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/v1/auth/users/me", headers=headers)
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        client.get("/v1/auth/users/me", headers=headers)
+    return REQUESTS / (time.perf_counter() - started)
+
+
+def main() -> None:
+    """Print the rate and the decode time with and without the cache."""
+    engine = temporary_engine()
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_temporary_session():
+        """Provide a session of the temporary database."""
+        db = session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_session] = get_temporary_session
+    cached = auth.token_cache
+    try:
+        client = TestClient(app)
+        token = register(client)
+        for name, cache in (("no cache", TTLCache(maxsize=0)),
+                            ("cache", cached)):
+            auth.token_cache = cache
+            rate = requests_per_second(client, token)
+            decode = min(timeit.repeat(
+                lambda: auth.decode_access_token(token), repeat=5,
+                number=1000
+            ))
+            print(
+                f"{name:>8}: {rate:8.0f} req/s, "
+                f"decode {decode * 1000:6.2f} us"
+            )
+    finally:
+        auth.token_cache = cached
+        app.dependency_overrides.pop(get_session, None)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark of the memory (RSS) of a cached history of transactions.
+
+Compare a list of Belvo dicts (as decoded from the pages of the API) with
+the typed arrays of `TransactionColumns`. Each representation is built in
+a new process, and the growth of its resident memory (RSS) is measured.
+The time to aggregate each representation is printed too.
+
+Run it from the root of the project (Linux, the RSS is read from /proc):
+
+```bash
+python -m benchmarks.bench_columnar
+```
+"""
+
+import gc
+import json
+import multiprocessing
+import os
+import random
+import timeit
+
+from src.analytics.aggregation import aggregate
+from src.analytics.columnar import TransactionColumns
+
+ROWS = (10_000, 100_000)
+PAGE_SIZE = 1000
+GROUP_BY = ("category", "type", "month")
+
+
+def fake_page(number: int) -> bytes:
+    """Create a page of transactions with the shape of the Belvo API."""
+    rng = random.Random(number)
+    return json.dumps([
+        {
+            "id": f"{number:06d}-{index:04d}-4e6b-a2b2-9f0c3a7e1d5f",
+            "created_at": "2024-01-10T11:45:24.001Z",
+            "category": f"category_{rng.randrange(20)}",
+            "subcategory": None,
+            "merchant": {
+                "logo": None, "website": None,
+                "name": f"merchant_{rng.randrange(2000)}",
+            },
+            "type": rng.choice(["INFLOW", "OUTFLOW"]),
+            "amount": round(rng.uniform(1, 5000), 2),
+            "status": "PROCESSED",
+            "balance": round(rng.uniform(0, 90000), 2),
+            "currency": "MXN",
+            "reference": f"{rng.randrange(10 ** 8):08d}",
+            "value_date": f"20{rng.randrange(18, 24)}-"
+                          f"{rng.randrange(1, 13):02d}-01",
+            "description": "COMPRA EN TIENDA - TARJETA DE DEBITO",
+            "collected_at": "2024-01-10T11:45:23.123Z",
+            "observations": None,
+            "accounting_date": "2024-01-10T00:00:00",
+            "internal_identification": f"{rng.randrange(10 ** 6)}",
+            "account": {
+                "id": f"account_{rng.randrange(5)}",
+                "link": "30cb4806-6e00-48a4-91c9-ca55968576c8",
+                "institution": {"name": "erebor_mx_retail", "type": "bank"},
+                "category": "CHECKING_ACCOUNT", "type": "Cuentas de Cheques",
+                "currency": "MXN", "name": "Cuenta Perfiles",
+                "balance": {"current": 5874.13, "available": 5621.12},
+            },
+        }
+        for index in range(PAGE_SIZE)
+    ]).encode()
+
+
+def rss() -> int:
+    """Obtain the resident memory of the process, in bytes."""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure(kind: str, rows: int, queue) -> None:
+    """Build a representation of the rows and put its RSS growth."""
+    pages = [fake_page(number) for number in range(rows // PAGE_SIZE)]
+    gc.collect()
+    before = rss()
+
+    if kind == "dicts":
+        cached = []
+        for page in pages:
+            cached.extend(json.loads(page))
+        run = lambda: aggregate(cached, GROUP_BY)  # noqa: E731
+    else:
+        cached = TransactionColumns()
+        for page in pages:
+            cached.append(json.loads(page))
+        run = lambda: cached.aggregate(GROUP_BY)  # noqa: E731
+    gc.collect()
+
+    growth = rss() - before
+    elapsed = min(timeit.repeat(run, repeat=3, number=1)) * 1000
+    queue.put((growth, elapsed))
+
+
+def main() -> None:
+    """Print the RSS and aggregation time of each representation."""
+    context = multiprocessing.get_context("spawn")
+    for rows in ROWS:
+        print(f"rows={rows}")
+        for kind in ("dicts", "columns"):
+            queue = context.Queue()
+            process = context.Process(
+                target=measure, args=(kind, rows, queue)
+            )
+            process.start()
+            growth, elapsed = queue.get()
+            process.join()
+            print(
+                f"  {kind:>8}: {growth / 2 ** 20:8.1f} MiB "
+                f"({growth / rows:7.0f} B/row), "
+                f"aggregate {elapsed:8.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
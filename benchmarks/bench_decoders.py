@@ -0,0 +1,96 @@
+"""Micro-benchmark of the JSON decoders for the Belvo pages.
+
+Decode pages of transactions, like the ones returned by Belvo, with every
+decoder installed and print the time per page.
+
+Run it from the root of the project:
+
+```bash
+python -m benchmarks.bench_decoders
+```
+"""
+
+import json
+import random
+import timeit
+
+from src.belvo.decoders import get_decoder
+
+# Sizes of the pages, the default of Belvo and the max `page_size`
+PAGE_SIZES = (100, 1000)
+DECODERS = ("json", "orjson")
+
+
+def fake_transaction(number: int) -> dict:
+    """Create a transaction with the fields (and nesting) of Belvo."""
+    return {
+        "id": f"{number:08d}-7a2c-4f7e-9d2b-6b1f0c5a8e31",
+        "account": {
+            "id": "0d3ffb69-f83b-456e-ad8e-208d0998d71d",
+            "link": "30cb4806-6e00-48a4-91c9-ca55968576c8",
+            "institution": {"name": "erebor_mx_retail", "type": "bank"},
+            "category": "CHECKING_ACCOUNT",
+            "type": "Cuentas de efectivo",
+            "name": "Cuenta Perfiles- M.N. - MXN-666",
+            "number": "4057068115181",
+            "balance": {"current": 5874.13, "available": 5621.52},
+            "currency": "MXN",
+        },
+        "collected_at": "2024-01-10T11:45:23.654Z",
+        "created_at": "2024-01-10T11:45:24.001Z",
+        "value_date": "2024-01-09",
+        "accounting_date": "2024-01-09T00:00:00",
+        "amount": round(random.uniform(1, 5000), 2),
+        "balance": round(random.uniform(0, 20000), 2),
+        "currency": "MXN",
+        "description": "CARGO POR COMPRA EN TIENDA DE CONVENIENCIA",
+        "observations": None,
+        "merchant": {
+            "logo": None, "website": None, "name": "Oxxo",
+        },
+        "category": random.choice(
+            ["Food & Groceries", "Transport & Travel", "Income & Payments"]
+        ),
+        "subcategory": None,
+        "reference": "8703",
+        "type": random.choice(["INFLOW", "OUTFLOW"]),
+        "status": "PROCESSED",
+        "internal_identification": "12348765",
+        "credit_card_data": None,
+    }
+
+
+def fake_page(size: int) -> bytes:
+    """Create the body of a page of transactions."""
+    return json.dumps({
+        "count": size * 10,
+        "next": "https://sandbox.belvo.com/api/transactions/?page=2",
+        "previous": None,
+        "results": [fake_transaction(number) for number in range(size)],
+    }).encode()
+
+
+def main(repeat: int = 5, number: int = 20) -> None:
+    """Print the best time per page of each decoder and page size."""
+    for size in PAGE_SIZES:
+        body = fake_page(size)
+        print(f"page_size={size} ({len(body) / 1024:.0f} KiB)")
+        baseline = None
+        for name in DECODERS:
+            try:
+                decoder = get_decoder(name)
+            except ImportError:
+                print(f"  {name:>7}: not installed")
+                continue
+            best = min(timeit.repeat(
+                lambda: decoder(body), repeat=repeat, number=number
+            )) / number
+            baseline = baseline or best
+            print(
+                f"  {name:>7}: {best * 1000:8.3f} ms/page"
+                f"  x{baseline / best:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark of the exact sums of money by category and currency.
+
+Compare the float sums of a loop over the dicts, the exact sums with
+`Decimal`, and the exact sums of integer minor units, in plain Python and
+with NumPy. For the minor units, the conversion of the dicts to a frame
+(`convert`), the sums over the frame (`kernel`) and both (`total`, what a
+query over the dicts pays, e.g. `money_aggregate`) are printed. The kernel
+alone is the cost of a query only when the frame is reused. The exact
+local queries of a link reuse the minor units kept in its cached columns:
+`columns` is what each of them pays (select the rows and sum them), the
+conversion (`columns build`) is paid once per cached link. The error of
+the float sums is printed too.
+
+Run it from the root of the project:
+
+```bash
+python -m benchmarks.bench_money
+```
+"""
+
+import random
+import timeit
+from decimal import Decimal
+
+from src.analytics.aggregation import HAS_NUMPY
+from src.analytics.columnar import TransactionColumns
+from src.analytics.money import MoneyAggregator, minor_unit_frame
+
+ROWS = (10_000, 100_000)
+GROUP_BY = ("category", "currency")
+
+
+def fake_transactions(rows: int) -> list:
+    """Create transactions with cents, in a few categories and currencies."""
+    rng = random.Random(0)
+    categories = [f"category_{number}" for number in range(20)]
+    return [
+        {
+            "category": rng.choice(categories),
+            "currency": rng.choice(["MXN", "BRL", "COP"]),
+            "amount": round(rng.uniform(0.01, 5000), 2),
+        }
+        for _ in range(rows)
+    ]
+
+
+def float_loop(transactions: list) -> dict:
+    """Sum the float amounts by category/currency with a loop."""
+    grouped = {}
+    for transaction in transactions:
+        key = (transaction["category"], transaction["currency"])
+        grouped[key] = grouped.get(key, 0) + transaction["amount"]
+    return grouped
+
+
+def decimal_loop(transactions: list) -> dict:
+    """Sum the `Decimal` amounts by category/currency with a loop."""
+    grouped = {}
+    for transaction in transactions:
+        key = (transaction["category"], transaction["currency"])
+        grouped[key] = grouped.get(key, 0) + \
+            Decimal(str(transaction["amount"]))
+    return grouped
+
+
+def best(statement, repeat: int = 5) -> float:
+    """Obtain the best time in ms of the statement."""
+    return min(timeit.repeat(statement, repeat=repeat, number=1)) * 1000
+
+
+def main() -> None:
+    """Print the time of each implementation and the float error."""
+    backends = [False, True] if HAS_NUMPY else [False]
+    for rows in ROWS:
+        transactions = fake_transactions(rows)
+        exact = decimal_loop(transactions)
+        error = max(
+            abs(Decimal(total) - exact[key])
+            for key, total in float_loop(transactions).items()
+        )
+        print(f"rows={rows} (max float error {error:.2E})")
+        print(f"  {'float loop':>19}: {best(lambda: float_loop(transactions)):8.2f} ms")  # noqa: E501
+        print(f"  {'decimal loop':>19}: {best(lambda: decimal_loop(transactions)):8.2f} ms")  # noqa: E501
+        for use_numpy in backends:
+            name = "numpy" if use_numpy else "python"
+            frame = minor_unit_frame(
+                transactions, GROUP_BY, use_numpy=use_numpy
+            )
+            build = best(lambda: minor_unit_frame(
+                transactions, GROUP_BY, use_numpy=use_numpy
+            ))
+            kernel = best(lambda: MoneyAggregator(
+                GROUP_BY, use_numpy=use_numpy
+            ).update_frame(frame).rows())
+            print(f"  {name + ' convert':>19}: {build:8.2f} ms")
+            print(f"  {name + ' kernel':>19}: {kernel:8.2f} ms")
+            print(f"  {name + ' total':>19}: {build + kernel:8.2f} ms")
+
+            columns = TransactionColumns(use_numpy=use_numpy).append(
+                transactions
+            )
+            cached = best(lambda: MoneyAggregator(
+                GROUP_BY, use_numpy=use_numpy
+            ).update_frame(columns.frame(GROUP_BY, exact=True)).rows())
+            append = best(lambda: TransactionColumns(
+                use_numpy=use_numpy
+            ).append(transactions), repeat=3)
+            print(f"  {name + ' columns build':>19}: {append:8.2f} ms")
+            print(f"  {name + ' columns':>19}: {cached:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
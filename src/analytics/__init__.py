@@ -0,0 +1,17 @@
+"""Init Module for Analytics Package.
+
+Aggregate the Belvo transactions (totals by category, merchant, etc.).
+"""
+
+from .aggregation import (  # noqa: F401
+    GROUP_KEYS, METRICS, Aggregator, TransactionFrame, aggregate, top_rows
+)
+from .cashflow import (  # noqa: F401
+    cashflow_aggregator, cashflow_summary, summarize_transactions
+)
+from .columnar import (  # noqa: F401
+    ColumnarCache, TransactionColumns
+)
+from .money import (  # noqa: F401
+    MoneyAggregator, from_minor_units, money_aggregate, to_minor_units
+)
@@ -0,0 +1,647 @@
+"""Module `aggregation` for aggregate the transactions by groups.
+
+The transactions are converted once to columns: the amounts, and a code
+for each value of the keys used to group or filter (dictionary encoding).
+The groups are computed over those columns with NumPy when it's installed
+(vectorized, near C speed on big histories) or with plain Python otherwise.
+
+The partial results of each group (sum, count, min and max) can be merged,
+so the transactions can be aggregated in chunks (e.g. page by page). A
+stream of transactions (like the generator of a Belvo list) is folded one
+chunk at a time, so the memory is bounded by a chunk plus what the stream
+buffers, not by the history. For a Belvo list that prefetches, it's
+`prefetch + 1` pages (3 for the transactions).
+"""
+
+import heapq
+from itertools import islice
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator,
+    List, Sequence, Tuple
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+HAS_NUMPY = np is not None
+
+# Partial results of a group: [sum, count, min, max]
+State = List[float]
+Groups = Dict[Tuple, State]
+
+
+def _date(transaction: Dict) -> str:
+    """Obtain the date (YYYY-MM-DD...) of the transaction."""
+    return (
+        transaction.get("value_date")
+        or transaction.get("accounting_date") or ""
+    )
+
+
+def _category(transaction: Dict) -> str:
+    """Obtain the category of the transaction."""
+    return transaction.get("category") or "Uncategorized"
+
+
+def _merchant(transaction: Dict) -> str:
+    """Obtain the name of the merchant of the transaction."""
+    merchant = transaction.get("merchant") or {}
+    if isinstance(merchant, dict):
+        merchant = merchant.get("name")
+    return merchant or "Unknown"
+
+
+def _account(transaction: Dict) -> str:
+    """Obtain the ID of the account of the transaction."""
+    account = transaction.get("account") or {}
+    if isinstance(account, dict):
+        account = account.get("id")
+    return account or "Unknown"
+
+
+def _type(transaction: Dict) -> str:
+    """Obtain the type (INFLOW or OUTFLOW) of the transaction."""
+    return transaction.get("type") or "Unknown"
+
+
+def _currency(transaction: Dict) -> str:
+    """Obtain the currency (ISO 4217 code) of the transaction."""
+    return transaction.get("currency") or "Unknown"
+
+
+def _day(transaction: Dict) -> str:
+    """Obtain the day (YYYY-MM-DD) of the transaction."""
+    return _date(transaction)[:10] or "Unknown"
+
+
+def _month(transaction: Dict) -> str:
+    """Obtain the month (YYYY-MM) of the transaction."""
+    return _date(transaction)[:7] or "Unknown"
+
+
+# Keys to group or filter by, and how to obtain them from a transaction
+GROUP_KEYS: Dict[str, Callable[[Dict], Any]] = {
+    "category": _category,
+    "merchant": _merchant,
+    "account": _account,
+    "type": _type,
+    "currency": _currency,
+    "day": _day,
+    "month": _month,
+}
+METRICS = ("sum", "count", "mean", "min", "max")
+ORDERS = ("desc", "asc")
+
+
+def _check(group_by: Sequence[str], metrics: Sequence[str] = (),
+           filters: Dict[str, Iterable] = None) -> None:
+    """Validate the keys and metrics of an aggregation.
+
+    Raises:
+        ValueError: If a key or a metric is unknown.
+    """
+    for key in [*group_by, *(filters or {})]:
+        if key not in GROUP_KEYS:
+            raise ValueError(
+                f"Unknown key: {key}, use one of {', '.join(GROUP_KEYS)}."
+            )
+    for metric in metrics:
+        if metric not in METRICS:
+            raise ValueError(
+                f"Unknown metric: {metric}, use one of {', '.join(METRICS)}."
+            )
+
+
+# How to obtain each metric from the partial results of a group
+METRIC_VALUES: Dict[str, Callable[[State], float]] = {
+    "sum": lambda state: state[0],
+    "count": lambda state: state[1],
+    "mean": lambda state: state[0] / state[1] if state[1] else 0.0,
+    "min": lambda state: state[2],
+    "max": lambda state: state[3],
+}
+
+
+def top_items(items: Iterable, key: Callable, limit: int = None,
+              order: str = "desc") -> List:
+    """Select the first items ordered by a key.
+
+    With a limit, only the selected items are kept while the others are
+    seen (a heap of `limit` items), instead of sorting all of them.
+
+    Args:
+        items (Iterable): Items to select from.
+        key (Callable): Value to order each item.
+        limit (int, optional): Max items, None selects all of them.
+        order (str, optional): "desc" for the greatest first, or "asc".
+            Defaults to "desc".
+
+    Raises:
+        ValueError: If the order is unknown.
+
+    Returns:
+        List: The selected items, in order (the ties in order of
+            appearance).
+    """
+    if order not in ORDERS:
+        raise ValueError(
+            f"Unknown order: {order}, use one of {', '.join(ORDERS)}."
+        )
+    if limit is None:
+        return sorted(items, key=key, reverse=order == "desc")
+    select = heapq.nlargest if order == "desc" else heapq.nsmallest
+    return select(limit, items, key=key)
+
+
+def top_rows(rows: Iterable[Dict], metric: str = "sum", limit: int = None,
+             order: str = "desc") -> List[Dict]:
+    """Select the first rows ordered by a metric, see `top_items`.
+
+    Args:
+        rows (Iterable[Dict]): Rows with the metric, e.g. of `aggregate`.
+        metric (str, optional): Metric to order by. Defaults to "sum".
+        limit (int, optional): Max rows, None selects all of them.
+        order (str, optional): "desc" or "asc". Defaults to "desc".
+
+    Returns:
+        List[Dict]: The selected rows.
+    """
+    return top_items(rows, lambda row: row[metric], limit, order)
+
+
+def iter_chunks(items: Iterable, size: int) -> Iterator[List]:
+    """Split an iterable in lists of up to `size` items, lazily."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+async def aiter_chunks(items: AsyncIterable, size: int) -> AsyncIterator[List]:
+    """Split an async iterable in lists of up to `size` items, lazily."""
+    chunk = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def merge_groups(groups: Groups, other: Groups) -> Groups:
+    """Merge the partial results of `other` into `groups`.
+
+    Args:
+        groups (Groups): Partial results to update.
+        other (Groups): Partial results to add.
+
+    Returns:
+        Groups: The updated `groups`.
+    """
+    for key, (total, count, low, high) in other.items():
+        state = groups.get(key)
+        if state is None:
+            groups[key] = [total, count, low, high]
+            continue
+        state[0] += total
+        state[1] += count
+        state[2] = min(state[2], low)
+        state[3] = max(state[3], high)
+    return groups
+
+
+class TransactionFrame:
+    """Class `TransactionFrame` for the transactions as columns.
+
+    The amounts are floats, and each key is stored as integer codes plus
+    the list of its distinct values (`labels`). With NumPy the columns are
+    arrays, otherwise they are lists.
+    """
+
+    def __init__(self, amounts: Sequence[float],
+                 codes: Dict[str, Sequence[int]],
+                 labels: Dict[str, List], use_numpy: bool = HAS_NUMPY
+                 ) -> None:
+        """Initialize the frame with its columns.
+
+        Args:
+            amounts (Sequence[float]): Amount of each transaction.
+            codes (Dict[str, Sequence[int]]): Codes of each key.
+            labels (Dict[str, List]): Values of each key, by code.
+            use_numpy (bool, optional): Compute the groups with NumPy.
+                Defaults to True if it's installed.
+        """
+        self.use_numpy = use_numpy
+        self.amounts = amounts
+        self.codes = codes
+        self.labels = labels
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Dict],
+                          keys: Sequence[str] = tuple(GROUP_KEYS),
+                          use_numpy: bool = HAS_NUMPY
+                          ) -> "TransactionFrame":
+        """Create the frame from Belvo transactions, in a single pass.
+
+        Args:
+            transactions (Iterable[Dict]): Belvo transactions.
+            keys (Sequence[str], optional): Keys to extract, only these can
+                be used to group or filter. Defaults to all the keys.
+            use_numpy (bool, optional): Store the columns as NumPy arrays.
+                Defaults to True if it's installed.
+
+        Returns:
+            TransactionFrame: The columns of the transactions.
+        """
+        _check(keys)
+        transactions = list(transactions)
+        amounts = [
+            float(transaction.get("amount") or 0)
+            for transaction in transactions
+        ]
+        columns, labels = {}, {}
+        for key in keys:
+            index = {}
+            columns[key] = [
+                index.setdefault(value, len(index))
+                for value in map(GROUP_KEYS[key], transactions)
+            ]
+            labels[key] = list(index)
+
+        if use_numpy:
+            amounts = np.asarray(amounts, dtype=np.float64)
+            columns = {
+                key: np.asarray(column, dtype=np.int64)
+                for key, column in columns.items()
+            }
+        return cls(amounts, columns, labels, use_numpy=use_numpy)
+
+    def __len__(self) -> int:
+        """Obtain the number of transactions."""
+        return len(self.amounts)
+
+    def _allowed(self, filters: Dict[str, Iterable]) -> Dict[str, set]:
+        """Convert the allowed values of each filter to codes."""
+        allowed = {}
+        for key, values in filters.items():
+            values = set(values)
+            allowed[key] = {
+                code for code, label in enumerate(self.labels[key])
+                if label in values
+            }
+        return allowed
+
+    def groups(self, group_by: Sequence[str] = ("category",),
+               filters: Dict[str, Iterable] = None,
+               extremes: bool = True) -> Groups:
+        """Compute the partial results of each group.
+
+        Args:
+            group_by (Sequence[str], optional): Keys of the groups.
+                Defaults to ("category",).
+            filters (Dict[str, Iterable], optional): Allowed values of
+                some keys, the other transactions are ignored.
+            extremes (bool, optional): Compute the min and max. Defaults to
+                True, without them they are +inf and -inf.
+
+        Raises:
+            ValueError: If a key was not extracted in the frame.
+
+        Returns:
+            Groups: [sum, count, min, max] by the values of the keys, in
+                order of appearance.
+        """
+        for key in [*group_by, *(filters or {})]:
+            if key not in self.codes:
+                raise ValueError(f"The key {key} is not in the frame.")
+        allowed = self._allowed(filters or {})
+        if self.use_numpy:
+            return self._numpy_groups(group_by, allowed, extremes)
+        return self._python_groups(group_by, allowed, extremes)
+
+    def _python_groups(self, group_by: Sequence[str],
+                       allowed: Dict[str, set], extremes: bool) -> Groups:
+        """Compute the groups with a loop over the rows."""
+        columns = [self.codes[key] for key in group_by]
+        filters = [(self.codes[key], codes) for key, codes in allowed.items()]
+        groups = {}
+
+        for row, amount in enumerate(self.amounts):
+            if any(column[row] not in codes for column, codes in filters):
+                continue
+            key = tuple(column[row] for column in columns)
+            state = groups.get(key)
+            if state is None:
+                groups[key] = [amount, 1, amount, amount]
+                continue
+            state[0] += amount
+            state[1] += 1
+            if amount < state[2]:
+                state[2] = amount
+            elif amount > state[3]:
+                state[3] = amount
+
+        if not extremes:
+            for state in groups.values():
+                state[2], state[3] = float("inf"), float("-inf")
+        return {
+            self._decode(group_by, key): state
+            for key, state in groups.items()
+        }
+
+    def _numpy_groups(self, group_by: Sequence[str],
+                      allowed: Dict[str, set], extremes: bool) -> Groups:
+        """Compute the groups with vectorized NumPy kernels."""
+        mask = None
+        for key, codes in allowed.items():
+            selected = np.isin(self.codes[key], list(codes))
+            mask = selected if mask is None else mask & selected
+
+        def column(key: str) -> "np.ndarray":
+            """Obtain the codes of the key, only for the selected rows."""
+            return self.codes[key] if mask is None else self.codes[key][mask]
+
+        amounts = self.amounts if mask is None else self.amounts[mask]
+        if not len(amounts):
+            return {}
+
+        # Combine the codes of the keys in a single group id. While the
+        # ids are dense, the groups are computed with O(n) kernels indexed
+        # by the id, otherwise the ids are compressed (sorting them)
+        rows = len(amounts)
+        dense = max(2 * rows, 1 << 16)
+        ids = np.zeros(rows, dtype=np.int64)
+        size = 1
+        for key in [*group_by, None]:
+            cardinality = 1 if key is None else max(1, len(self.labels[key]))
+            if size * cardinality > dense:
+                _, ids = np.unique(ids, return_inverse=True)
+                ids = ids.ravel()
+                size = int(ids.max()) + 1
+            if key is not None:
+                ids = ids * cardinality + column(key)
+                size *= cardinality
+
+        counts = np.bincount(ids, minlength=size)
+        present = np.flatnonzero(counts)
+        counts = counts[present]
+        count = len(present)
+        sums = self._sums(ids, amounts, size)[present]
+        first = np.full(size, rows, dtype=np.int64)
+        np.minimum.at(first, ids, np.arange(rows, dtype=np.int64))
+        first = first[present]
+        if extremes:
+            if amounts.dtype.kind == "i":
+                limits = np.iinfo(amounts.dtype)
+                mins = np.full(size, limits.max, dtype=amounts.dtype)
+                maxs = np.full(size, limits.min, dtype=amounts.dtype)
+            else:
+                mins = np.full(size, np.inf)
+                maxs = np.full(size, -np.inf)
+            np.minimum.at(mins, ids, amounts)
+            np.maximum.at(maxs, ids, amounts)
+            mins, maxs = mins[present], maxs[present]
+        else:
+            mins = np.full(count, np.inf)
+            maxs = np.full(count, -np.inf)
+
+        # Sort the groups by appearance and decode the values of the keys
+        order = np.argsort(first)
+        first = first[order]
+        keys = zip(*(
+            [self.labels[key][code] for code in column(key)[first].tolist()]
+            for key in group_by
+        )) if group_by else [()] * count
+        states = zip(
+            sums[order].tolist(), counts[order].tolist(),
+            mins[order].tolist(), maxs[order].tolist()
+        )
+        return {key: list(state) for key, state in zip(keys, states)}
+
+    @staticmethod
+    def _sums(ids: "np.ndarray", amounts: "np.ndarray",
+              size: int) -> "np.ndarray":
+        """Sum the amounts of each group id.
+
+        The integer amounts (e.g. minor units) are summed exactly: with
+        `bincount` while any sum fits in the 53 bits of a float64, which
+        is exact for integers, otherwise accumulating in int64.
+        """
+        if amounts.dtype.kind != "i":
+            return np.bincount(ids, weights=amounts, minlength=size)
+        if int(np.abs(amounts).sum(dtype=np.uint64)) < 1 << 53:
+            return np.bincount(
+                ids, weights=amounts, minlength=size
+            ).astype(np.int64)
+        sums = np.zeros(size, dtype=np.int64)
+        np.add.at(sums, ids, amounts)
+        return sums
+
+    def _decode(self, group_by: Sequence[str], codes: Tuple) -> Tuple:
+        """Convert the codes of a group to the values of its keys."""
+        return tuple(
+            self.labels[key][code] for key, code in zip(group_by, codes)
+        )
+
+
+class Aggregator:
+    """Class `Aggregator` for aggregate transactions in one or more chunks.
+
+    For example, aggregate the pages of a list one by one:
+
+    ```python
+        aggregator = Aggregator(["category", "type"], ["sum", "count"])
+        for page in pages:
+            aggregator.update(page["results"])
+        rows = aggregator.rows()
+    ```
+    """
+
+    def __init__(self, group_by: Sequence[str] = ("category",),
+                 metrics: Sequence[str] = ("sum",),
+                 filters: Dict[str, Iterable] = None,
+                 use_numpy: bool = HAS_NUMPY) -> None:
+        """Initialize the aggregator without transactions.
+
+        Args:
+            group_by (Sequence[str], optional): Keys of the groups, any of
+                `GROUP_KEYS`. Defaults to ("category",).
+            metrics (Sequence[str], optional): Any of `METRICS`.
+                Defaults to ("sum",).
+            filters (Dict[str, Iterable], optional): Allowed values of some
+                keys, e.g. {"type": ["OUTFLOW"]}.
+            use_numpy (bool, optional): Compute with NumPy. Defaults to True
+                if it's installed.
+
+        Raises:
+            ValueError: If a key or a metric is unknown.
+        """
+        _check(group_by, metrics, filters)
+        self.group_by = tuple(group_by)
+        self.metrics = tuple(metrics)
+        self.filters = {
+            key: list(values) for key, values in (filters or {}).items()
+        }
+        self.use_numpy = use_numpy
+        self.groups: Groups = {}
+
+    @property
+    def _keys(self) -> List[str]:
+        """Obtain the keys to extract from the transactions."""
+        return list(dict.fromkeys([*self.group_by, *self.filters]))
+
+    def update(self, transactions: Iterable[Dict]) -> "Aggregator":
+        """Add a chunk of transactions to the groups.
+
+        Args:
+            transactions (Iterable[Dict]): Belvo transactions.
+
+        Returns:
+            Aggregator: The same aggregator, to chain calls.
+        """
+        frame = TransactionFrame.from_transactions(
+            transactions, self._keys, use_numpy=self.use_numpy
+        )
+        return self.update_frame(frame)
+
+    def update_stream(self, transactions: Iterable[Dict],
+                      chunk_size: int = 1000) -> "Aggregator":
+        """Fold a stream of transactions into the groups, chunk by chunk.
+
+        Only a chunk of transactions is kept in memory at once, so a
+        generator (e.g. of a Belvo list) is never fully materialized. The
+        pages that the generator fetches ahead are in memory too, so with
+        the prefetch of a Belvo list the bound is `prefetch + 1` pages.
+
+        Args:
+            transactions (Iterable[Dict]): Belvo transactions.
+            chunk_size (int, optional): Transactions aggregated at once, use
+                the page size of the list. Defaults to 1000.
+
+        Returns:
+            Aggregator: The same aggregator, to chain calls.
+        """
+        for chunk in iter_chunks(transactions, chunk_size):
+            self.update(chunk)
+        return self
+
+    async def aupdate_stream(self, transactions: AsyncIterable[Dict],
+                             chunk_size: int = 1000) -> "Aggregator":
+        """Fold an async stream of transactions, like `update_stream`.
+
+        Args:
+            transactions (AsyncIterable[Dict]): Belvo transactions, e.g.
+                the async generator of `AsyncTransactions.list`.
+            chunk_size (int, optional): Transactions aggregated at once, use
+                the page size of the list. Defaults to 1000.
+
+        Returns:
+            Aggregator: The same aggregator, to chain calls.
+        """
+        async for chunk in aiter_chunks(transactions, chunk_size):
+            self.update(chunk)
+        return self
+
+    def update_frame(self, frame: TransactionFrame) -> "Aggregator":
+        """Add the transactions of a frame to the groups.
+
+        Args:
+            frame (TransactionFrame): Columns of the transactions, with the
+                keys used by the aggregator.
+
+        Returns:
+            Aggregator: The same aggregator, to chain calls.
+        """
+        extremes = "min" in self.metrics or "max" in self.metrics
+        merge_groups(self.groups, frame.groups(
+            self.group_by, self.filters, extremes=extremes
+        ))
+        return self
+
+    def merge(self, other: "Aggregator") -> "Aggregator":
+        """Add the groups of another aggregator with the same keys.
+
+        Args:
+            other (Aggregator): Aggregator of other transactions.
+
+        Returns:
+            Aggregator: The same aggregator, to chain calls.
+        """
+        merge_groups(self.groups, other.groups)
+        return self
+
+    def rows(self) -> List[Dict]:
+        """Obtain the metrics of each group.
+
+        Returns:
+            List[Dict]: A row for each group, with the value of each key
+                and each metric, e.g. {"category": "Food", "sum": 10.0}.
+        """
+        return [self._row(key, state) for key, state in self.groups.items()]
+
+    def top(self, limit: int = None, metric: str = None,
+            order: str = "desc") -> List[Dict]:
+        """Obtain the rows of the first groups ordered by a metric.
+
+        The groups are selected with a heap before building their rows,
+        so only `limit` rows are built.
+
+        Args:
+            limit (int, optional): Max rows, None selects all of them.
+            metric (str, optional): Metric to order by, any of `METRICS`.
+                Defaults to the first metric of the aggregator.
+            order (str, optional): "desc" for the greatest first, or "asc".
+                Defaults to "desc".
+
+        Raises:
+            ValueError: If the metric or the order is unknown.
+
+        Returns:
+            List[Dict]: The rows, see `rows`.
+        """
+        metric = metric or self.metrics[0]
+        _check((), [metric])
+        value = METRIC_VALUES[metric]
+        groups = top_items(
+            self.groups.items(), lambda group: value(group[1]), limit, order
+        )
+        return [self._row(key, state) for key, state in groups]
+
+    def _row(self, key: Tuple, state: State) -> Dict:
+        """Build the row of a group, with its keys and metrics."""
+        metrics = {
+            metric: METRIC_VALUES[metric](state) for metric in self.metrics
+        }
+        return {**dict(zip(self.group_by, key)), **metrics}
+
+
+def aggregate(transactions: Iterable[Dict],
+              group_by: Sequence[str] = ("category",),
+              metrics: Sequence[str] = ("sum",),
+              filters: Dict[str, Iterable] = None,
+              use_numpy: bool = HAS_NUMPY) -> List[Dict]:
+    """Aggregate the transactions by groups.
+
+    Args:
+        transactions (Iterable[Dict]): Belvo transactions.
+        group_by (Sequence[str], optional): Keys of the groups, any of
+            `GROUP_KEYS`. Defaults to ("category",).
+        metrics (Sequence[str], optional): Any of `METRICS`.
+            Defaults to ("sum",).
+        filters (Dict[str, Iterable], optional): Allowed values of some
+            keys, e.g. {"type": ["OUTFLOW"]}.
+        use_numpy (bool, optional): Compute with NumPy. Defaults to True if
+            it's installed.
+
+    Raises:
+        ValueError: If a key or a metric is unknown.
+
+    Returns:
+        List[Dict]: A row for each group, see `Aggregator.rows`.
+    """
+    return Aggregator(
+        group_by, metrics, filters, use_numpy=use_numpy
+    ).update(transactions).rows()
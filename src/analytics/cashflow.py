@@ -0,0 +1,68 @@
+"""Module `cashflow` for summarize the incomes and outcomes by category.
+
+The amounts are summed exactly by currency (`MoneyAggregator`), the
+amounts of different currencies are never added.
+"""
+
+from typing import Dict, Iterable
+
+from src.analytics.money import MoneyAggregator
+
+
+def cashflow_aggregator(**kwargs) -> MoneyAggregator:
+    """Create the aggregator needed by `cashflow_summary`.
+
+    Args:
+        **kwargs: Other arguments for the `MoneyAggregator` (e.g. filters).
+
+    Returns:
+        MoneyAggregator: Exact sum of the amounts by category, type and
+            currency.
+    """
+    return MoneyAggregator(["category", "type"], ["sum"], **kwargs)
+
+
+def cashflow_summary(rows: Iterable[Dict]) -> Dict[str, Dict]:
+    """Summarize the INFLOW, OUTFLOW and net of each category by currency.
+
+    Args:
+        rows (Iterable[Dict]): Sum by category, type and currency, e.g. the
+            rows of an aggregator created with `cashflow_aggregator`.
+
+    Returns:
+        Dict[str, Dict]: For each currency, `by_category` with the INFLOW,
+            OUTFLOW and net (INFLOW - OUTFLOW) of each category, and the
+            `totals`.
+    """
+    summaries: Dict[str, Dict] = {}
+
+    for row in rows:
+        if row["type"] not in ("INFLOW", "OUTFLOW"):
+            continue
+        summary = summaries.setdefault(row["currency"], {
+            "by_category": {}, "totals": {"INFLOW": 0, "OUTFLOW": 0}
+        })
+        category = summary["by_category"].setdefault(
+            row["category"], {"INFLOW": 0, "OUTFLOW": 0}
+        )
+        category[row["type"]] += row["sum"]
+        summary["totals"][row["type"]] += row["sum"]
+
+    for summary in summaries.values():
+        for totals in [*summary["by_category"].values(), summary["totals"]]:
+            totals["net"] = totals["INFLOW"] - totals["OUTFLOW"]
+    return summaries
+
+
+def summarize_transactions(transactions: Iterable[Dict]) -> Dict[str, Dict]:
+    """Summarize the cashflow of the transactions, in a single pass.
+
+    Args:
+        transactions (Iterable[Dict]): Belvo transactions.
+
+    Returns:
+        Dict[str, Dict]: See `cashflow_summary`.
+    """
+    return cashflow_summary(
+        cashflow_aggregator().update(transactions).rows()
+    )
@@ -0,0 +1,401 @@
+"""Module `columnar` for keep the transactions of a link as typed arrays.
+
+A Belvo transaction as a dict costs around 1-2 KB in memory. The columns
+keep only what is aggregated, in compact typed arrays: the amount (float64),
+the amount in minor units of its currency (int64, for the exact sums), the
+value date (int64, days since the epoch) and a code (int32) for the
+category, merchant, type, account and currency (dictionary encoding). So
+a cached history costs a few bytes per transaction, and the amounts are
+converted to minor units once, not on each exact query.
+
+The arrays are filtered with NumPy views of the same memory when it's
+installed, and the selected rows are copied to a frame to group them with
+the kernels of `aggregation`, so the columns can grow while it's used.
+"""
+
+from array import array
+from datetime import date
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence
+
+from src.analytics.aggregation import (
+    GROUP_KEYS, HAS_NUMPY, Aggregator, Groups, TransactionFrame, _check,
+    _date, aiter_chunks, iter_chunks, np
+)
+from src.analytics.money import currency_digits
+from src.core.cache import TTLCache
+
+
+# Keys stored as codes, the day and the month are derived from the dates
+ENCODED_KEYS = ("category", "merchant", "type", "account", "currency")
+
+# Epoch of the dates, and the value of the transactions without date
+EPOCH = date(1970, 1, 1).toordinal()
+NO_DATE = -(1 << 63)
+
+
+def epoch_day(value: Optional[str]) -> int:
+    """Convert the date (YYYY-MM-DD...) of a transaction to epoch days.
+
+    Args:
+        value (Optional[str]): Date of the transaction.
+
+    Returns:
+        int: Days since 1970-01-01, or `NO_DATE` if it's missing/invalid.
+    """
+    try:
+        return date.fromisoformat(value[:10]).toordinal() - EPOCH
+    except (TypeError, ValueError):
+        return NO_DATE
+
+
+class TransactionColumns:
+    """Class `TransactionColumns` for the transactions as typed arrays.
+
+    The transactions are appended in chunks (e.g. page by page), the
+    arrays grow without copying the Belvo dicts.
+    """
+
+    def __init__(self, use_numpy: bool = HAS_NUMPY) -> None:
+        """Initialize the columns without transactions.
+
+        Args:
+            use_numpy (bool, optional): Filter and group with NumPy.
+                Defaults to True if it's installed.
+        """
+        self.use_numpy = use_numpy
+        self.amounts = array("d")
+        self.units = array("q")
+        self.days = array("q")
+        self.codes = {key: array("i") for key in ENCODED_KEYS}
+        self.labels: Dict[str, List[str]] = {
+            key: [] for key in ENCODED_KEYS
+        }
+        self._index: Dict[str, Dict[str, int]] = {
+            key: {} for key in ENCODED_KEYS
+        }
+
+    def __len__(self) -> int:
+        """Obtain the number of transactions."""
+        return len(self.amounts)
+
+    @property
+    def nbytes(self) -> int:
+        """Obtain the bytes of the arrays (without the labels)."""
+        arrays = [self.amounts, self.units, self.days, *self.codes.values()]
+        return sum(len(column) * column.itemsize for column in arrays)
+
+    def append(self, transactions: Iterable[Dict]) -> "TransactionColumns":
+        """Append a chunk of Belvo transactions to the columns.
+
+        Args:
+            transactions (Iterable[Dict]): Belvo transactions.
+
+        Returns:
+            TransactionColumns: The same columns, to chain calls.
+        """
+        transactions = list(transactions)
+        start = len(self)
+        self.amounts.extend(
+            float(transaction.get("amount") or 0)
+            for transaction in transactions
+        )
+        self.days.extend(
+            epoch_day(_date(transaction)) for transaction in transactions
+        )
+        for key in ENCODED_KEYS:
+            index, labels = self._index[key], self.labels[key]
+            codes = self.codes[key]
+            for value in map(GROUP_KEYS[key], transactions):
+                code = index.get(value)
+                if code is None:
+                    code = index[value] = len(labels)
+                    labels.append(value)
+                codes.append(code)
+
+        # Scaled once here, the exact queries sum these integers
+        scales = [
+            10 ** currency_digits(currency)
+            for currency in self.labels["currency"]
+        ]
+        self.units.extend(
+            round(amount * scales[code]) for amount, code in zip(
+                self.amounts[start:], self.codes["currency"][start:]
+            )
+        )
+        return self
+
+    def select(self, filters: Dict[str, Iterable] = None,
+               date_from: date = None, date_to: date = None):
+        """Select the rows that match the filters.
+
+        Args:
+            filters (Dict[str, Iterable], optional): Allowed values of some
+                of the `ENCODED_KEYS`, e.g. {"type": ["OUTFLOW"]}.
+            date_from (date, optional): Only since this value date.
+            date_to (date, optional): Only until this value date (included).
+
+        Raises:
+            ValueError: If a key of the filters is not encoded.
+
+        Returns:
+            Selected rows: a NumPy bool mask or a list of row numbers, None
+                when all the rows are selected.
+        """
+        allowed = self._allowed(filters or {})
+        first = None if date_from is None else date_from.toordinal() - EPOCH
+        last = None if date_to is None else date_to.toordinal() - EPOCH
+        if not allowed and first is None and last is None:
+            return None
+
+        if self.use_numpy:
+            mask = np.ones(len(self), dtype=bool)
+            for key, codes in allowed.items():
+                mask &= np.isin(self._view(self.codes[key]), list(codes))
+            days = self._view(self.days)
+            if first is not None:
+                mask &= days >= first
+            if last is not None:
+                # The transactions without date are never in a range
+                mask &= (days <= last) & (days != NO_DATE)
+            return mask
+
+        rows = range(len(self))
+        for key, codes in allowed.items():
+            column = self.codes[key]
+            rows = [row for row in rows if column[row] in codes]
+        if first is not None:
+            rows = [row for row in rows if self.days[row] >= first]
+        if last is not None:
+            rows = [
+                row for row in rows
+                if self.days[row] <= last and self.days[row] != NO_DATE
+            ]
+        return list(rows)
+
+    def frame(self, keys: Sequence[str] = ("category",),
+              filters: Dict[str, Iterable] = None,
+              date_from: date = None, date_to: date = None,
+              exact: bool = False) -> TransactionFrame:
+        """Obtain a frame of the selected rows, to group them.
+
+        Args:
+            keys (Sequence[str], optional): Keys of the frame, any of
+                `GROUP_KEYS`. Defaults to ("category",).
+            filters (Dict[str, Iterable], optional): Allowed values of some
+                of the `ENCODED_KEYS`.
+            date_from (date, optional): Only since this value date.
+            date_to (date, optional): Only until this value date (included).
+            exact (bool, optional): The amounts are the integer minor units
+                (for a `MoneyAggregator`), the currency is always a key.
+                Defaults to False.
+
+        Raises:
+            ValueError: If a key is unknown.
+
+        Returns:
+            TransactionFrame: The columns of the selected rows.
+        """
+        if exact:
+            keys = list(dict.fromkeys([*keys, "currency"]))
+        _check(keys)
+        rows = self.select(filters, date_from, date_to)
+        amounts = self._take(self.units if exact else self.amounts, rows)
+        days = self._take(self.days, rows)
+        codes, labels = {}, {}
+        for key in keys:
+            if key in ENCODED_KEYS:
+                codes[key] = self._take(self.codes[key], rows)
+                labels[key] = self.labels[key]
+            else:
+                codes[key], labels[key] = self._dates(days, key)
+        return TransactionFrame(
+            amounts, codes, labels, use_numpy=self.use_numpy
+        )
+
+    def groups(self, group_by: Sequence[str] = ("category",),
+               filters: Dict[str, Iterable] = None,
+               date_from: date = None, date_to: date = None,
+               extremes: bool = True) -> Groups:
+        """Compute the partial results of each group of the selected rows.
+
+        Args:
+            group_by (Sequence[str], optional): Keys of the groups.
+                Defaults to ("category",).
+            filters (Dict[str, Iterable], optional): Allowed values of some
+                of the `ENCODED_KEYS`.
+            date_from (date, optional): Only since this value date.
+            date_to (date, optional): Only until this value date (included).
+            extremes (bool, optional): Compute the min and max. Defaults to
+                True.
+
+        Returns:
+            Groups: [sum, count, min, max] by the values of the keys.
+        """
+        frame = self.frame(group_by, filters, date_from, date_to)
+        return frame.groups(group_by, extremes=extremes)
+
+    def aggregate(self, group_by: Sequence[str] = ("category",),
+                  metrics: Sequence[str] = ("sum",),
+                  filters: Dict[str, Iterable] = None,
+                  date_from: date = None,
+                  date_to: date = None) -> List[Dict]:
+        """Aggregate the selected rows, like `aggregation.aggregate`.
+
+        Args:
+            group_by (Sequence[str], optional): Keys of the groups.
+                Defaults to ("category",).
+            metrics (Sequence[str], optional): Any of `METRICS`.
+                Defaults to ("sum",).
+            filters (Dict[str, Iterable], optional): Allowed values of some
+                of the `ENCODED_KEYS`.
+            date_from (date, optional): Only since this value date.
+            date_to (date, optional): Only until this value date (included).
+
+        Raises:
+            ValueError: If a key or a metric is unknown.
+
+        Returns:
+            List[Dict]: A row for each group, see `Aggregator.rows`.
+        """
+        aggregator = Aggregator(group_by, metrics, use_numpy=self.use_numpy)
+        return aggregator.update_frame(
+            self.frame(group_by, filters, date_from, date_to)
+        ).rows()
+
+    def _allowed(self, filters: Dict[str, Iterable]) -> Dict[str, set]:
+        """Convert the allowed values of each filter to codes."""
+        allowed = {}
+        for key, values in filters.items():
+            if key not in ENCODED_KEYS:
+                raise ValueError(f"Unknown filter: {key}")
+            index = self._index[key]
+            allowed[key] = {
+                index[value] for value in values if value in index
+            }
+        return allowed
+
+    def _view(self, column: array):
+        """Obtain a NumPy array over the memory of the column."""
+        return np.frombuffer(column, dtype=column.typecode)
+
+    def _take(self, column: array, rows):
+        """Obtain a copy of the values of the selected rows of a column.
+
+        All the rows are copied too: a view would lock the array (it
+        can't grow while a frame holds its buffer) and a frame would see
+        the rows appended after it.
+        """
+        if self.use_numpy:
+            view = self._view(column)
+            return view.copy() if rows is None else view[rows]
+        if rows is None:
+            return column[:]
+        return [column[row] for row in rows]
+
+    def _dates(self, days, key: str):
+        """Encode the days (or their months) of the selected rows.
+
+        Args:
+            days: Epoch days of the selected rows.
+            key (str): "day" or "month".
+
+        Returns:
+            Tuple: The codes of the rows and the labels of the codes.
+        """
+        width = 10 if key == "day" else 7
+        if self.use_numpy:
+            values, inverse = np.unique(days, return_inverse=True)
+            values = values.tolist()
+        else:
+            values = sorted(set(days))
+
+        index: Dict[str, int] = {}
+        lookup = [
+            index.setdefault(
+                "Unknown" if day == NO_DATE else
+                date.fromordinal(day + EPOCH).isoformat()[:width],
+                len(index)
+            )
+            for day in values
+        ]
+        if self.use_numpy:
+            codes = np.asarray(lookup, dtype=np.int64)[inverse.ravel()]
+        else:
+            codes_of_day = dict(zip(values, lookup))
+            codes = [codes_of_day[day] for day in days]
+        return codes, list(index)
+
+
+class ColumnarCache:
+    """Class `ColumnarCache` for keep the columns of the links in memory.
+
+    The columns of each link are kept for a limited time in a `TTLCache`.
+    The owner of the cache drops the columns of a link when its
+    transactions change, e.g. `sync_transactions` drops the ones of the
+    stored transactions (`services.analytics.columnar_cache`).
+    """
+
+    def __init__(self, cache: TTLCache = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            cache (TTLCache, optional): Where to keep the columns. Defaults
+                to a cache of 128 links for 10 minutes.
+        """
+        self.cache = cache if cache is not None else TTLCache(128, 600)
+
+    def get(self, link: Hashable) -> Optional[TransactionColumns]:
+        """Get the columns of the link, if they are cached."""
+        return self.cache.get(link)
+
+    def set(self, link: Hashable, columns: TransactionColumns) -> None:
+        """Save the columns of the link."""
+        self.cache.set(link, columns)
+
+    def invalidate(self, link: Hashable = None) -> int:
+        """Drop the columns of a link, or of all the links without it."""
+        return self.cache.invalidate(link)
+
+    def load(self, link: Hashable, transactions: Iterable[Dict],
+             chunk_size: int = 1000) -> TransactionColumns:
+        """Get the columns of the link, build them if they aren't cached.
+
+        Args:
+            link (Hashable): ID of the link.
+            transactions (Iterable[Dict]): Belvo transactions of the link,
+                only consumed (chunk by chunk) on a miss.
+            chunk_size (int, optional): Transactions appended at once.
+                Defaults to 1000.
+
+        Returns:
+            TransactionColumns: The columns of the link.
+        """
+        columns = self.get(link)
+        if columns is None:
+            columns = TransactionColumns()
+            for chunk in iter_chunks(transactions, chunk_size):
+                columns.append(chunk)
+            self.set(link, columns)
+        return columns
+
+    async def aload(self, link: Hashable, transactions,
+                    chunk_size: int = 1000) -> TransactionColumns:
+        """Get the columns of the link, like `load` with an async stream.
+
+        Args:
+            link (Hashable): ID of the link.
+            transactions (AsyncIterable[Dict]): Belvo transactions of the
+                link, e.g. the async generator of `AsyncTransactions.list`.
+            chunk_size (int, optional): Transactions appended at once.
+                Defaults to 1000.
+
+        Returns:
+            TransactionColumns: The columns of the link.
+        """
+        columns = self.get(link)
+        if columns is None:
+            columns = TransactionColumns()
+            async for chunk in aiter_chunks(transactions, chunk_size):
+                columns.append(chunk)
+            self.set(link, columns)
+        return columns
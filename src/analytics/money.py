@@ -0,0 +1,196 @@
+"""Module `money` for aggregate the amounts exactly, in minor units.
+
+The float sums drift on long histories (0.1 + 0.2 != 0.3), and `Decimal`
+is exact but slow. The amounts are converted to integers of minor units
+(e.g. cents) with the scale of their currency, and summed as integers
+(int64 with NumPy), which is exact. The groups always include the
+currency, the minor units of different currencies can't be added.
+
+The conversion from the dicts is the expensive part, so it's paid once:
+the cached columns of a link (`TransactionColumns.units`) keep the minor
+units, and each exact local query of the link only selects and sums them.
+With NumPy, that query is faster than a float loop over the dicts (~15x
+on 100k transactions) and than `Decimal`. A query that converts the
+dicts (`money_aggregate`, or the Belvo source) is faster than `Decimal`
+but ~3x slower than a float loop. Without NumPy, the exact sums over the
+cached columns are only about as fast as `Decimal`, and slower when they
+convert the dicts. See `benchmarks/bench_money.py`.
+"""
+
+from decimal import Decimal
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from src.analytics.aggregation import (
+    HAS_NUMPY, Aggregator, State, TransactionFrame, np
+)
+
+
+# Digits of the minor unit of the currencies (ISO 4217), others use 2
+CURRENCY_DIGITS = {
+    "BHD": 3, "CLF": 4, "CLP": 0, "ISK": 0, "JOD": 3, "JPY": 0, "KRW": 0,
+    "KWD": 3, "OMR": 3, "PYG": 0, "TND": 3, "UYI": 0, "VND": 0,
+}
+DEFAULT_DIGITS = 2
+
+
+def currency_digits(currency: str) -> int:
+    """Obtain the digits of the minor unit of a currency."""
+    return CURRENCY_DIGITS.get(currency, DEFAULT_DIGITS)
+
+
+def to_minor_units(amount, currency: str = None) -> int:
+    """Convert an amount to integer minor units of its currency.
+
+    Args:
+        amount (float | str | Decimal): Amount, e.g. 10.25.
+        currency (str, optional): ISO 4217 code, e.g. "MXN".
+
+    Returns:
+        int: The amount in minor units, e.g. 1025 (rounded half to even
+            if it has more digits than the currency).
+    """
+    scale = 10 ** currency_digits(currency)
+    if isinstance(amount, (str, Decimal)):
+        return int((Decimal(amount) * scale).to_integral_value())
+    return round(float(amount or 0) * scale)
+
+
+def from_minor_units(units: int, currency: str = None) -> Decimal:
+    """Convert integer minor units to the exact amount of the currency.
+
+    Args:
+        units (int): Amount in minor units, e.g. 1025.
+        currency (str, optional): ISO 4217 code, e.g. "MXN".
+
+    Returns:
+        Decimal: The amount, e.g. Decimal("10.25").
+    """
+    return Decimal(int(units)).scaleb(-currency_digits(currency))
+
+
+def minor_unit_frame(transactions: Iterable[Dict],
+                     keys: Sequence[str] = ("category",),
+                     use_numpy: bool = HAS_NUMPY) -> TransactionFrame:
+    """Create a frame whose amounts are integer minor units.
+
+    The amounts are scaled once, with the scale of the currency of each
+    transaction (vectorized with NumPy).
+
+    Args:
+        transactions (Iterable[Dict]): Belvo transactions.
+        keys (Sequence[str], optional): Keys to extract, the currency is
+            always extracted. Defaults to ("category",).
+        use_numpy (bool, optional): Store the columns as NumPy arrays.
+            Defaults to True if it's installed.
+
+    Returns:
+        TransactionFrame: The columns, with int amounts (int64 with NumPy).
+    """
+    keys = list(dict.fromkeys([*keys, "currency"]))
+    frame = TransactionFrame.from_transactions(
+        transactions, keys, use_numpy=use_numpy
+    )
+    scales = [
+        10 ** currency_digits(currency)
+        for currency in frame.labels["currency"]
+    ]
+    currencies = frame.codes["currency"]
+    if use_numpy:
+        scales = np.asarray(scales or [1], dtype=np.float64)
+        frame.amounts = np.rint(
+            frame.amounts * scales[currencies]
+        ).astype(np.int64)
+    else:
+        frame.amounts = [
+            round(amount * scales[code])
+            for amount, code in zip(frame.amounts, currencies)
+        ]
+    return frame
+
+
+class MoneyAggregator(Aggregator):
+    """Class `MoneyAggregator` for aggregate exact amounts by groups.
+
+    Like `Aggregator`, but the groups also include the currency, the sums
+    are integers of minor units, and the amounts of the rows are exact
+    `Decimal` values of each currency.
+    """
+
+    def __init__(self, group_by: Sequence[str] = ("category",),
+                 metrics: Sequence[str] = ("sum",),
+                 filters: Dict[str, Iterable] = None,
+                 use_numpy: bool = HAS_NUMPY) -> None:
+        """Initialize the aggregator, the currency is added to the groups.
+
+        Args:
+            group_by (Sequence[str], optional): Keys of the groups, any of
+                `GROUP_KEYS`. Defaults to ("category",).
+            metrics (Sequence[str], optional): Any of `METRICS`.
+                Defaults to ("sum",).
+            filters (Dict[str, Iterable], optional): Allowed values of some
+                keys, e.g. {"type": ["OUTFLOW"]}.
+            use_numpy (bool, optional): Compute with NumPy. Defaults to True
+                if it's installed.
+
+        Raises:
+            ValueError: If a key or a metric is unknown.
+        """
+        group_by = list(dict.fromkeys([*group_by, "currency"]))
+        super().__init__(group_by, metrics, filters, use_numpy=use_numpy)
+
+    def update(self, transactions: Iterable[Dict]) -> "MoneyAggregator":
+        """Add a chunk of transactions to the groups, in minor units.
+
+        Args:
+            transactions (Iterable[Dict]): Belvo transactions.
+
+        Returns:
+            MoneyAggregator: The same aggregator, to chain calls.
+        """
+        frame = minor_unit_frame(
+            transactions, self._keys, use_numpy=self.use_numpy
+        )
+        return self.update_frame(frame)
+
+    def _row(self, key: Tuple, state: State) -> Dict:
+        """Build the row of a group, with exact amounts of its currency."""
+        row = super()._row(key, state)
+        currency = row["currency"]
+        for metric in ("sum", "min", "max"):
+            if metric in row:
+                row[metric] = from_minor_units(row[metric], currency)
+        if "mean" in row:
+            row["mean"] = from_minor_units(state[0], currency) / state[1]
+        return row
+
+
+def money_aggregate(transactions: Iterable[Dict],
+                    group_by: Sequence[str] = ("category",),
+                    metrics: Sequence[str] = ("sum",),
+                    filters: Dict[str, Iterable] = None,
+                    use_numpy: bool = HAS_NUMPY) -> List[Dict]:
+    """Aggregate the transactions by groups and currency, exactly.
+
+    Args:
+        transactions (Iterable[Dict]): Belvo transactions.
+        group_by (Sequence[str], optional): Keys of the groups, any of
+            `GROUP_KEYS`, the currency is always added. Defaults to
+            ("category",).
+        metrics (Sequence[str], optional): Any of `METRICS`.
+            Defaults to ("sum",).
+        filters (Dict[str, Iterable], optional): Allowed values of some
+            keys, e.g. {"type": ["OUTFLOW"]}.
+        use_numpy (bool, optional): Compute with NumPy. Defaults to True if
+            it's installed.
+
+    Raises:
+        ValueError: If a key or a metric is unknown.
+
+    Returns:
+        List[Dict]: A row for each group and currency, with `Decimal`
+            amounts, e.g. {"category": "Food", "currency": "MXN",
+            "sum": Decimal("10.25")}.
+    """
+    return MoneyAggregator(
+        group_by, metrics, filters, use_numpy=use_numpy
+    ).update(transactions).rows()
@@ -6,8 +6,8 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
 from src.core.auth import (
-    auth, oauth2_scheme,
-    register_new_user, authenticate_user, get_current_user
+    auth, oauth2_scheme, token_claims,
+    register_new_user_async, authenticate_user_async, get_current_user
 )
 from src.schemas.user_schema import (
     UserRequest, UserResponse, UserTokenResponse
@@ -24,9 +24,9 @@ async def register(user_data: UserRequest, db: Session = Depends(get_session)):
 
     This endpoint will register a new user and return a JWT token.
     """
-    new_user = register_new_user(user_data, db)
+    new_user = await register_new_user_async(user_data, db)
 
-    access_token = auth.create_access_token(data={"sub": new_user.username})
+    access_token = auth.create_access_token(data=token_claims(new_user))
     return UserTokenResponse(
         username=new_user.username,
         email=new_user.email,
@@ -41,11 +41,11 @@ async def login(user_credentials: UserRequest,
 
     This endpoint will login a user with credentials and return a JWT token.
     """
-    user = authenticate_user(
+    user = await authenticate_user_async(
         user_credentials.username, user_credentials.password, db
     )
 
-    access_token = auth.create_access_token(data={"sub": user.username})
+    access_token = auth.create_access_token(data=token_claims(user))
     return UserTokenResponse(
         username=user.username,
         email=user.email,
@@ -57,11 +57,11 @@ async def login(user_credentials: UserRequest,
 async def token(user_credentials: Annotated[OAuth2PasswordRequestForm, Depends()],  # noqa: E501
                 db: Session = Depends(get_session)):
     """Get JWT Token Endpoint."""
-    user = authenticate_user(
+    user = await authenticate_user_async(
         user_credentials.username, user_credentials.password, db
     )
 
-    access_token = auth.create_access_token(data={"sub": user.username})
+    access_token = auth.create_access_token(data=token_claims(user))
 
     return {"access_token": access_token, "token_type": "bearer"}
 
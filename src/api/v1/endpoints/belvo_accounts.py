@@ -1,14 +1,15 @@
 """EndPoints for Belvo Accounts."""""
 
-from typing import Optional
+from typing import List, Optional
 
-from requests import HTTPError
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.orm import Session
 from src.core.auth import oauth2_scheme
 from src.core.database import get_session
-from src.belvo.instance import get_belvo_client
+from src.belvo.exceptions import RequestError
+from src.belvo.instance import get_async_belvo_client
 from src.schemas.responses_schema import SuccessResponse
+from src.utils.streaming import StreamFormat, stream_items
 
 
 router = APIRouter()
@@ -16,25 +17,41 @@ router = APIRouter()
 
 @router.get("/accounts")
 async def get_belvo_accounts(
-    id: Optional[str] = None, client = Depends(get_belvo_client),  # noqa: E251
-    db: Session = Depends(get_session), token: str = Depends(oauth2_scheme)
+    id: Optional[str] = None, client = Depends(get_async_belvo_client),  # noqa: E501,E251
+    db: Session = Depends(get_session), token: str = Depends(oauth2_scheme),
+    stream: Optional[StreamFormat] = None,
+    ids: Optional[List[str]] = Query(None)
 ):
-    """Get Belvo Accounts EndPoint. All Accounts or specific Account by ID."""
+    """Get Belvo Accounts EndPoint. All Accounts or specific Account by ID.
+
+    Use `stream` (json or ndjson) to send each Account as soon as it's
+    received from Belvo, instead of wait for the complete list.
+    Use `ids` (repeated) to get several Accounts in parallel, with the result
+    (or the error) of each one.
+    """
     try:
         # Get the Belvo Accounts Resource
         accounts_resource = client.Accounts
 
         if id:
             try:
-                data = accounts_resource.get(id)
-            except HTTPError as http_err:
+                data = await accounts_resource.get(id)
+            except RequestError as req_err:
                 raise HTTPException(
-                    status_code=http_err.response.status_code,
-                    detail=http_err.response.json()
+                    status_code=req_err.status_code,
+                    detail=req_err.detail
                 )
+        elif ids:
+            data = {"accounts": await accounts_resource.get_many(ids)}
+        elif stream:
+            return await stream_items(
+                accounts_resource.list(), "accounts", "Belvo Accounts", stream
+            )
         else:
-            # Convert Generator to a List of Dictionaries
-            list_accounts = list(accounts_resource.list())
+            # Convert AsyncGenerator to a List of Dictionaries
+            list_accounts = [
+                item async for item in accounts_resource.list()
+            ]
             data = {"accounts": list_accounts}
 
         return SuccessResponse(
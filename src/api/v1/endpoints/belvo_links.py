@@ -1,11 +1,12 @@
 """EndPoints for Belvo Links."""""
 
-from typing import Optional
+from typing import List, Optional
 
-from requests import HTTPError
-from fastapi import APIRouter, HTTPException, Depends
-from src.belvo.instance import get_belvo_client
+from fastapi import APIRouter, HTTPException, Depends, Query
+from src.belvo.exceptions import RequestError
+from src.belvo.instance import get_async_belvo_client
 from src.schemas.responses_schema import SuccessResponse
+from src.utils.streaming import StreamFormat, stream_items
 
 
 router = APIRouter()
@@ -13,24 +14,40 @@ router = APIRouter()
 
 @router.get("/links")
 async def get_belvo_links(
-    client = Depends(get_belvo_client), id: Optional[str] = None  # noqa: E251
+    client = Depends(get_async_belvo_client), id: Optional[str] = None,  # noqa: E501,E251
+    stream: Optional[StreamFormat] = None,
+    ids: Optional[List[str]] = Query(None)
 ):
-    """Get Belvo Links EndPoint. All Links or a specific Link by ID."""
+    """Get Belvo Links EndPoint. All Links or a specific Link by ID.
+
+    Use `stream` (json or ndjson) to send each Link as soon as it's
+    received from Belvo, instead of wait for the complete list.
+    Use `ids` (repeated) to get several Links in parallel, with the result
+    (or the error) of each one.
+    """
     try:
         # Get the Belvo Links Resource
         links_resource = client.Links
 
         if id:
             try:
-                data = links_resource.get(id)
-            except HTTPError as http_err:
+                data = await links_resource.get(id)
+            except RequestError as req_err:
                 raise HTTPException(
-                    status_code=http_err.response.status_code,
-                    detail=http_err.response.json()
+                    status_code=req_err.status_code,
+                    detail=req_err.detail
                 )
+        elif ids:
+            data = {"links": await links_resource.get_many(ids)}
+        elif stream:
+            return await stream_items(
+                links_resource.list(), "links", "Belvo Links", stream
+            )
         else:
-            # Convert Generator to a List of Dictionaries
-            list_links = list(links_resource.list())
+            # Convert AsyncGenerator to a List of Dictionaries
+            list_links = [
+                item async for item in links_resource.list()
+            ]
             data = {"links": list_links}
 
         return SuccessResponse(
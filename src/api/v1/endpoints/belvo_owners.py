@@ -1,11 +1,12 @@
 """EndPoints for Belvo Ownwers."""""
 
-from typing import Optional
+from typing import List, Optional
 
-from requests import HTTPError
-from fastapi import APIRouter, HTTPException, Depends
-from src.belvo.instance import get_belvo_client
+from fastapi import APIRouter, HTTPException, Depends, Query
+from src.belvo.exceptions import RequestError
+from src.belvo.instance import get_async_belvo_client
 from src.schemas.responses_schema import SuccessResponse
+from src.utils.streaming import StreamFormat, stream_items
 
 
 router = APIRouter()
@@ -13,24 +14,40 @@ router = APIRouter()
 
 @router.get("/owners")
 async def get_belvo_owners(
-    client = Depends(get_belvo_client), id: Optional[str] = None  # noqa: E251
+    client = Depends(get_async_belvo_client), id: Optional[str] = None,  # noqa: E501,E251
+    stream: Optional[StreamFormat] = None,
+    ids: Optional[List[str]] = Query(None)
 ):
-    """Get Belvo Owners EndPoint. All Owners or a specific Owner by ID."""
+    """Get Belvo Owners EndPoint. All Owners or a specific Owner by ID.
+
+    Use `stream` (json or ndjson) to send each Owner as soon as it's
+    received from Belvo, instead of wait for the complete list.
+    Use `ids` (repeated) to get several Owners in parallel, with the result
+    (or the error) of each one.
+    """
     try:
         # Get the Belvo Owners Resource
         owners_resource = client.Owners
 
         if id:
             try:
-                data = owners_resource.get(id)
-            except HTTPError as http_err:
+                data = await owners_resource.get(id)
+            except RequestError as req_err:
                 raise HTTPException(
-                    status_code=http_err.response.status_code,
-                    detail=http_err.response.json()
+                    status_code=req_err.status_code,
+                    detail=req_err.detail
                 )
+        elif ids:
+            data = {"owners": await owners_resource.get_many(ids)}
+        elif stream:
+            return await stream_items(
+                owners_resource.list(), "owners", "Belvo Owners", stream
+            )
         else:
-            # Convert Generator to a List of Dictionaries
-            list_owners = list(owners_resource.list())
+            # Convert AsyncGenerator to a List of Dictionaries
+            list_owners = [
+                item async for item in owners_resource.list()
+            ]
             data = {"owners": list_owners}
 
         return SuccessResponse(
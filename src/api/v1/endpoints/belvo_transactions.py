@@ -1,49 +1,185 @@
 """EndPoints for Belvo Transactions."""""
 
-from typing import Optional
+from datetime import date
+from typing import Dict, List, Literal, Optional
 
-from requests import HTTPError
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.orm import Session
+from src.analytics import cashflow_summary, top_rows
 from src.core.auth import oauth2_scheme
-from src.belvo.instance import get_belvo_client
+from src.core.database import get_session
+from src.belvo.exceptions import RequestError
+from src.belvo.http import MAX_PAGE_SIZE
+from src.belvo.instance import get_async_belvo_client
 from src.schemas.responses_schema import SuccessResponse
+from src.services.analytics import (
+    QueryPlan, aggregate_links, parse_date_range, parse_filters, run_query
+)
+from src.services.rollups import rollup_rows
+from src.services.transactions import (
+    Source, local_page, sync_transactions
+)
 
 
 router = APIRouter()
 
 
+def group_by_currency(rows: List[Dict]) -> Dict[str, Dict]:
+    """Map the currency and category of the rows to their exact sum."""
+    grouped: Dict[str, Dict] = {}
+    for row in rows:
+        grouped.setdefault(row["currency"], {})[row["category"]] = row["sum"]
+    return grouped
+
+
+async def load_cashflow_rows(client, db: Session, source: Source,
+                             type: str = None, page: int = 1,
+                             **filters) -> List[Dict]:
+    """Load the exact sum of the transactions by category, type and currency.
+
+    Args:
+        client (AsyncClient): Belvo client.
+        db (Session): Session of the database.
+        source (Source): `belvo` folds the transactions listed from the
+            given page as they arrive (the type and account are filtered by
+            Belvo), `local` reads the rollups (`page` is ignored).
+        type (str, optional): Only of this type (INFLOW or OUTFLOW).
+        page (int, optional): First page in Belvo. Defaults to 1.
+        **filters: The `link`, `account`, `date_from` and `date_to`.
+
+    Returns:
+        List[Dict]: Rows with the `category`, `type`, `currency` and `sum`
+            (exact `Decimal`).
+    """
+    if source == "local":
+        return rollup_rows(db, type=type, **filters)
+
+    plan = QueryPlan(
+        {
+            key: [value] for key, value in
+            (("type", type), ("account", filters.get("account")))
+            if value is not None
+        },
+        filters.get("date_from"), filters.get("date_to"), source=source
+    )
+    aggregator = await run_query(
+        client, db, plan, ["category", "type"], ["sum"],
+        link=filters.get("link"), page=page, exact=True
+    )
+    return aggregator.rows()
+
+
 @router.get("/transactions/")
 async def get_belvo_transactions(
-    client = Depends(get_belvo_client), link: str = None,  # noqa: E251
-    account: str = None, page: Optional[int] = 1
+    client = Depends(get_async_belvo_client), link: str = None,  # noqa: E251
+    account: str = None, page: Optional[int] = 1,
+    cursor: Optional[str] = None,
+    page_size: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    source: Source = "belvo", db: Session = Depends(get_session)
 ):
-    """Get Belvo Transactions EndPoint. List all Transactions.
+    """Get Belvo Transactions EndPoint. List a page of Transactions.
 
     This EndPoint is used to get a list of Belvo Transactions.
     The list of transactions need to be filtered by account and link.
-    And for a better performance, the list is paginated.
+    And for a better performance, the list is paginated: only one page is
+    requested to Belvo, and `next` is the cursor of the following page.
+    With `source=local`, the page is read from the synced transactions.
     """
     try:
         # Get the Belvo Transactions Resource
         transactions_resource = client.Transactions
 
         try:
-            # Convert Generator to a List of Dictionaries
-            list_transactions = list(transactions_resource.list(
-                page=page, account=account, link=link
-            ))
-            data = {"transactions": list_transactions}
-        except HTTPError as http_err:
+            if source == "local":
+                transactions_page = local_page(
+                    db, cursor=cursor, page=page, page_size=page_size,
+                    link=link, account=account
+                )
+            else:
+                transactions_page = await transactions_resource.page(
+                    link=link, cursor=cursor, page_size=page_size,
+                    page=page, account=account
+                )
+            data = {
+                "transactions": transactions_page["results"],
+                "count": transactions_page.get("count"),
+                "next": transactions_page["next"],
+            }
+        except RequestError as req_err:
             raise HTTPException(
-                status_code=http_err.response.status_code,
-                detail=http_err.response.json()
+                status_code=req_err.status_code,
+                detail=req_err.detail
             )
+        except ValueError as val_err:
+            raise HTTPException(status_code=400, detail=str(val_err))
         return SuccessResponse(
             success=True,
             message="Belvo Transactions",
             data=data
         ).model_dump()
 
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(
+            status_code=500,
+            detail=str(exc)
+        )
+
+
+@router.get("/transactions/analytics/")
+async def get_belvo_transactions_analytics(
+    client = Depends(get_async_belvo_client), token: str = Depends(oauth2_scheme),  # noqa: E501,E251
+    group_by: List[str] = Query(["category"]),
+    metrics: List[str] = Query(["sum"]),
+    filters: List[str] = Query([]), date_range: Optional[str] = None,
+    link: str = None, page: Optional[int] = 1,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    order: Literal["desc", "asc"] = "desc", exact: bool = False,
+    source: Source = "belvo", db: Session = Depends(get_session)
+):
+    """Get Any Aggregation of Belvo Transactions EndPoint.
+
+    The transactions are grouped by the `group_by` keys (category,
+    merchant, account, type, currency, day or month), with the `metrics`
+    (sum, count, mean, min or max) of each group. The `filters` are
+    `key:value` (repeat a key for several values) and `date_range` is
+    `YYYY-MM-DD..YYYY-MM-DD`. The filters that Belvo (or the database)
+    supports are sent with the request, the rest are applied in the same
+    pass of the aggregation, see `plan` in the response.
+
+    With `limit`, only the first groups by the first metric are returned.
+    With `exact`, the amounts are summed in minor units of each currency.
+    """
+    try:
+        try:
+            plan = QueryPlan(
+                parse_filters(filters), *parse_date_range(date_range),
+                source=source
+            )
+            aggregator = await run_query(
+                client, db, plan, group_by, metrics, link=link, page=page,
+                exact=exact
+            )
+            rows = aggregator.rows() if limit is None else \
+                aggregator.top(limit, order=order)
+            data = {"rows": rows, "plan": plan.explain()}
+
+        except RequestError as req_err:
+            raise HTTPException(
+                status_code=req_err.status_code,
+                detail=req_err.detail
+            )
+        except ValueError as val_err:
+            raise HTTPException(status_code=400, detail=str(val_err))
+        return SuccessResponse(
+            success=True,
+            message="Belvo Transactions Analytics",
+            data=data
+        ).model_dump()
+
+    except HTTPException:
+        raise
     except Exception as exc:
         raise HTTPException(
             status_code=500,
@@ -53,24 +189,30 @@ async def get_belvo_transactions(
 
 @router.get("/transactions-outcomes/")
 async def get_belvo_transactions_out(
-    client = Depends(get_belvo_client), token: str = Depends(oauth2_scheme),  # noqa: E501,E251
-    link: str = None, account: str = None, page: Optional[int] = 1
+    client = Depends(get_async_belvo_client), token: str = Depends(oauth2_scheme),  # noqa: E501,E251
+    link: str = None, account: str = None, page: Optional[int] = 1,
+    source: Source = "belvo", db: Session = Depends(get_session),
+    date_from: Optional[date] = None, date_to: Optional[date] = None
 ):
-    """Get Mounts of All Belvo Outcomes Transactions By Category EndPoint."""
+    """Get Mounts of All Belvo Outcomes Transactions By Category EndPoint.
+
+    The mounts are exact sums of each currency, the amounts of different
+    currencies are never added.
+    With `source=local` the totals are read from the daily and monthly
+    rollups of the synced transactions, also for a date range.
+    """
     try:
-        transactions_resource = client.Transactions
         try:
-            list_transactions = list(transactions_resource.list(
-                page=page, account=account, link=link
-            ))
-            grouped_data = \
-                group_mount_transactions(list_transactions, "OUTFLOW")
-            data = {"transactions_by_category": grouped_data}
-
-        except HTTPError as http_err:
+            rows = await load_cashflow_rows(
+                client, db, source, type="OUTFLOW", page=page, link=link,
+                account=account, date_from=date_from, date_to=date_to
+            )
+            data = {"transactions_by_currency": group_by_currency(rows)}
+
+        except RequestError as req_err:
             raise HTTPException(
-                status_code=http_err.response.status_code,
-                detail=http_err.response.json()
+                status_code=req_err.status_code,
+                detail=req_err.detail
             )
         return SuccessResponse(
             success=True,
@@ -78,6 +220,8 @@ async def get_belvo_transactions_out(
             data=data
         ).model_dump()
 
+    except HTTPException:
+        raise
     except Exception as exc:
         raise HTTPException(
             status_code=500,
@@ -87,24 +231,30 @@ async def get_belvo_transactions_out(
 
 @router.get("/transactions-incomes/")
 async def get_belvo_transactions_in(
-    client = Depends(get_belvo_client), token: str = Depends(oauth2_scheme),  # noqa: E501,E251
-    link: str = None, account: str = None, page: Optional[int] = 1
+    client = Depends(get_async_belvo_client), token: str = Depends(oauth2_scheme),  # noqa: E501,E251
+    link: str = None, account: str = None, page: Optional[int] = 1,
+    source: Source = "belvo", db: Session = Depends(get_session),
+    date_from: Optional[date] = None, date_to: Optional[date] = None
 ):
-    """Get Mounts of All Belvo Incomes Transactions By Category EndPoint."""
+    """Get Mounts of All Belvo Incomes Transactions By Category EndPoint.
+
+    The mounts are exact sums of each currency, the amounts of different
+    currencies are never added.
+    With `source=local` the totals are read from the daily and monthly
+    rollups of the synced transactions, also for a date range.
+    """
     try:
-        transactions_resource = client.Transactions
         try:
-            list_transactions = list(transactions_resource.list(
-                page=page, account=account, link=link
-            ))
-            grouped_data = \
-                group_mount_transactions(list_transactions, "INFLOW")
-            data = {"transactions_by_category": grouped_data}
-
-        except HTTPError as http_err:
+            rows = await load_cashflow_rows(
+                client, db, source, type="INFLOW", page=page, link=link,
+                account=account, date_from=date_from, date_to=date_to
+            )
+            data = {"transactions_by_currency": group_by_currency(rows)}
+
+        except RequestError as req_err:
             raise HTTPException(
-                status_code=http_err.response.status_code,
-                detail=http_err.response.json()
+                status_code=req_err.status_code,
+                detail=req_err.detail
             )
         return SuccessResponse(
             success=True,
@@ -112,6 +262,8 @@ async def get_belvo_transactions_in(
             data=data
         ).model_dump()
 
+    except HTTPException:
+        raise
     except Exception as exc:
         raise HTTPException(
             status_code=500,
@@ -119,26 +271,189 @@ async def get_belvo_transactions_in(
         )
 
 
-def group_mount_transactions(transactions, type_transaction="OUTFLOW"):
-    """Group Transactions by Category.
+@router.get("/transactions-summary/")
+async def get_belvo_transactions_summary(
+    client = Depends(get_async_belvo_client), token: str = Depends(oauth2_scheme),  # noqa: E501,E251
+    link: str = None, account: str = None, page: Optional[int] = 1,
+    source: Source = "belvo", db: Session = Depends(get_session),
+    date_from: Optional[date] = None, date_to: Optional[date] = None
+):
+    """Get the Incomes, Outcomes and Net of Belvo Transactions EndPoint.
 
-    This function is used to group transactions by category.
-    Transactions are filtered by type of transaction (INFLOW or OUTFLOW).
+    The transactions are requested only once, and the INFLOW, OUTFLOW and
+    net (INFLOW - OUTFLOW) of each category are computed in a single pass,
+    exactly and by currency. With `source=local` the totals are read from
+    the rollups.
+    """
+    try:
+        try:
+            rows = await load_cashflow_rows(
+                client, db, source, page=page, link=link, account=account,
+                date_from=date_from, date_to=date_to
+            )
+            data = {"transactions_summary": cashflow_summary(rows)}
 
-    Args:
-        transactions (list): List of Belvo Transactions.
-        type_transaction (str): Type of Transaction. (INFLOW or OUTFLOW)
+        except RequestError as req_err:
+            raise HTTPException(
+                status_code=req_err.status_code,
+                detail=req_err.detail
+            )
+        return SuccessResponse(
+            success=True,
+            message="Belvo Transactions Summary",
+            data=data
+        ).model_dump()
 
-    Returns:
-        dict: Grouped Transactions by Category.
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(
+            status_code=500,
+            detail=str(exc)
+        )
+
+
+@router.get("/transactions-summary/links/")
+async def get_belvo_transactions_summary_links(
+    client = Depends(get_async_belvo_client), token: str = Depends(oauth2_scheme),  # noqa: E501,E251
+    links: List[str] = Query([]), accounts: List[str] = Query([]),
+    max_concurrency: int = Query(5, ge=1, le=20),
+    page: Optional[int] = 1,
+    date_from: Optional[date] = None, date_to: Optional[date] = None
+):
+    """Get the Summary of the Transactions of Several Links EndPoint.
+
+    The transactions of the links (or of the accounts, without links) are
+    listed concurrently, up to `max_concurrency` at the same time, and
+    their exact totals by category and currency are merged in a single
+    summary. The result
+    of each link includes its number of transactions and its seconds.
     """
-    grouped_data = {}
-    for transaction in transactions:
-        if transaction.get("type") == type_transaction:
-            category = transaction.get("category", "Uncategorized")
-            amount = transaction.get("amount", 0)
+    try:
+        if not links and not accounts:
+            raise HTTPException(
+                status_code=400,
+                detail="At least one link or account is required."
+            )
+        aggregator, results = await aggregate_links(
+            client, links, accounts, max_concurrency=max_concurrency,
+            page=page, exact=True, date_from=date_from, date_to=date_to
+        )
+        data = {
+            "transactions_summary": cashflow_summary(aggregator.rows()),
+            "links": results,
+        }
+        return SuccessResponse(
+            success=True,
+            message="Belvo Transactions Summary of Several Links",
+            data=data
+        ).model_dump()
+
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(
+            status_code=500,
+            detail=str(exc)
+        )
+
+
+@router.get("/transactions-top/")
+async def get_belvo_transactions_top(
+    client = Depends(get_async_belvo_client), token: str = Depends(oauth2_scheme),  # noqa: E501,E251
+    by: Literal["category", "merchant"] = "category",
+    type: Literal["INFLOW", "OUTFLOW"] = "OUTFLOW",
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    order: Literal["desc", "asc"] = "desc",
+    link: str = None, account: str = None, page: Optional[int] = 1,
+    source: Source = "belvo", db: Session = Depends(get_session),
+    date_from: Optional[date] = None, date_to: Optional[date] = None
+):
+    """Get the Top Categories or Merchants of Belvo Transactions EndPoint.
+
+    Only the `limit` groups with the greatest (or smallest, `order=asc`)
+    sum are selected in the server, with a heap, instead of returning and
+    sorting all of them. The groups are also split by currency.
+    """
+    try:
+        try:
+            if source == "local" and by == "category":
+                rows = rollup_rows(
+                    db, link=link, account=account, type=type,
+                    date_from=date_from, date_to=date_to
+                )
+                top = [
+                    {"category": row["category"], "currency": row["currency"],
+                     "sum": row["sum"], "count": row["count"]}
+                    for row in top_rows(rows, "sum", limit, order)
+                ]
+            else:
+                filters = {"type": [type]}
+                if account is not None:
+                    filters["account"] = [account]
+                plan = QueryPlan(filters, date_from, date_to, source=source)
+                aggregator = await run_query(
+                    client, db, plan, [by, "currency"], ["sum", "count"],
+                    link=link, page=page
+                )
+                top = aggregator.top(limit, "sum", order)
+            data = {"top_transactions": top}
+
+        except RequestError as req_err:
+            raise HTTPException(
+                status_code=req_err.status_code,
+                detail=req_err.detail
+            )
+        return SuccessResponse(
+            success=True,
+            message=f"Belvo Transactions Top by {by.capitalize()}",
+            data=data
+        ).model_dump()
+
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(
+            status_code=500,
+            detail=str(exc)
+        )
 
-            grouped_data[category] = \
-                grouped_data.get(category, 0) + amount
 
-    return grouped_data
+@router.post("/transactions/sync/")
+async def sync_belvo_transactions(
+    link: str, account: str = None, full: bool = False,
+    client = Depends(get_async_belvo_client), token: str = Depends(oauth2_scheme),  # noqa: E501,E251
+    db: Session = Depends(get_session)
+):
+    """Sync the Belvo Transactions of a Link to the database EndPoint.
+
+    Only the transactions created since the last sync (and in the days
+    before it, to update their changes) are requested. Use `full` to
+    request all of them again, e.g. after older transactions changed.
+    Then the transactions EndPoints can read them with `source=local`.
+    """
+    try:
+        try:
+            data = {
+                "sync": await sync_transactions(
+                    client, db, link, account, full=full
+                )
+            }
+        except RequestError as req_err:
+            raise HTTPException(
+                status_code=req_err.status_code,
+                detail=req_err.detail
+            )
+        return SuccessResponse(
+            success=True,
+            message="Belvo Transactions Synced",
+            data=data
+        ).model_dump()
+
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(
+            status_code=500,
+            detail=str(exc)
+        )
@@ -1,15 +1,22 @@
 """Module `client` for manage the Belvo API client."""
 
+import asyncio
+
 from src.belvo import resources
-from src.belvo.http import APISession
+from src.belvo.http import APISession, AsyncAPISession
 from src.belvo.exceptions import BelvoException
+from src.core.cache import TTLCache
+
+
+# Max items of all the cached lists of the default cache of a client
+CACHE_MAX_ITEMS = 10_000
 
 
 class Client:
     """Class `Client` for connect to the BelvoAPI."""
 
-    def __init__(self, secret_key_id: str,
-                 secret_key_password: str, url: str) -> None:
+    def __init__(self, secret_key_id: str, secret_key_password: str,
+                 url: str, cache: TTLCache = None) -> None:
         """Initialize the client with the Belvo API.
 
         You must provide your `secret_key_id` and `secret_key_password`.
@@ -20,19 +27,24 @@ class Client:
             secret_key_id (str): Secret key id.
             secret_key_password (str): Secret key password.
             url (str): URL of the environment you want to connect to.
+            cache (TTLCache, optional): Cache for the responses of the
+                resources. Defaults to a new in-memory cache of up to
+                `CACHE_MAX_ITEMS` listed items.
 
         Raises:
             BelvoException: If the login fails.
         """
         self.session = APISession(url)
+        self.cache = TTLCache(maxweight=CACHE_MAX_ITEMS) \
+            if cache is None else cache
 
         if not self.session.login(secret_key_id, secret_key_password):
             raise BelvoException("Login failed.")
 
-        self._accounts = resources.Accounts(self.session)
-        self._links = resources.Links(self.session)
-        self._owners = resources.Owners(self.session)
-        self._transactions = resources.Transactions(self.session)
+        self._accounts = resources.Accounts(self.session, self.cache)
+        self._links = resources.Links(self.session, self.cache)
+        self._owners = resources.Owners(self.session, self.cache)
+        self._transactions = resources.Transactions(self.session, self.cache)
 
     @property
     def Accounts(self):
@@ -53,3 +65,55 @@ class Client:
     def Transactions(self):
         """Get the Transactions resource."""
         return self._transactions
+
+
+class AsyncClient(Client):
+    """Class `AsyncClient` for connect to the BelvoAPI without blocking."""
+
+    def __init__(self, secret_key_id: str, secret_key_password: str,
+                 url: str, cache: TTLCache = None) -> None:
+        """Initialize the async client with the Belvo API.
+
+        Unlike `Client`, the login can't be done while creating the instance,
+        you must `await client.login()` before use the resources.
+
+        Args:
+            secret_key_id (str): Secret key id.
+            secret_key_password (str): Secret key password.
+            url (str): URL of the environment you want to connect to.
+            cache (TTLCache, optional): Cache for the responses of the
+                resources. Defaults to a new in-memory cache of up to
+                `CACHE_MAX_ITEMS` listed items.
+        """
+        self._secret_key_id = secret_key_id
+        self._secret_key_password = secret_key_password
+        self._logged_in = False
+        self._login_lock = asyncio.Lock()
+        self.session = AsyncAPISession(url)
+        self.cache = TTLCache(maxweight=CACHE_MAX_ITEMS) \
+            if cache is None else cache
+
+        self._accounts = resources.AsyncAccounts(self.session, self.cache)
+        self._links = resources.AsyncLinks(self.session, self.cache)
+        self._owners = resources.AsyncOwners(self.session, self.cache)
+        self._transactions = resources.AsyncTransactions(
+            self.session, self.cache
+        )
+
+    async def login(self) -> None:
+        """Login into the Belvo API, only the first time it's awaited.
+
+        Raises:
+            BelvoException: If the login fails.
+        """
+        if self._logged_in:
+            return
+
+        async with self._login_lock:
+            if self._logged_in:
+                return
+            if not await self.session.login(
+                self._secret_key_id, self._secret_key_password
+            ):
+                raise BelvoException("Login failed.")
+            self._logged_in = True
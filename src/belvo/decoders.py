@@ -0,0 +1,54 @@
+"""Module `decoders` for decode the JSON bodies of the Belvo responses.
+
+The pages of transactions are big, and decode them with the `json` module
+of the stdlib takes a large share of the CPU. When `orjson` is installed
+it's used instead, otherwise the stdlib is the fallback.
+"""
+
+import json
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+# A decoder receives the raw body and returns the Python objects.
+# It must raise ValueError for an invalid JSON.
+Decoder = Callable[[bytes], Any]
+
+
+def json_decoder(content: bytes) -> Any:
+    """Decode a JSON body with the stdlib."""
+    return json.loads(content)
+
+
+def orjson_decoder(content: bytes) -> Any:
+    """Decode a JSON body with `orjson` (its errors are ValueError)."""
+    return orjson.loads(content)
+
+
+def get_decoder(name: str = "auto") -> Decoder:
+    """Get a decoder by its name.
+
+    Args:
+        name (str, optional): `json`, `orjson` or `auto` (the fastest
+            installed). Defaults to "auto".
+
+    Raises:
+        ImportError: If `orjson` is requested but is not installed.
+        ValueError: If the name is unknown.
+
+    Returns:
+        Decoder: The function to decode the bodies.
+    """
+    if name == "auto":
+        name = "json" if orjson is None else "orjson"
+    if name == "json":
+        return json_decoder
+    if name == "orjson":
+        if orjson is None:
+            raise ImportError("orjson is not installed.")
+        return orjson_decoder
+    raise ValueError(f"Unknown JSON decoder: {name}")
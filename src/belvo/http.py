@@ -1,8 +1,106 @@
 """Module `http` for manage the HTTP requests."""
 
-from typing import Dict, Generator
+import asyncio
+import time
+from base64 import b64decode, urlsafe_b64encode
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import count
+from threading import Lock
+from typing import AsyncGenerator, Dict, Generator, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
 
-from requests import HTTPError, Session
+import httpx
+from requests import ConnectionError, HTTPError, Response, Session, Timeout
+from src.belvo.decoders import Decoder, get_decoder
+from src.belvo.exceptions import RequestError
+from src.belvo.prefetch import aprefetch as _aprefetch
+from src.belvo.prefetch import prefetch as _prefetch
+from src.belvo.retry import HedgePolicy, RetryPolicy
+from src.belvo.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def normalize_params(params: Dict = None) -> Tuple:
+    """Normalize the params of a request to use them as a key.
+
+    The order of the params doesn't matter, None values are ignored
+    (they are not sent), and the timeout doesn't change the response.
+
+    Args:
+        params (Dict, optional): Parameters for the request.
+
+    Returns:
+        Tuple: Sorted pairs of (param, value).
+    """
+    return tuple(sorted(
+        (key, tuple(value) if isinstance(value, (list, tuple)) else value)
+        for key, value in (params or {}).items()
+        if value is not None and key != "timeout"
+    ))
+
+
+# `page_size` of Belvo when it's not sent, and the max accepted
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def page_params(params: Dict = None, page_size: int = None) -> Dict:
+    """Copy the params of a list, adding the page size.
+
+    Args:
+        params (Dict, optional): Parameters for the request.
+        page_size (int, optional): Results per page, limited to
+            `MAX_PAGE_SIZE`. Defaults to the page size of Belvo.
+
+    Returns:
+        Dict: New parameters for the request.
+    """
+    params = dict(params or {})
+    if page_size is not None:
+        params["page_size"] = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    return params
+
+
+def encode_cursor(next_url: Optional[str]) -> Optional[str]:
+    """Create the cursor of a page from the `next` URL given by Belvo.
+
+    The cursor is opaque for the clients and keeps only the query of the
+    URL, so it can't be used to send requests to another host.
+
+    Args:
+        next_url (Optional[str]): URL of the next page.
+
+    Returns:
+        Optional[str]: The cursor, or None if there isn't a next page.
+    """
+    if not next_url:
+        return None
+    query = urlsplit(next_url).query
+    return urlsafe_b64encode(query.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict:
+    """Obtain the params of a page from its cursor.
+
+    Args:
+        cursor (str): Cursor created with `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is not valid.
+
+    Returns:
+        Dict: Parameters for the request of the page.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        query = b64decode(
+            cursor + padding, altchars=b"-_", validate=True
+        ).decode()
+        params = dict(parse_qsl(query, strict_parsing=True))
+    except ValueError:
+        raise ValueError("Invalid cursor.")
+    if not params:
+        raise ValueError("Invalid cursor.")
+    return params
 
 
 class APISession:
@@ -12,11 +110,25 @@ class APISession:
     _secret_key_password: str
     _url: str
 
-    def __init__(self, url: str) -> None:
-        """Initialize the session with the Belvo API."""
+    def __init__(self, url: str, retry_policy: RetryPolicy = None,
+                 decoder: Decoder = None) -> None:
+        """Initialize the session with the Belvo API.
+
+        Args:
+            url (str): URL of the Belvo API.
+            retry_policy (RetryPolicy, optional): Default retries of the
+                requests. Defaults to `RetryPolicy()`.
+            decoder (Decoder, optional): Decode the JSON of the responses.
+                Defaults to the fastest installed (see `get_decoder`).
+        """
         self._url = url
         self._session = Session()
         self._session.headers.update({"User-Agent": "fapi-financial (2024)"})
+        self._login_lock = Lock()
+        self._flights = SingleFlight()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=8)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.decoder = decoder or get_decoder()
 
     @property
     def url(self) -> str:
@@ -62,65 +174,645 @@ class APISession:
             return False
         return True
 
-    def _get(self, url: str, params: Dict = None) -> Dict:
+    def _reauthenticate(self, stale_auth) -> bool:
+        """Login again with the stored credentials after a 401 response.
+
+        Concurrent requests could receive a 401 at the same time, so only
+        the first one performs the login; the others reuse the new auth.
+
+        Args:
+            stale_auth: The auth used by the request that was rejected.
+
+        Returns:
+            bool: True if the request can be retried, False otherwise.
+        """
+        if not hasattr(self, "_secret_key_password"):
+            return False
+
+        with self._login_lock:
+            if self.session.auth is not stale_auth:
+                return True
+            return self.login(self._secret_key_id, self._secret_key_password)
+
+    def _get(self, url: str, params: Dict = None,
+             retry_policy: RetryPolicy = None,
+             hedge_policy: HedgePolicy = None) -> Dict:
         """Manage a GET request.
 
         Internal method for HTTP GET requests.
         Include a timeout and raise an exception if the request fails.
+        If the credentials were rejected (401), login once more and retry.
+        Identical requests made at the same time share a single request.
 
         Args:
             url (str): URL for the request.
             params (Dict, optional): Parameters for the request. Why???
+            retry_policy (RetryPolicy, optional): Retries for this request,
+                defaults to the retries of the session.
+            hedge_policy (HedgePolicy, optional): Hedging for this request,
+                without it the request is never duplicated.
 
         Returns:
-            Dict: Response data.
+            Dict: Response data (shared, don't modify it).
         """
         if params is None:
             params = {}
-        timeout = params.pop("timeout", 5)
+        timeout = params.pop("timeout", None)
+
+        return self._flights.do(
+            (url, normalize_params(params)),
+            lambda: self._request(
+                url, params, timeout, retry_policy, hedge_policy
+            )
+        )
+
+    def _request(self, url: str, params: Dict, timeout: float = None,
+                 retry_policy: RetryPolicy = None,
+                 hedge_policy: HedgePolicy = None) -> Dict:
+        """Make the GET request to the Belvo API, with retries.
+
+        Retry the connection errors, timeouts and transient status (e.g. 429
+        or 503) waiting the backoff of the policy or the `Retry-After`.
+
+        Args:
+            url (str): URL for the request.
+            params (Dict): Parameters for the request.
+            timeout (float, optional): Timeout for each attempt, defaults
+                to the timeout of the retry policy.
+            retry_policy (RetryPolicy, optional): Retries for this request.
+            hedge_policy (HedgePolicy, optional): Hedging for this request.
+
+        Returns:
+            Dict: Response data.
+        """
+        retry_policy = retry_policy or self.retry_policy
+        if timeout is None:
+            timeout = retry_policy.timeout
+
+        attempt = 1
+        while True:
+            try:
+                response = self._send(url, params, timeout, hedge_policy)
+            except (ConnectionError, Timeout):
+                if not retry_policy.should_retry(attempt):
+                    raise
+                delay = retry_policy.delay(attempt)
+            else:
+                retry_after = response.headers.get("Retry-After")
+                if not retry_policy.should_retry(
+                    attempt, response.status_code, retry_after
+                ):
+                    break
+                delay = retry_policy.delay(attempt, retry_after)
+
+            time.sleep(delay)
+            attempt += 1
+
+        response.raise_for_status()
+
+        return self.decoder(response.content)
+
+    def _send(self, url: str, params: Dict, timeout: float,
+              hedge_policy: HedgePolicy = None) -> Response:
+        """Send the request, and a duplicate if it's slower than usual.
+
+        Args:
+            url (str): URL for the request.
+            params (Dict): Parameters for the request.
+            timeout (float): Timeout for the request.
+            hedge_policy (HedgePolicy, optional): Hedging for this request.
+
+        Returns:
+            Response: The first response received.
+        """
+        threshold = hedge_policy.threshold() if hedge_policy else None
+        if threshold is None:
+            return self._send_once(url, params, timeout, hedge_policy)
+
+        pending = {self._hedge_pool.submit(
+            self._send_once, url, params, timeout, hedge_policy
+        )}
+        done, _ = wait(pending, timeout=threshold)
+        if not done:
+            hedge_policy.hedged += 1
+            pending.add(self._hedge_pool.submit(
+                self._send_once, url, params, timeout, hedge_policy
+            ))
+
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _send_once(self, url: str, params: Dict, timeout: float,
+                   hedge_policy: HedgePolicy = None) -> Response:
+        """Send the request, login again if the credentials were rejected.
+
+        Args:
+            url (str): URL for the request.
+            params (Dict): Parameters for the request.
+            timeout (float): Timeout for the request.
+            hedge_policy (HedgePolicy, optional): Record the latency here.
 
+        Returns:
+            Response: The response of the Belvo API.
+        """
+        start = time.perf_counter()
+        auth = self.session.auth
         request = self.session.get(url=url, params=params, timeout=timeout)
-        request.raise_for_status()
+        if request.status_code == 401 and self._reauthenticate(auth):
+            request = self.session.get(url=url, params=params, timeout=timeout)
 
-        return request.json()
+        if hedge_policy is not None:
+            hedge_policy.record(time.perf_counter() - start)
+        return request
 
-    def get(self, endpoint: str, id: str, params: Dict = None) -> Dict:
+    def get(self, endpoint: str, id: str, params: Dict = None,
+            **policies) -> Dict:
         """Make a GET request to the Belvo API.
 
         Args:
             endpoint (str): Endpoint for the request.
             id (str): Id for the request.
             params (Dict, optional): Parameters for the request.
+            **policies: `retry_policy` and `hedge_policy` for the request.
 
         Returns:
             Dict: Response data.
         """
         url = "{}{}{}/".format(self.url, endpoint, id)
 
-        return self._get(url=url, params=params)
+        return self._get(url=url, params=params, **policies)
+
+    def page(self, endpoint: str, params: Dict = None, cursor: str = None,
+             page_size: int = None, **policies) -> Dict:
+        """Make a GET request for a single page of a List in the Belvo API.
+
+        Args:
+            endpoint (str): Endpoint for the request.
+            params (Dict, optional): Parameters for the first page.
+            cursor (str, optional): Cursor of the page, given as `next` by
+                the previous page. It already includes the filters, so
+                `params` are ignored.
+            page_size (int, optional): Results per page, up to
+                `MAX_PAGE_SIZE`. Defaults to the page size of Belvo.
+            **policies: `retry_policy` and `hedge_policy` for the request.
+
+        Raises:
+            ValueError: If the cursor is not valid.
+
+        Returns:
+            Dict: The `count`, the `results` and the `next` cursor (None
+                in the last page).
+        """
+        if cursor is not None:
+            params = decode_cursor(cursor)
+        url = "{}{}".format(self.url, endpoint)
+
+        data = self._get(
+            url, params=page_params(params, page_size), **policies
+        )
+        return {**data, "next": encode_cursor(data["next"])}
+
+    def _pages(self, url: str, params: Dict = None, max_pages: int = None,
+               **policies) -> Generator:
+        """Make the GET requests for every page, following `next`.
+
+        Args:
+            url (str): URL of the first page.
+            params (Dict, optional): Parameters for the first page.
+            max_pages (int, optional): Stop after this number of pages.
+            **policies: `retry_policy` and `hedge_policy` for the requests.
 
-    def list(self, endpoint: str, params: Dict = None) -> Generator:
+        Yields:
+            Generator: Response data of each page.
+        """
+        for number in count(1):
+            data = self._get(url, params=params, **policies)
+            yield data
+
+            if not data["next"] or number == max_pages:
+                break
+
+            url = data["next"]
+            params = None
+
+    def list(self, endpoint: str, params: Dict = None,
+             prefetch: int = 0, page_size: int = None,
+             max_pages: int = None, **policies) -> Generator:
         """Make a GET request to List in the Belvo API.
 
         Create a generator for the response data.
         While the response has a `next` field, make a new request.
         Util for list all the resources.
 
+        With `prefetch`, the next pages are requested in a background thread
+        while the results of the current page are yielded.
+
         Args:
             endpoint (str): Endpoint for the request.
             params (Dict, optional): Parameters for the request.
+            prefetch (int, optional): Max pages fetched ahead. Defaults to 0,
+                fetch each page only when the previous one was consumed.
+            page_size (int, optional): Results per page, up to
+                `MAX_PAGE_SIZE`. Bigger pages need fewer requests.
+            max_pages (int, optional): Stop after this number of pages.
+                Defaults to None, list all the pages.
+            **policies: `retry_policy` and `hedge_policy` for the requests.
 
         Yields:
             Generator: Response data.
         """
         url = "{}{}".format(self.url, endpoint)
-        while True:
-            data = self._get(url, params=params)
+        pages = self._pages(
+            url, params=page_params(params, page_size),
+            max_pages=max_pages, **policies
+        )
+        if prefetch > 0:
+            pages = _prefetch(pages, prefetch)
+
+        for data in pages:
             for result in data["results"]:
                 yield result
 
-            if not data["next"]:
+
+class AsyncAPISession:
+    """Class `AsyncAPISession` for manage the non-blocking HTTP requests.
+
+    Async counterpart of `APISession`, built on top of `httpx.AsyncClient`.
+    Use it from `async def` code to never block the event loop while
+    waiting for the Belvo API.
+    """
+
+    _secret_key_id: str
+    _secret_key_password: str
+    _url: str
+
+    def __init__(self, url: str,
+                 transport: httpx.AsyncBaseTransport = None,
+                 retry_policy: RetryPolicy = None,
+                 decoder: Decoder = None) -> None:
+        """Initialize the session with the Belvo API.
+
+        Args:
+            url (str): URL of the Belvo API.
+            transport (httpx.AsyncBaseTransport, optional): Custom transport,
+                mostly useful to mock the Belvo API in tests.
+            retry_policy (RetryPolicy, optional): Default retries of the
+                requests. Defaults to `RetryPolicy()`.
+            decoder (Decoder, optional): Decode the JSON of the responses.
+                Defaults to the fastest installed (see `get_decoder`).
+        """
+        self._url = url
+        self._session = httpx.AsyncClient(
+            headers={"User-Agent": "fapi-financial (2024)"},
+            transport=transport
+        )
+        self._login_lock = asyncio.Lock()
+        self._flights = AsyncSingleFlight()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.decoder = decoder or get_decoder()
+
+    @property
+    def url(self) -> str:
+        """Obtain the Belvo API URL."""
+        return self._url
+
+    @property
+    def key_id(self) -> str:
+        """Obtain the secret key id."""
+        return self._secret_key_id
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        """Obtain the session."""
+        return self._session
+
+    @property
+    def headers(self) -> Dict:
+        """Obtain the headers of the session."""
+        return self.session.headers
+
+    async def login(self, secret_key_id: str, secret_key_password: str,
+                    timeout: int = 5) -> bool:
+        """Login into the Belvo API.
+
+        Args:
+            secret_key_id (str): Secret key id.
+            secret_key_password (str): Secret key password.
+            timeout (int, optional): Timeout for the request. Defaults to 5.
+
+        Return:
+            bool: True if the login was successful, False otherwise.
+        """
+        self._secret_key_id = secret_key_id
+        self._secret_key_password = secret_key_password
+        base_api_url = "{}/api/".format(self.url)
+        self._session.auth = (secret_key_id, secret_key_password)
+
+        try:
+            response = await self.session.get(base_api_url, timeout=timeout)
+            response.raise_for_status()
+        except httpx.HTTPStatusError:
+            return False
+        return True
+
+    async def _reauthenticate(self, stale_auth) -> bool:
+        """Login again with the stored credentials after a 401 response.
+
+        Args:
+            stale_auth: The auth used by the request that was rejected.
+
+        Returns:
+            bool: True if the request can be retried, False otherwise.
+        """
+        if not hasattr(self, "_secret_key_password"):
+            return False
+
+        async with self._login_lock:
+            if self.session.auth is not stale_auth:
+                return True
+            return await self.login(
+                self._secret_key_id, self._secret_key_password
+            )
+
+    async def _get(self, url: str, params: Dict = None,
+                   retry_policy: RetryPolicy = None,
+                   hedge_policy: HedgePolicy = None) -> Dict:
+        """Manage a GET request.
+
+        Internal method for HTTP GET requests.
+        Include a timeout and raise an exception if the request fails.
+        If the credentials were rejected (401), login once more and retry.
+        Identical requests made at the same time share a single request.
+
+        Args:
+            url (str): URL for the request.
+            params (Dict, optional): Parameters for the request.
+            retry_policy (RetryPolicy, optional): Retries for this request,
+                defaults to the retries of the session.
+            hedge_policy (HedgePolicy, optional): Hedging for this request,
+                without it the request is never duplicated.
+
+        Raises:
+            RequestError: If the Belvo API answers with an error status.
+
+        Returns:
+            Dict: Response data (shared, don't modify it).
+        """
+        if params is None:
+            params = {}
+        timeout = params.pop("timeout", None)
+        # httpx replaces the query of the URL (e.g. `next`) with any params
+        params = {
+            key: value for key, value in params.items() if value is not None
+        } or None
+
+        return await self._flights.do(
+            (url, normalize_params(params)),
+            lambda: self._request(
+                url, params, timeout, retry_policy, hedge_policy
+            )
+        )
+
+    async def _request(self, url: str, params: Dict, timeout: float = None,
+                       retry_policy: RetryPolicy = None,
+                       hedge_policy: HedgePolicy = None) -> Dict:
+        """Make the GET request to the Belvo API, with retries.
+
+        Retry the connection errors, timeouts and transient status (e.g. 429
+        or 503) waiting the backoff of the policy or the `Retry-After`.
+
+        Args:
+            url (str): URL for the request.
+            params (Dict): Parameters for the request.
+            timeout (float, optional): Timeout for each attempt, defaults
+                to the timeout of the retry policy.
+            retry_policy (RetryPolicy, optional): Retries for this request.
+            hedge_policy (HedgePolicy, optional): Hedging for this request.
+
+        Raises:
+            RequestError: If the Belvo API answers with an error status.
+
+        Returns:
+            Dict: Response data.
+        """
+        retry_policy = retry_policy or self.retry_policy
+        if timeout is None:
+            timeout = retry_policy.timeout
+
+        attempt = 1
+        while True:
+            try:
+                response = await self._send(
+                    url, params, timeout, hedge_policy
+                )
+            except httpx.TransportError:
+                if not retry_policy.should_retry(attempt):
+                    raise
+                delay = retry_policy.delay(attempt)
+            else:
+                retry_after = response.headers.get("Retry-After")
+                if not retry_policy.should_retry(
+                    attempt, response.status_code, retry_after
+                ):
+                    break
+                delay = retry_policy.delay(attempt, retry_after)
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError:
+            try:
+                detail = self.decoder(response.content)
+            except ValueError:
+                detail = response.text
+            raise RequestError(response.status_code, detail)
+
+        return self.decoder(response.content)
+
+    async def _send(self, url: str, params: Dict, timeout: float,
+                    hedge_policy: HedgePolicy = None) -> httpx.Response:
+        """Send the request, and a duplicate if it's slower than usual.
+
+        The request that loses the race is cancelled.
+
+        Args:
+            url (str): URL for the request.
+            params (Dict): Parameters for the request.
+            timeout (float): Timeout for the request.
+            hedge_policy (HedgePolicy, optional): Hedging for this request.
+
+        Returns:
+            httpx.Response: The first response received.
+        """
+        threshold = hedge_policy.threshold() if hedge_policy else None
+        if threshold is None:
+            return await self._send_once(url, params, timeout, hedge_policy)
+
+        pending = {asyncio.ensure_future(
+            self._send_once(url, params, timeout, hedge_policy)
+        )}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=threshold)
+            if not done:
+                hedge_policy.hedged += 1
+                pending.add(asyncio.ensure_future(
+                    self._send_once(url, params, timeout, hedge_policy)
+                ))
+
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _send_once(self, url: str, params: Dict, timeout: float,
+                         hedge_policy: HedgePolicy = None) -> httpx.Response:
+        """Send the request, login again if the credentials were rejected.
+
+        Args:
+            url (str): URL for the request.
+            params (Dict): Parameters for the request.
+            timeout (float): Timeout for the request.
+            hedge_policy (HedgePolicy, optional): Record the latency here.
+
+        Returns:
+            httpx.Response: The response of the Belvo API.
+        """
+        start = time.perf_counter()
+        auth = self.session.auth
+        response = await self.session.get(
+            url, params=params, timeout=timeout
+        )
+        if response.status_code == 401 and await self._reauthenticate(auth):
+            response = await self.session.get(
+                url, params=params, timeout=timeout
+            )
+
+        if hedge_policy is not None:
+            hedge_policy.record(time.perf_counter() - start)
+        return response
+
+    async def get(self, endpoint: str, id: str, params: Dict = None,
+                  **policies) -> Dict:
+        """Make a GET request to the Belvo API.
+
+        Args:
+            endpoint (str): Endpoint for the request.
+            id (str): Id for the request.
+            params (Dict, optional): Parameters for the request.
+            **policies: `retry_policy` and `hedge_policy` for the request.
+
+        Returns:
+            Dict: Response data.
+        """
+        url = "{}{}{}/".format(self.url, endpoint, id)
+
+        return await self._get(url=url, params=params, **policies)
+
+    async def page(self, endpoint: str, params: Dict = None,
+                   cursor: str = None, page_size: int = None,
+                   **policies) -> Dict:
+        """Make a GET request for a single page of a List in the Belvo API.
+
+        Same arguments and result as `APISession.page`.
+
+        Args:
+            endpoint (str): Endpoint for the request.
+            params (Dict, optional): Parameters for the first page.
+            cursor (str, optional): Cursor of the page, `params` are ignored.
+            page_size (int, optional): Results per page, up to
+                `MAX_PAGE_SIZE`.
+            **policies: `retry_policy` and `hedge_policy` for the request.
+
+        Raises:
+            ValueError: If the cursor is not valid.
+
+        Returns:
+            Dict: The `count`, the `results` and the `next` cursor.
+        """
+        if cursor is not None:
+            params = decode_cursor(cursor)
+        url = "{}{}".format(self.url, endpoint)
+
+        data = await self._get(
+            url, params=page_params(params, page_size), **policies
+        )
+        return {**data, "next": encode_cursor(data["next"])}
+
+    async def _pages(self, url: str, params: Dict = None,
+                     max_pages: int = None, **policies) -> AsyncGenerator:
+        """Make the GET requests for every page, following `next`.
+
+        Args:
+            url (str): URL of the first page.
+            params (Dict, optional): Parameters for the first page.
+            max_pages (int, optional): Stop after this number of pages.
+            **policies: `retry_policy` and `hedge_policy` for the requests.
+
+        Yields:
+            AsyncGenerator: Response data of each page.
+        """
+        for number in count(1):
+            data = await self._get(url, params=params, **policies)
+            yield data
+
+            if not data["next"] or number == max_pages:
                 break
 
             url = data["next"]
             params = None
+
+    async def list(self, endpoint: str, params: Dict = None,
+                   prefetch: int = 0, page_size: int = None,
+                   max_pages: int = None, **policies) -> AsyncGenerator:
+        """Make a GET request to List in the Belvo API.
+
+        Create an async generator for the response data.
+        While the response has a `next` field, make a new request.
+
+        With `prefetch`, the next pages are requested in a background task
+        while the results of the current page are yielded.
+
+        Args:
+            endpoint (str): Endpoint for the request.
+            params (Dict, optional): Parameters for the request.
+            prefetch (int, optional): Max pages fetched ahead. Defaults to 0.
+            page_size (int, optional): Results per page, up to
+                `MAX_PAGE_SIZE`.
+            max_pages (int, optional): Stop after this number of pages.
+            **policies: `retry_policy` and `hedge_policy` for the requests.
+
+        Yields:
+            AsyncGenerator: Response data.
+        """
+        url = "{}{}".format(self.url, endpoint)
+        pages = self._pages(
+            url, params=page_params(params, page_size),
+            max_pages=max_pages, **policies
+        )
+        if prefetch > 0:
+            pages = _aprefetch(pages, prefetch)
+
+        async for data in pages:
+            for result in data["results"]:
+                yield result
+
+    async def aclose(self) -> None:
+        """Close the connections of the session."""
+        await self.session.aclose()
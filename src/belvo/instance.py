@@ -1,17 +1,90 @@
 """Module to create a Belvo Client instance."""
 
-from src.belvo.client import Client
+from threading import Lock
+from typing import Dict, Tuple, Type
+
+from src.belvo.client import AsyncClient, Client
 from src.core.config import Settings
 
 
+class ClientRegistry:
+    """Class `ClientRegistry` for share long-lived Belvo Clients.
+
+    Each Client performs the login only once, when it's created.
+    After that, the same Client (and its keep-alive connections) is reused
+    by every request of the process. Safe to use from several threads.
+    """
+
+    def __init__(self, client_class: Type[Client] = Client) -> None:
+        """Initialize the registry without any Client.
+
+        Args:
+            client_class (Type[Client], optional): Class used to create
+                the Clients. Defaults to Client.
+        """
+        self._client_class = client_class
+        self._clients: Dict[Tuple[str, str, str], Client] = {}
+        self._lock = Lock()
+
+    def get(self, secret_key_id: str,
+            secret_key_password: str, url: str) -> Client:
+        """Get the Client for the credentials, create it if not exists.
+
+        Args:
+            secret_key_id (str): Secret key id.
+            secret_key_password (str): Secret key password.
+            url (str): URL of the environment you want to connect to.
+
+        Returns:
+            Client: The shared Client for the credentials.
+        """
+        key = (url, secret_key_id, secret_key_password)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._client_class(
+                    secret_key_id, secret_key_password, url
+                )
+                self._clients[key] = client
+        return client
+
+    def clear(self) -> None:
+        """Forget all the Clients, the next `get` will login again."""
+        with self._lock:
+            self._clients.clear()
+
+
+# Process-wide registries of Belvo Clients
+registry = ClientRegistry()
+async_registry = ClientRegistry(AsyncClient)
+
+
 def get_belvo_client():
     """Get Belvo Client instance for Injection."""
     settings = Settings()
 
-    belvo_client = Client(
+    belvo_client = registry.get(
+        settings.BELVO_SECRET_ID,
+        settings.BELVO_SECRET_PASSWORD,
+        settings.BELVO_URL
+    )
+
+    return belvo_client
+
+
+async def get_async_belvo_client():
+    """Get Belvo AsyncClient instance (already logged in) for Injection."""
+    settings = Settings()
+
+    belvo_client = async_registry.get(
         settings.BELVO_SECRET_ID,
         settings.BELVO_SECRET_PASSWORD,
         settings.BELVO_URL
     )
+    await belvo_client.login()
 
     return belvo_client
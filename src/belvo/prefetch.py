@@ -0,0 +1,113 @@
+"""Module `prefetch` for fetch the next pages while the current is used.
+
+The pages of a list are requested one after the other, following `next`.
+Here the next pages are requested in background (a thread or a task),
+keeping at most `depth` pages ready, so the memory stays bounded.
+"""
+
+import asyncio
+from queue import Empty, Queue
+from threading import Event, Thread
+from typing import AsyncIterator, Iterator
+
+
+# Marks the end of the pages in the buffer
+_DONE = object()
+
+
+def prefetch(pages: Iterator, depth: int) -> Iterator:
+    """Iterate the pages while a thread fetches the next ones.
+
+    When the consumer leaves, the buffer is emptied so the thread puts at
+    most one more page, sees it has to stop and closes the pages.
+
+    Args:
+        pages (Iterator): Iterator of pages, consumed inside the thread.
+        depth (int): Max number of pages fetched ahead of the consumer.
+
+    Yields:
+        Iterator: The same pages, in the same order.
+
+    Raises:
+        Exception: Any error raised while fetching a page.
+    """
+    buffer = Queue(maxsize=depth)
+    stop = Event()
+
+    def producer() -> None:
+        """Fetch the pages and put them into the buffer."""
+        try:
+            for page in pages:
+                buffer.put((page, None))
+                if stop.is_set():
+                    return
+            buffer.put((_DONE, None))
+        except Exception as exc:
+            buffer.put((None, exc))
+        finally:
+            close = getattr(pages, "close", None)
+            if close is not None:
+                close()
+
+    Thread(target=producer, daemon=True).start()
+    try:
+        while True:
+            page, error = buffer.get()
+            if error is not None:
+                raise error
+            if page is _DONE:
+                return
+            yield page
+    finally:
+        stop.set()
+        # Make room for a put waiting in the thread
+        while True:
+            try:
+                buffer.get_nowait()
+            except Empty:
+                break
+
+
+async def aprefetch(pages: AsyncIterator, depth: int) -> AsyncIterator:
+    """Iterate the pages while a task fetches the next ones.
+
+    When the consumer leaves, the task is cancelled and the pages are
+    closed (`aclose`), so the requests in flight are cleaned up now.
+
+    Args:
+        pages (AsyncIterator): Async iterator of pages, consumed by the task.
+        depth (int): Max number of pages fetched ahead of the consumer.
+
+    Yields:
+        AsyncIterator: The same pages, in the same order.
+
+    Raises:
+        Exception: Any error raised while fetching a page.
+    """
+    buffer = asyncio.Queue(maxsize=depth)
+
+    async def producer() -> None:
+        """Fetch the pages and put them into the buffer."""
+        try:
+            async for page in pages:
+                await buffer.put((page, None))
+        except Exception as exc:
+            await buffer.put((None, exc))
+            return
+        await buffer.put((_DONE, None))
+
+    task = asyncio.ensure_future(producer())
+    try:
+        while True:
+            page, error = await buffer.get()
+            if error is not None:
+                raise error
+            if page is _DONE:
+                return
+            yield page
+    finally:
+        task.cancel()
+        await asyncio.wait([task])
+        aclose = getattr(pages, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -4,7 +4,7 @@ Thanks to: https://github.com/belvo-finance/belvo-python
 for this Great Implementation, I don't need all code for now.
 """
 
-from .accounts import Accounts  # noqa: F401
-from .links import Links  # noqa: F401
-from .owners import Owners  # noqa: F401
-from .transactions import Transactions  # noqa: F401
+from .accounts import Accounts, AsyncAccounts  # noqa: F401
+from .links import AsyncLinks, Links  # noqa: F401
+from .owners import AsyncOwners, Owners  # noqa: F401
+from .transactions import AsyncTransactions, Transactions  # noqa: F401
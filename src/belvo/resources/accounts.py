@@ -1,9 +1,15 @@
 """Resources for Accounts."""
 
-from src.belvo.resources.base import Resource
+from src.belvo.resources.base import AsyncResource, Resource
 
 
 class Accounts(Resource):
     """Class `Accounts` for manage the Belvo API resources."""
 
     endpoint = "/api/accounts/"
+    prefetch = 2
+    cache_ttl = 300
+
+
+class AsyncAccounts(Accounts, AsyncResource):
+    """Class `AsyncAccounts` for manage the Belvo API resources async."""
@@ -1,24 +1,146 @@
 """Module Base for Resources of Belvo API."""
 
-from typing import Dict, Generator
+import asyncio
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any, AsyncGenerator, Dict, Generator, Iterable, List, Tuple
+)
 
-from src.belvo.http import APISession
+from requests import HTTPError
+from src.belvo.exceptions import RequestError
+from src.belvo.http import APISession, AsyncAPISession, normalize_params
+from src.belvo.retry import HedgePolicy, RetryPolicy
+from src.core.cache import TTLCache
+
+
+def _found(id: str, data: Dict) -> Dict:
+    """Build the result of `get_many` for an object found."""
+    return {"id": id, "success": True, "data": data}
+
+
+def _failed(id: str, status_code: int, detail: Any) -> Dict:
+    """Build the result of `get_many` for an object that failed."""
+    return {
+        "id": id, "success": False,
+        "status_code": status_code, "detail": detail
+    }
+
+
+def _iter_copies(items: Iterable) -> Generator:
+    """Yield shallow copies of the items of a cached list.
+
+    The items were copied once when they were cached, so a caller can
+    change the fields of an item, but its nested values are shared and
+    must be treated as read-only.
+    """
+    for item in items:
+        yield copy.copy(item)
+
+
+async def _aiter(items: Iterable) -> AsyncGenerator:
+    """Yield copies of the items of a cached list from an async generator."""
+    for item in _iter_copies(items):
+        yield item
 
 
 class Resource:
     """Class `Resource` for manage the Belvo API resources."""
 
     endpoint: str
+    # Max pages requested ahead while listing, 0 disables the prefetch
+    prefetch: int = 0
+    # Seconds to keep the responses in the cache, 0 disables the cache
+    cache_ttl: float = 0
+    # Max items of a cached list, longer lists (e.g. streamed) aren't cached.
+    # Each list weighs its items, so a cache with `maxweight` bounds them all
+    cache_max_items: int = 1000
+    # Retries and hedging of the requests, None uses the session defaults
+    retry_policy: RetryPolicy = None
+    hedge_policy: HedgePolicy = None
+
+    def __init__(self, session: APISession, cache: TTLCache = None) -> None:
+        """Initialize the resource with the Belvo API.
 
-    def __init__(self, session: APISession) -> None:
-        """Initialize the resource with the Belvo API."""
+        Args:
+            session (APISession): Session for the requests.
+            cache (TTLCache, optional): Cache for the responses, shared
+                between the resources. Without cache, always call Belvo.
+        """
         self._session = session
+        self._cache = cache
 
     @property
     def session(self) -> APISession:
         """Obtain the session from the APISession."""
         return self._session
 
+    @property
+    def cache(self) -> TTLCache:
+        """Obtain the cache of the responses."""
+        return self._cache
+
+    @property
+    def _policies(self) -> Dict:
+        """Obtain the retry and hedge policies set for this resource."""
+        policies = {
+            "retry_policy": self.retry_policy,
+            "hedge_policy": self.hedge_policy,
+        }
+        return {
+            name: policy for name, policy in policies.items()
+            if policy is not None
+        }
+
+    @property
+    def _use_cache(self) -> bool:
+        """Check if the responses of this resource can be cached."""
+        return self._cache is not None and self.cache_ttl > 0
+
+    def invalidate(self, id: str = None) -> int:
+        """Remove the cached responses of this resource.
+
+        The lists are always removed, because they could include the object.
+
+        Args:
+            id (str, optional): Only remove the details of this object.
+
+        Returns:
+            int: Number of removed responses.
+        """
+        if self._cache is None:
+            return 0
+
+        def where(key: Tuple) -> bool:
+            """Match the cached responses of this resource."""
+            return key[0] == self.endpoint and (
+                id is None or key[1] == "list" or key[2] == id
+            )
+
+        return self._cache.invalidate(where=where)
+
+    def _collect(self, results: List, item: Dict) -> List:
+        """Add a copy of an item to a list to cache, None if it's too long."""
+        if results is None or len(results) >= self.cache_max_items:
+            return None
+        results.append(copy.deepcopy(item))
+        return results
+
+    def _cached_list(self, key: Tuple, items: Iterable) -> Generator:
+        """Yield the items and cache them if all of them were consumed.
+
+        The list is only cached if it has up to `cache_max_items`, so the
+        long lists are still streamed without holding them in memory.
+        """
+        results = []
+        for item in items:
+            results = self._collect(results, item)
+            yield item
+        if results is not None:
+            self._cache.set(
+                key, tuple(results), ttl=self.cache_ttl, weight=len(results)
+            )
+
     def get(self, id: str, **kwargs) -> Dict:
         """Get the details for a specific object.
 
@@ -28,9 +150,81 @@ class Resource:
         Returns:
             Dict: The details of the object.
         """
-        return self.session.get(self.endpoint, id, params=kwargs)
+        if not self._use_cache:
+            return self.session.get(
+                self.endpoint, id, params=kwargs, **self._policies
+            )
+
+        key = (self.endpoint, "get", id, normalize_params(kwargs))
+        data = self._cache.get(key)
+        if data is None:
+            data = self.session.get(
+                self.endpoint, id, params=kwargs, **self._policies
+            )
+            self._cache.set(key, copy.deepcopy(data), ttl=self.cache_ttl)
+            return data
+        return copy.copy(data)
+
+    def get_many(self, ids: List[str], max_concurrency: int = 10,
+                 **kwargs) -> List[Dict]:
+        """Get the details for several objects, in parallel.
+
+        The errors are reported in the result of each ID, instead of abort
+        the whole batch.
+
+        Args:
+            ids (List[str]): The IDs of the items you want to get.
+            max_concurrency (int, optional): Max requests at the same time.
+                Defaults to 10.
+
+        Returns:
+            List[Dict]: One result for each ID, in the same order. With
+                `success` True and the `data`, or False with the
+                `status_code` and `detail` of the error.
+        """
+        if not ids:
+            return []
+
+        def fetch(id: str) -> Dict:
+            """Get one object and catch its error."""
+            try:
+                return _found(id, self.get(id, **kwargs))
+            except HTTPError as http_err:
+                try:
+                    detail = http_err.response.json()
+                except ValueError:
+                    detail = http_err.response.text
+                return _failed(id, http_err.response.status_code, detail)
+            except Exception as exc:
+                return _failed(id, None, str(exc))
+
+        workers = max(1, min(max_concurrency, len(ids)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(fetch, ids))
+
+    def page(self, cursor: str = None, page_size: int = None,
+             **kwargs) -> Dict:
+        """Get a single page of items for the given resource.
+
+        Unlike `list`, only one request is made. Use the `next` cursor of
+        the result to get the following page.
+
+        Args:
+            cursor (str, optional): Cursor of the page, from the `next` of
+                the previous page. Without it, get the first page.
+            page_size (int, optional): Results per page, up to
+                `MAX_PAGE_SIZE`.
+
+        Returns:
+            Dict: The `count`, the `results` and the `next` cursor.
+        """
+        return self.session.page(
+            self.endpoint, params=kwargs, cursor=cursor,
+            page_size=page_size, **self._policies
+        )
 
-    def list(self, **kwargs) -> Generator:
+    def list(self, page_size: int = None, max_pages: int = None,
+             **kwargs) -> Generator:
         """List all items for the given resource.
 
         Allow to list all items for a given resource.
@@ -54,6 +248,11 @@ class Resource:
         All allowed filters are listed in our API reference documentation.
         Check for more in: https://developers.belvo.com/reference/listlinks.
 
+        Args:
+            page_size (int, optional): Results per page, up to
+                `MAX_PAGE_SIZE`. Bigger pages need fewer requests.
+            max_pages (int, optional): Stop after this number of pages.
+
         Returns:
             _type_: _description_
 
@@ -61,4 +260,154 @@ class Resource:
             Generator: _description_
         """
         endpoint = self.endpoint
-        return self.session.list(endpoint, params=kwargs)
+        options = {"page_size": page_size, "max_pages": max_pages}
+        if not self._use_cache:
+            return self.session.list(
+                endpoint, params=kwargs, prefetch=self.prefetch,
+                **options, **self._policies
+            )
+
+        params = normalize_params({**kwargs, **options})
+        key = (endpoint, "list", None, params)
+        results = self._cache.get(key)
+        if results is not None:
+            return _iter_copies(results)
+        return self._cached_list(key, self.session.list(
+            endpoint, params=kwargs, prefetch=self.prefetch,
+            **options, **self._policies
+        ))
+
+
+class AsyncResource(Resource):
+    """Class `AsyncResource` for manage the Belvo API resources async.
+
+    Same interface as `Resource`, but `get` must be awaited and `list`
+    returns an async generator. Combine it with a concrete resource, e.g.
+    `class AsyncAccounts(Accounts, AsyncResource)`, to reuse its endpoint.
+    """
+
+    def __init__(self, session: AsyncAPISession,
+                 cache: TTLCache = None) -> None:
+        """Initialize the resource with the Belvo API.
+
+        Args:
+            session (AsyncAPISession): Session for the requests.
+            cache (TTLCache, optional): Cache for the responses.
+        """
+        self._session = session
+        self._cache = cache
+
+    @property
+    def session(self) -> AsyncAPISession:
+        """Obtain the session from the AsyncAPISession."""
+        return self._session
+
+    async def _cached_list(self, key: Tuple,
+                           items: AsyncGenerator) -> AsyncGenerator:
+        """Yield the items and cache them, like `Resource._cached_list`."""
+        results = []
+        async for item in items:
+            results = self._collect(results, item)
+            yield item
+        if results is not None:
+            self._cache.set(
+                key, tuple(results), ttl=self.cache_ttl, weight=len(results)
+            )
+
+    async def get(self, id: str, **kwargs) -> Dict:
+        """Get the details for a specific object.
+
+        Args:
+            id (str): The ID of the item you want to get details for (UUID).
+
+        Returns:
+            Dict: The details of the object.
+        """
+        if not self._use_cache:
+            return await self.session.get(
+                self.endpoint, id, params=kwargs, **self._policies
+            )
+
+        key = (self.endpoint, "get", id, normalize_params(kwargs))
+        data = self._cache.get(key)
+        if data is None:
+            data = await self.session.get(
+                self.endpoint, id, params=kwargs, **self._policies
+            )
+            self._cache.set(key, copy.deepcopy(data), ttl=self.cache_ttl)
+            return data
+        return copy.copy(data)
+
+    async def get_many(self, ids: List[str], max_concurrency: int = 10,
+                       **kwargs) -> List[Dict]:
+        """Get the details for several objects, concurrently.
+
+        Same results as `Resource.get_many`.
+
+        Args:
+            ids (List[str]): The IDs of the items you want to get.
+            max_concurrency (int, optional): Max requests at the same time.
+                Defaults to 10.
+
+        Returns:
+            List[Dict]: One result for each ID, in the same order.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def fetch(id: str) -> Dict:
+            """Get one object and catch its error."""
+            async with semaphore:
+                try:
+                    return _found(id, await self.get(id, **kwargs))
+                except RequestError as req_err:
+                    return _failed(id, req_err.status_code, req_err.detail)
+                except Exception as exc:
+                    return _failed(id, None, str(exc))
+
+        return list(await asyncio.gather(*[fetch(id) for id in ids]))
+
+    async def page(self, cursor: str = None, page_size: int = None,
+                   **kwargs) -> Dict:
+        """Get a single page of items for the given resource.
+
+        Same arguments and result as `Resource.page`.
+
+        Returns:
+            Dict: The `count`, the `results` and the `next` cursor.
+        """
+        return await self.session.page(
+            self.endpoint, params=kwargs, cursor=cursor,
+            page_size=page_size, **self._policies
+        )
+
+    def list(self, page_size: int = None, max_pages: int = None,
+             **kwargs) -> AsyncGenerator:
+        """List all items for the given resource.
+
+        Same filters as `Resource.list`, consume it with `async for`.
+
+        Args:
+            page_size (int, optional): Results per page, up to
+                `MAX_PAGE_SIZE`.
+            max_pages (int, optional): Stop after this number of pages.
+
+        Returns:
+            AsyncGenerator: An async generator that will yield each item.
+        """
+        endpoint = self.endpoint
+        options = {"page_size": page_size, "max_pages": max_pages}
+        if not self._use_cache:
+            return self.session.list(
+                endpoint, params=kwargs, prefetch=self.prefetch,
+                **options, **self._policies
+            )
+
+        params = normalize_params({**kwargs, **options})
+        key = (endpoint, "list", None, params)
+        results = self._cache.get(key)
+        if results is not None:
+            return _aiter(results)
+        return self._cached_list(key, self.session.list(
+            endpoint, params=kwargs, prefetch=self.prefetch,
+            **options, **self._policies
+        ))
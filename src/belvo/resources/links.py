@@ -1,9 +1,14 @@
 """Resources for Links."""
 
-from src.belvo.resources.base import Resource
+from src.belvo.resources.base import AsyncResource, Resource
 
 
 class Links(Resource):
     """Class `Links` for manage the Belvo API resources."""
 
     endpoint = "/api/links/"
+    cache_ttl = 600
+
+
+class AsyncLinks(Links, AsyncResource):
+    """Class `AsyncLinks` for manage the Belvo API resources async."""
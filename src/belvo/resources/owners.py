@@ -1,9 +1,14 @@
 """Resources for Owners."""
 
-from src.belvo.resources.base import Resource
+from src.belvo.resources.base import AsyncResource, Resource
 
 
 class Owners(Resource):
     """Class `Owners` for manage the Belvo API resources."""
 
     endpoint = "/api/owners/"
+    cache_ttl = 600
+
+
+class AsyncOwners(Owners, AsyncResource):
+    """Class `AsyncOwners` for manage the Belvo API resources async."""
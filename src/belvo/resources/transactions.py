@@ -1,14 +1,18 @@
 """Resources for Transactions."""
 
-from typing import Generator
+from typing import Dict, Generator
 
-from src.belvo.resources.base import Resource
+from src.belvo.resources.base import AsyncResource, Resource
+from src.belvo.retry import RetryPolicy
 
 
 class Transactions(Resource):
     """Class `Transactions` for manage the Belvo API resources."""
 
     endpoint = "/api/transactions/"
+    prefetch = 2
+    # The pages of transactions are big, give them more time
+    retry_policy = RetryPolicy(timeout=15)
 
     def list(self, link, **kwargs) -> Generator:
         """List all Transactions for the given Link.
@@ -18,5 +22,30 @@ class Transactions(Resource):
 
         Returns:
             Generator: A generator object that will yield each Transaction.
+            With `AsyncTransactions` it's an async generator instead.
         """
         return super().list(link=link, **kwargs)
+
+    def page(self, link: str = None, cursor: str = None,
+             page_size: int = None, **kwargs) -> Dict:
+        """Get a single page of Transactions for the given Link.
+
+        Args:
+            link (str, optional): The ID of the Link to get Transactions for
+                (UUID). Not needed with a cursor, it's already included.
+            cursor (str, optional): Cursor of the page, from the `next` of
+                the previous page.
+            page_size (int, optional): Transactions per page, up to
+                `MAX_PAGE_SIZE`.
+
+        Returns:
+            Dict: The `count`, the `results` and the `next` cursor.
+            With `AsyncTransactions` it must be awaited.
+        """
+        return super().page(
+            cursor=cursor, page_size=page_size, link=link, **kwargs
+        )
+
+
+class AsyncTransactions(Transactions, AsyncResource):
+    """Class `AsyncTransactions` for manage the Belvo API resources async."""
@@ -0,0 +1,149 @@
+"""Module `retry` for configure the retries and hedging of the requests.
+
+Retries repeat a request that failed with a transient error, waiting a
+jittered exponential backoff (or the `Retry-After` sent by Belvo).
+Hedging sends a duplicate of a request that is slower than usual (over a
+percentile of the recent latencies), and uses the first response.
+"""
+
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Optional
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse the `Retry-After` header, in seconds or as an HTTP date.
+
+    Args:
+        value (Optional[str]): Value of the header.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if it's missing/invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Class `RetryPolicy` for configure the retries of a request."""
+
+    def __init__(self, attempts: int = 3, timeout: float = 5,
+                 backoff: float = 0.2, max_backoff: float = 5,
+                 max_retry_after: float = 30,
+                 statuses: Iterable[int] = (429, 500, 502, 503, 504)
+                 ) -> None:
+        """Initialize the policy.
+
+        Args:
+            attempts (int, optional): Max attempts, including the first one.
+                Defaults to 3, use 1 to disable the retries.
+            timeout (float, optional): Timeout of each attempt. Defaults to 5.
+            backoff (float, optional): Base seconds of the exponential
+                backoff. Defaults to 0.2.
+            max_backoff (float, optional): Max seconds of the backoff.
+                Defaults to 5.
+            max_retry_after (float, optional): Max seconds to honor from
+                `Retry-After`, longer waits are not retried. Defaults to 30.
+            statuses (Iterable[int], optional): HTTP status to retry.
+        """
+        self.attempts = max(1, attempts)
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.statuses = frozenset(statuses)
+
+    def should_retry(self, attempt: int, status_code: int = None,
+                     retry_after: str = None) -> bool:
+        """Check if the attempt can be retried.
+
+        Args:
+            attempt (int): Number of the failed attempt, starting at 1.
+            status_code (int, optional): Status of the response, None for
+                connection errors and timeouts.
+            retry_after (str, optional): Value of the `Retry-After` header.
+
+        Returns:
+            bool: True if a new attempt must be done.
+        """
+        if attempt >= self.attempts:
+            return False
+        if status_code is not None and status_code not in self.statuses:
+            return False
+        seconds = retry_after_seconds(retry_after)
+        return seconds is None or seconds <= self.max_retry_after
+
+    def delay(self, attempt: int, retry_after: str = None) -> float:
+        """Obtain the seconds to wait before the next attempt.
+
+        Use the `Retry-After` of Belvo if exists, otherwise a random wait
+        up to the exponential backoff (full jitter).
+
+        Args:
+            attempt (int): Number of the failed attempt, starting at 1.
+            retry_after (str, optional): Value of the `Retry-After` header.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        seconds = retry_after_seconds(retry_after)
+        if seconds is not None:
+            return seconds
+        ceiling = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+
+class HedgePolicy:
+    """Class `HedgePolicy` for send a duplicate of the slow requests.
+
+    Keep the latencies of the recent requests. When a request takes longer
+    than the percentile of those latencies, a duplicate is sent and the
+    first response wins.
+    """
+
+    def __init__(self, percentile: float = 95, min_samples: int = 20,
+                 window: int = 200, min_delay: float = 0.05) -> None:
+        """Initialize the policy without latencies.
+
+        Args:
+            percentile (float, optional): Percentile of the latencies used
+                as threshold for the duplicate. Defaults to 95.
+            min_samples (int, optional): Latencies needed before hedging.
+                Defaults to 20.
+            window (int, optional): Number of recent latencies to keep.
+                Defaults to 200.
+            min_delay (float, optional): Min seconds before the duplicate.
+                Defaults to 0.05.
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.hedged = 0
+        self._latencies = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        """Save the latency of a completed request."""
+        self._latencies.append(seconds)
+
+    def threshold(self) -> Optional[float]:
+        """Obtain the seconds to wait before send the duplicate.
+
+        Returns:
+            Optional[float]: Seconds, or None if there aren't enough
+                latencies yet to know what is slow.
+        """
+        latencies = sorted(self._latencies)
+        if len(latencies) < self.min_samples:
+            return None
+        index = round(self.percentile / 100 * (len(latencies) - 1))
+        return max(self.min_delay, latencies[index])
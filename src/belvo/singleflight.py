@@ -0,0 +1,106 @@
+"""Module `singleflight` for share identical requests made at the same time.
+
+When several callers ask for the same key while a call is in flight, only
+the first one (the leader) makes the call; the others wait for it and
+receive the same result (or the same exception).
+"""
+
+import asyncio
+from threading import Event, Lock
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    """Class `_Call` for keep the state of an in-flight call."""
+
+    def __init__(self) -> None:
+        """Initialize the call without result."""
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Class `SingleFlight` for coalesce identical calls from threads."""
+
+    def __init__(self) -> None:
+        """Initialize without in-flight calls."""
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = Lock()
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Call `fn`, or wait for the in-flight call with the same key.
+
+        Args:
+            key (Hashable): Identify the identical calls.
+            fn (Callable): Make the call, only executed by the leader.
+
+        Returns:
+            Any: The result of the call.
+
+        Raises:
+            Exception: The exception raised by the call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """Class `AsyncSingleFlight` for coalesce identical calls from tasks."""
+
+    def __init__(self) -> None:
+        """Initialize without in-flight calls."""
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable,
+                 fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `fn()`, or wait for the in-flight call with the same key.
+
+        The call runs in its own task, so if a caller is cancelled the
+        other callers still receive the result.
+
+        Args:
+            key (Hashable): Identify the identical calls.
+            fn (Callable): Create the awaitable, only called by the leader.
+
+        Returns:
+            Any: The result of the call.
+
+        Raises:
+            Exception: The exception raised by the call.
+        """
+        # The tasks can't be shared between event loops
+        key = (id(asyncio.get_running_loop()), key)
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
@@ -1,14 +1,21 @@
 """Module `auth` for all the accounts logic."""
 
+import hashlib
 import logging
+import time
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 
 from decouple import config
 from fastapi import HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from sqlalchemy import event, inspect
+from src.core.cache import TTLCache
+from src.core.hashing import (
+    HashingPool, QueueFullError, configured_rounds, password_context
+)
 from src.models.user import User
 from src.schemas.user_schema import UserRequest
 
@@ -16,14 +23,39 @@ from src.schemas.user_schema import UserRequest
 ALGORITHM = "HS256"
 TOKEN_EXPIRE_MINUTES = 30
 SECRET_KEY = config('SECRET_KEY', 'ACCESS_SECRET_KEY')
+PRINCIPAL_CACHE_SIZE = config('PRINCIPAL_CACHE_SIZE', default=1024, cast=int)
+TOKEN_CACHE_SIZE = config('TOKEN_CACHE_SIZE', default=1024, cast=int)
+SELF_CONTAINED_TOKENS = config('SELF_CONTAINED_TOKENS', default=False,
+                               cast=bool)
+# Seconds to trust the version of a user known by this process
+TOKEN_VERSION_TTL = config('TOKEN_VERSION_TTL', default=60, cast=float)
+
+
+def token_digest(token: str) -> bytes:
+    """Obtain the digest of a token, to key the caches without the token."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def token_ttl(claims: dict, ttl: float) -> float:
+    """Obtain the seconds to cache a token, no longer than its `exp`."""
+    if isinstance(claims.get("exp"), (int, float)):
+        return min(ttl, claims["exp"] - time.time())
+    return ttl
 
 
 class AuthHandler:
     """Class for the authentication logic."""
 
-    def __init__(self):
-        """Initialize the database."""
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    def __init__(self, token_cache: TTLCache = None):
+        """Initialize the database.
+
+        Args:
+            token_cache (TTLCache, optional): Claims of the verified tokens,
+                by their digest. Defaults to a cache of `TOKEN_CACHE_SIZE`.
+        """
+        self.pwd_context = password_context(configured_rounds())
+        self.token_cache = token_cache if token_cache is not None \
+            else TTLCache(TOKEN_CACHE_SIZE, TOKEN_EXPIRE_MINUTES * 60)
 
     def verify_password(
             self, plain_password: str, hashed_password: str) -> bool:
@@ -34,6 +66,32 @@ class AuthHandler:
         """Obtain the hash of a password."""
         return self.pwd_context.hash(password)
 
+    def verify_and_update(self, plain_password: str,
+                          hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Compare the passwords, hash it again if the hash is outdated."""
+        return self.pwd_context.verify_and_update(
+            plain_password, hashed_password
+        )
+
+    async def verify_and_update_async(
+            self, plain_password: str,
+            hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Like `verify_and_update`, in the hashing pool."""
+        return await hashing_pool.verify_and_update(
+            self.pwd_context, plain_password, hashed_password
+        )
+
+    async def verify_password_async(
+            self, plain_password: str, hashed_password: str) -> bool:
+        """Compare the passwords in the hashing pool, see `HashingPool`."""
+        return await hashing_pool.verify(
+            self.pwd_context, plain_password, hashed_password
+        )
+
+    async def get_password_hash_async(self, password: str) -> str:
+        """Obtain the hash of a password in the hashing pool."""
+        return await hashing_pool.hash(self.pwd_context, password)
+
     def create_access_token(self, data: dict) -> str:
         """Create a JWT for access token.
 
@@ -46,16 +104,35 @@ class AuthHandler:
         return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
     def decode_access_token(self, token: str) -> dict:
-        """Decode a JWT access token."""
+        """Decode a JWT access token.
+
+        The claims of a verified token are cached by its digest until it
+        expires (`exp`), so the same token isn't verified again.
+        """
+        key = token_digest(token)
+        claims = self.token_cache.get(key)
+        if claims is not None:
+            return dict(claims)
+
         try:
-            return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         except JWTError as e:
             logging.error(e)
             return None
 
+        self.token_cache.set(
+            key, dict(claims), ttl=token_ttl(claims, self.token_cache.ttl)
+        )
+        return claims
+
 
 # Create an instance of the class
 auth = AuthHandler()
+hashing_pool = HashingPool.from_env()
+# (username, digest of the token) -> principal, see `get_current_user`
+principal_cache = TTLCache(PRINCIPAL_CACHE_SIZE, TOKEN_EXPIRE_MINUTES * 60)
+# username -> current `token_version`, for the self-contained tokens
+token_versions = TTLCache(PRINCIPAL_CACHE_SIZE, TOKEN_VERSION_TTL)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="v1/auth/token")
 
 
@@ -85,25 +162,18 @@ def get_user_by_email(email: str, db: Session) -> User:
     return db.query(User).filter(User.email == email).first()
 
 
-def register_new_user(user_data: UserRequest, db: Session) -> User:
-    """Register a new user in the database.
-
-    Before register a new user, check if the username or email already exists.
-
-    Args:
-        user_data (UserRequest): User Data.
-        db (Session): Database Session.
-
-    Returns:
-        User: Model User.
-    """
+def _check_new_user(user_data: UserRequest, db: Session) -> None:
+    """Check that the username and email of a new user are not in use."""
     if get_user_by_username(user_data.username, db)\
             or get_user_by_email(user_data.email, db):
         raise HTTPException(
             status_code=400, detail="Username or email already in use"
         )
 
-    hashed_password = auth.get_password_hash(user_data.password)
+
+def _save_new_user(user_data: UserRequest, hashed_password: str,
+                   db: Session) -> User:
+    """Save a new user with the hash of its password."""
     new_user = User(username=user_data.username,
                     email=user_data.email,
                     hashed_password=hashed_password)
@@ -119,12 +189,146 @@ def register_new_user(user_data: UserRequest, db: Session) -> User:
             status_code=500, detail="Error registering new user"
         )
 
+    # A user with the same username could have been deleted before
+    invalidate_user(new_user.username)
     return new_user
 
 
+def _principal(user: User) -> User:
+    """Copy the user without a session (nor password), to cache it."""
+    return User(id=user.id, username=user.username, email=user.email)
+
+
+def token_claims(user: User) -> dict:
+    """Obtain the claims of the access token of a user.
+
+    With `SELF_CONTAINED_TOKENS`, the token also has the id, email and
+    `token_version` of the user, so `get_current_user` can answer from the
+    claims alone while the version is current.
+
+    Args:
+        user (User): Model User.
+
+    Returns:
+        dict: Claims for `AuthHandler.create_access_token`.
+    """
+    if not SELF_CONTAINED_TOKENS:
+        return {"sub": user.username}
+    return {
+        "sub": user.username, "uid": user.id, "email": user.email,
+        "ver": user.token_version or 0,
+    }
+
+
+def invalidate_user(username: str) -> int:
+    """Forget the cached principals of a user, e.g. when it changes.
+
+    Args:
+        username (str): Username.
+
+    Returns:
+        int: Number of forgotten principals (one by token).
+    """
+    token_versions.invalidate(username)
+    return principal_cache.invalidate(where=lambda key: key[0] == username)
+
+
+@event.listens_for(User, "before_update")
+def _increase_token_version(mapper, connection, target: User) -> None:
+    """Revoke the tokens of a user whose credentials or claims change."""
+    state = inspect(target)
+    if any(
+        state.attrs[name].history.has_changes()
+        for name in ("username", "email", "hashed_password")
+    ):
+        target.token_version = (target.token_version or 0) + 1
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User) -> None:
+    """Forget the cached principals of a user updated or deleted."""
+    history = inspect(target).attrs["username"].history
+    for username in {target.username, *(history.deleted or ())}:
+        invalidate_user(username)
+
+
+def _pool_busy(exc: QueueFullError) -> HTTPException:
+    """Convert a full hashing pool to an error of the API."""
+    logging.warning(exc)
+    return HTTPException(
+        status_code=503, detail="Too many requests, try again later"
+    )
+
+
+def register_new_user(user_data: UserRequest, db: Session) -> User:
+    """Register a new user in the database.
+
+    Before register a new user, check if the username or email already exists.
+
+    Args:
+        user_data (UserRequest): User Data.
+        db (Session): Database Session.
+
+    Returns:
+        User: Model User.
+    """
+    _check_new_user(user_data, db)
+    hashed_password = auth.get_password_hash(user_data.password)
+    return _save_new_user(user_data, hashed_password, db)
+
+
+async def register_new_user_async(user_data: UserRequest,
+                                  db: Session) -> User:
+    """Register a new user, hashing its password in the hashing pool.
+
+    Like `register_new_user`, for the `async` endpoints.
+
+    Args:
+        user_data (UserRequest): User Data.
+        db (Session): Database Session.
+
+    Raises:
+        HTTPException: 503 if the hashing pool is full.
+
+    Returns:
+        User: Model User.
+    """
+    _check_new_user(user_data, db)
+    try:
+        hashed_password = await auth.get_password_hash_async(
+            user_data.password
+        )
+    except QueueFullError as exc:
+        raise _pool_busy(exc)
+    return _save_new_user(user_data, hashed_password, db)
+
+
+def _rehash_user(user: User, new_hash: Optional[str], db: Session) -> None:
+    """Save the new hash of a password whose old hash was outdated.
+
+    The hash is updated with a query, not the model, so the change isn't
+    seen as a new password and the tokens of the user aren't revoked.
+    A failure is only logged, the login goes on with the old hash.
+    """
+    if new_hash is None:
+        return
+    try:
+        db.query(User).filter(User.id == user.id).update(
+            {User.hashed_password: new_hash}, synchronize_session=False
+        )
+        db.commit()
+    except Exception as e:
+        logging.error(e)
+        db.rollback()
+
+
 def authenticate_user(username: str, password: str, db: Session) -> User:
     """Authenticate a user with a username and password.
 
+    If the hash of the password is outdated (e.g. less rounds than the
+    configured ones), the password is hashed again and saved.
+
     Args:
         username (str): Username.
         password (str): Password.
@@ -134,16 +338,96 @@ def authenticate_user(username: str, password: str, db: Session) -> User:
         User: Model User.
     """
     user = get_user_by_username(username, db)
-    if not user or not auth.verify_password(password, user.hashed_password):  # noqa: E501
+    valid, new_hash = False, None
+    if user is not None:
+        valid, new_hash = auth.verify_and_update(
+            password, user.hashed_password
+        )
+    if not valid:
         raise HTTPException(
             status_code=401, detail="Incorrect username or password"
         )
+    _rehash_user(user, new_hash, db)
     return user
 
 
+async def authenticate_user_async(username: str, password: str,
+                                  db: Session) -> User:
+    """Authenticate a user, verifying its password in the hashing pool.
+
+    Like `authenticate_user`, for the `async` endpoints.
+
+    Args:
+        username (str): Username.
+        password (str): Password.
+        db (Session): Database Session.
+
+    Raises:
+        HTTPException: 503 if the hashing pool is full.
+
+    Returns:
+        User: Model User.
+    """
+    user = get_user_by_username(username, db)
+    valid, new_hash = False, None
+    try:
+        if user is not None:
+            valid, new_hash = await auth.verify_and_update_async(
+                password, user.hashed_password
+            )
+    except QueueFullError as exc:
+        raise _pool_busy(exc)
+    if not valid:
+        raise HTTPException(
+            status_code=401, detail="Incorrect username or password"
+        )
+    _rehash_user(user, new_hash, db)
+    return user
+
+
+def _claims_principal(payload: dict, db: Session) -> User:
+    """Get the user of a self-contained token.
+
+    The user is built from the claims while its version is the current one
+    (known by this process for `TOKEN_VERSION_TTL` seconds), otherwise the
+    version is checked in the database.
+
+    Args:
+        payload (dict): Claims of the token, with `ver`.
+        db (Session): Database Session.
+
+    Raises:
+        HTTPException: 401 if the token has an old version, 404 if the user
+            is not found.
+
+    Returns:
+        User: Model User, without session if built from the claims.
+    """
+    username = payload["sub"]
+    if token_versions.get(username) != payload["ver"]:
+        user = get_user_by_username(username, db)
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        token_versions.set(username, user.token_version or 0)
+        if (user.token_version or 0) != payload["ver"]:
+            raise HTTPException(status_code=401, detail="Token revoked")
+        return user
+
+    return User(
+        id=payload.get("uid"), username=username, email=payload.get("email"),
+        token_version=payload["ver"]
+    )
+
+
 def get_current_user(token: str, db: Session) -> User:
     """Get the current user from the database.
 
+    The user of each token is cached (as a copy without session) until the
+    token expires, so the next requests with the same token don't query
+    the database. See `invalidate_user` and `principal_cache.stats()`.
+    The user of a self-contained token (see `token_claims`) is built from
+    its claims instead.
+
     Args:
         token (str): JWT Token.
         db (Session): Database Session.
@@ -159,8 +443,19 @@ def get_current_user(token: str, db: Session) -> User:
     if username is None:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    if "ver" in payload:
+        return _claims_principal(payload, db)
+
+    key = (username, token_digest(token))
+    principal = principal_cache.get(key)
+    if principal is not None:
+        return principal
+
     user = db.query(User).filter(User.username == username).first()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
+    principal_cache.set(
+        key, _principal(user), ttl=token_ttl(payload, principal_cache.ttl)
+    )
     return user
@@ -0,0 +1,148 @@
+"""Module `cache` for keep values in memory for a limited time."""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """Class `TTLCache` for a bounded in-memory cache with expiration.
+
+    Each value expires after its time to live (TTL). When the cache is full,
+    the least recently used value is evicted (LRU). Besides the number of
+    values, their total weight can be bounded (e.g. the items of the cached
+    lists), so a few big values can't take all the memory. Keep counters of
+    hits and misses to measure its effectiveness. Safe to use from threads.
+
+    Any object with the same `get`, `set` and `invalidate` methods can be
+    plugged where a `TTLCache` is expected (e.g. a Redis backed cache).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300,
+                 maxweight: int = None) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            maxsize (int, optional): Max number of values. Defaults to 1024.
+            ttl (float, optional): Default seconds to live. Defaults to 300.
+            maxweight (int, optional): Max total weight of the values, see
+                `set`. Defaults to unbounded.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxweight = maxweight
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        """Obtain the number of values (some could be already expired)."""
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get the value of the key, if it's not expired.
+
+        Args:
+            key (Hashable): Key of the value.
+
+        Returns:
+            Optional[Any]: The value, or None if it's missing or expired.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= time.monotonic():
+                if item is not None:
+                    self._pop(key)
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float = None,
+            weight: int = 1) -> None:
+        """Save the value of the key, evict the oldest if the cache is full.
+
+        Args:
+            key (Hashable): Key of the value.
+            value (Any): Value to save, None values are not cached.
+            ttl (float, optional): Seconds to live. Defaults to `self.ttl`.
+            weight (int, optional): Weight of the value, e.g. the items of a
+                list. Values heavier than `maxweight` are not cached.
+                Defaults to 1.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if value is None or ttl <= 0 or self.maxsize <= 0:
+            return
+        if self.maxweight is not None and weight > self.maxweight:
+            return
+
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (time.monotonic() + ttl, value, weight)
+            self.weight += weight
+            while len(self._data) > self.maxsize or (
+                self.maxweight is not None and self.weight > self.maxweight
+            ):
+                self._pop(next(iter(self._data)))
+                self.evictions += 1
+
+    def _pop(self, key: Hashable) -> Optional[tuple]:
+        """Remove the item of the key and its weight, with the lock held."""
+        item = self._data.pop(key, None)
+        if item is not None:
+            self.weight -= item[2]
+        return item
+
+    def invalidate(self, key: Hashable = None,
+                   where: Callable[[Hashable], bool] = None) -> int:
+        """Remove values from the cache.
+
+        Without arguments remove all the values.
+
+        Args:
+            key (Hashable, optional): Remove only the value of this key.
+            where (Callable, optional): Remove the values whose key
+                matches this predicate.
+
+        Returns:
+            int: Number of removed values.
+        """
+        with self._lock:
+            if key is not None:
+                return 1 if self._pop(key) is not None else 0
+
+            if where is None:
+                removed = len(self._data)
+                self._data.clear()
+                self.weight = 0
+                return removed
+
+            keys = [cached for cached in self._data if where(cached)]
+            for cached in keys:
+                self._pop(cached)
+            return len(keys)
+
+    def stats(self) -> Dict[str, float]:
+        """Obtain the counters of the cache.
+
+        Returns:
+            Dict[str, float]: Hits, misses, evictions, size, weight and hit
+                ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "weight": self.weight,
+            "maxweight": self.maxweight,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
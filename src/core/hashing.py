@@ -0,0 +1,359 @@
+"""Module `hashing` for hash and verify passwords out of the event loop.
+
+A bcrypt hash takes ~100-300 ms of CPU by design. Called from an `async`
+endpoint it blocks the event loop, and every other request waits. The
+`HashingPool` runs the hashes in a bounded pool of threads (bcrypt releases
+the GIL) or processes, limits the calls waiting for a worker, and counts
+them (queue depth) to size the pool.
+
+The size of the pool is configured with the environment variables:
+
++ HASHING_WORKERS = Workers of the pool. Defaults to 2.
++ HASHING_MAX_QUEUE = Max calls waiting for a worker, the others are
+  rejected (0 is unbounded). Defaults to 64.
++ HASHING_EXECUTOR = `thread` or `process`. Defaults to `thread`.
+
+The cost of bcrypt (its rounds) is configured with BCRYPT_ROUNDS, `auto`
+calibrates it at startup to hash in about BCRYPT_TARGET_MS milliseconds
+(defaults to 250). Without it, the default of passlib is used. The rounds
+for the current hardware can be printed with:
+
+```bash
+python -m src.core.hashing --target-ms 250
+```
+"""
+
+import argparse
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from decouple import config
+from passlib.context import CryptContext
+
+
+EXECUTORS = ("thread", "process")
+
+# Valid rounds of bcrypt, each round doubles the cost of a hash
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+
+class QueueFullError(Exception):
+    """Exception raised when too many calls are waiting for a worker."""
+
+
+@lru_cache(maxsize=8)
+def _context(settings: str) -> CryptContext:
+    """Build (once per worker) the context of its settings."""
+    return CryptContext.from_string(settings)
+
+
+def _hash(settings: str, password: str) -> str:
+    """Hash a password with the context of the settings."""
+    return _context(settings).hash(password)
+
+
+def _verify(settings: str, password: str, hashed: str) -> bool:
+    """Verify a password with the context of the settings."""
+    return _context(settings).verify(password, hashed)
+
+
+def _verify_and_update(settings: str, password: str,
+                       hashed: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password, and hash it again if its hash is outdated."""
+    return _context(settings).verify_and_update(password, hashed)
+
+
+def hash_seconds(rounds: int, samples: int = 3) -> float:
+    """Measure the seconds of a bcrypt hash with the rounds.
+
+    Args:
+        rounds (int): Rounds of bcrypt.
+        samples (int, optional): Hashes to measure, the fastest is kept.
+            Defaults to 3.
+
+    Returns:
+        float: Seconds of the fastest hash.
+    """
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash("calibration password")
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def calibrate_rounds(target_ms: float = 250, min_rounds: int = 10,
+                     max_rounds: int = 16) -> int:
+    """Find the bcrypt rounds whose hash takes about the target time.
+
+    The rounds increase (each one doubles the time) while the hash is
+    faster than the target, so the chosen rounds are the highest that
+    don't pass it, but never less than `min_rounds`.
+
+    Args:
+        target_ms (float, optional): Target milliseconds of a hash.
+            Defaults to 250.
+        min_rounds (int, optional): Min rounds, for security. Defaults
+            to 10.
+        max_rounds (int, optional): Max rounds. Defaults to 16.
+
+    Raises:
+        ValueError: If the range of rounds is invalid.
+
+    Returns:
+        int: The rounds for the `CryptContext`.
+    """
+    if not MIN_ROUNDS <= min_rounds <= max_rounds <= MAX_ROUNDS:
+        raise ValueError(
+            f"Invalid rounds: {min_rounds}..{max_rounds}, use "
+            f"{MIN_ROUNDS}..{MAX_ROUNDS}."
+        )
+    rounds = min_rounds
+    while rounds < max_rounds \
+            and hash_seconds(rounds + 1) * 1000 <= target_ms:
+        rounds += 1
+    return rounds
+
+
+@lru_cache(maxsize=1)
+def configured_rounds() -> Optional[int]:
+    """Obtain the rounds of BCRYPT_ROUNDS, calibrated once if `auto`.
+
+    Returns:
+        Optional[int]: The rounds, or None for the default of passlib.
+    """
+    rounds = config("BCRYPT_ROUNDS", default="")
+    if not rounds:
+        return None
+    if rounds == "auto":
+        target_ms = config("BCRYPT_TARGET_MS", default=250, cast=float)
+        rounds = calibrate_rounds(target_ms)
+        logging.info(f"bcrypt rounds calibrated to {rounds} ({target_ms} ms)")
+    return int(rounds)
+
+
+def password_context(rounds: int = None) -> CryptContext:
+    """Create the context of the password hashes.
+
+    The hashes with less rounds are outdated (`needs_update`), so they are
+    hashed again with the new rounds on the next login.
+
+    Args:
+        rounds (int, optional): Rounds of bcrypt. Defaults to the default
+            of passlib.
+
+    Returns:
+        CryptContext: The context.
+    """
+    if rounds is None:
+        return CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return CryptContext(
+        schemes=["bcrypt"], deprecated="auto",
+        bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds
+    )
+
+
+class HashingPool:
+    """Class `HashingPool` for run the password hashes in a worker pool.
+
+    The contexts are sent to the workers as their settings (a string), so
+    the same calls work with threads and processes.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 64,
+                 executor: str = "thread") -> None:
+        """Initialize the pool, the workers start on the first call.
+
+        Args:
+            max_workers (int, optional): Workers of the pool. Defaults to 2.
+            max_queue (int, optional): Max calls waiting for a worker, 0 is
+                unbounded. Defaults to 64.
+            executor (str, optional): "thread" or "process". Defaults to
+                "thread".
+
+        Raises:
+            ValueError: If the executor is unknown.
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(
+                f"Unknown executor: {executor}, use one of "
+                f"{', '.join(EXECUTORS)}."
+            )
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.executor = executor
+        # Calls not finished, counted by the callers, and calls running,
+        # counted by the workers
+        self.pending = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self._pool: Executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "HashingPool":
+        """Create a pool configured with the environment variables."""
+        return cls(
+            max_workers=config("HASHING_WORKERS", default=2, cast=int),
+            max_queue=config("HASHING_MAX_QUEUE", default=64, cast=int),
+            executor=config("HASHING_EXECUTOR", default="thread"),
+        )
+
+    async def hash(self, context: CryptContext, password: str) -> str:
+        """Hash a password in the pool.
+
+        Args:
+            context (CryptContext): Context of the hash.
+            password (str): Plain password.
+
+        Raises:
+            QueueFullError: If too many calls are waiting for a worker.
+
+        Returns:
+            str: The hash of the password.
+        """
+        return await self._run(_hash, context.to_string(), password)
+
+    async def verify(self, context: CryptContext, password: str,
+                     hashed: str) -> bool:
+        """Compare a plain password with a hash in the pool.
+
+        Args:
+            context (CryptContext): Context of the hash.
+            password (str): Plain password.
+            hashed (str): Hash of the password.
+
+        Raises:
+            QueueFullError: If too many calls are waiting for a worker.
+
+        Returns:
+            bool: True if the password matches the hash.
+        """
+        return await self._run(_verify, context.to_string(), password, hashed)
+
+    async def verify_and_update(self, context: CryptContext, password: str,
+                                hashed: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password in the pool, hash it again if it's outdated.
+
+        Args:
+            context (CryptContext): Context of the hash.
+            password (str): Plain password.
+            hashed (str): Hash of the password.
+
+        Raises:
+            QueueFullError: If too many calls are waiting for a worker.
+
+        Returns:
+            Tuple[bool, Optional[str]]: If the password matches the hash,
+                and its new hash if the old one is outdated (or None).
+        """
+        return await self._run(
+            _verify_and_update, context.to_string(), password, hashed
+        )
+
+    @property
+    def queued(self) -> int:
+        """Obtain the calls waiting for a worker (the queue depth)."""
+        # A cancelled call can still be running in its thread
+        return max(0, self.pending - self.running)
+
+    async def _run(self, function, *args):
+        """Run a function in the pool, counting the calls waiting for it."""
+        def call():
+            """Count the call as running while the worker runs it."""
+            with self._lock:
+                self.running += 1
+            try:
+                return function(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.max_queue and self.queued >= self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(
+                    f"Too many passwords waiting to be hashed "
+                    f"({self.queued})."
+                )
+            pool = self._get_pool()
+            self.pending += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        try:
+            if self.executor == "thread":
+                return await loop.run_in_executor(pool, call)
+            # The processes can't run the closure, the queue is counted
+            # until the call ends
+            return await loop.run_in_executor(pool, function, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+
+    def _get_pool(self) -> Executor:
+        """Obtain the executor, create it on the first call."""
+        if self._pool is None:
+            kind = (
+                ThreadPoolExecutor if self.executor == "thread"
+                else ProcessPoolExecutor
+            )
+            self._pool = kind(max_workers=self.max_workers)
+        return self._pool
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers, a new call starts them again."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, float]:
+        """Obtain the counters of the pool.
+
+        Returns:
+            Dict[str, float]: Calls waiting (queue depth) and running now,
+                the max queue depth, completed and rejected calls.
+        """
+        return {
+            "workers": self.max_workers,
+            "executor": self.executor,
+            "queued": self.queued,
+            "running": self.running,
+            "max_queued": self.max_queued,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+def main(args=None) -> None:
+    """Print the calibrated rounds of bcrypt for this hardware."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.core.hashing",
+        description="Calibrate the rounds of bcrypt to a target time."
+    )
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    options = parser.parse_args(args)
+
+    rounds = calibrate_rounds(
+        options.target_ms, options.min_rounds, options.max_rounds
+    )
+    print(f"bcrypt rounds: {rounds} ({hash_seconds(rounds) * 1000:.0f} ms)")
+    print(f"BCRYPT_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
@@ -45,12 +45,16 @@ app.include_router(v1_router, prefix="/v1")
 # Handle Exceptions with custom Response
 @app.exception_handler(HTTPException)
 async def exception_handler(request, exc):
-    """Handle Exceptions with custom Response."""
+    """Handle Exceptions with custom Response.
+
+    The details of the Belvo errors (dicts) are sent as their text.
+    """
     logging.error(exc.detail)
     return JSONResponse(
         status_code=exc.status_code,
         content=ErrorResponse(
             success=False,
-            message=exc.detail,
+            message=exc.detail if isinstance(exc.detail, str)
+            else str(exc.detail),
         ).model_dump()
     )
@@ -0,0 +1,101 @@
+"""Models for the Transactions Tables in the DataBase."""
+
+from sqlalchemy import (
+    JSON, Column, Date, DateTime, Float, Index, Integer, String,
+    UniqueConstraint
+)
+from src.core.database import Base
+
+
+class Transaction(Base):
+    """Represents a Belvo transaction stored in the database.
+
+    The columns used to filter and aggregate are extracted from the Belvo
+    transaction, and the whole transaction is kept in `data`.
+    """
+
+    __tablename__ = 'transactions'
+    __table_args__ = (
+        Index('ix_transactions_link_value_date', 'link', 'value_date'),
+        Index('ix_transactions_account_value_date', 'account', 'value_date'),
+    )
+
+    id = Column(String(64), primary_key=True)
+    link = Column(String(64), nullable=False)
+    account = Column(String(64), nullable=False)
+    category = Column(String(255), index=True)
+    merchant = Column(String(255))
+    type = Column(String(16), index=True)
+    amount = Column(Float, nullable=False, default=0)
+    currency = Column(String(8))
+    value_date = Column(Date, index=True)
+    created_at = Column(DateTime)
+    data = Column(JSON)
+
+
+class TransactionSync(Base):
+    """Represents the progress of the sync of a link (and account).
+
+    The `watermark` is the newest `created_at` already stored, the next
+    sync only requests the transactions created since then (minus the
+    lookback window of `sync_transactions`).
+    """
+
+    __tablename__ = 'transaction_syncs'
+    __table_args__ = (UniqueConstraint('link', 'account'),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    link = Column(String(64), nullable=False)
+    # Empty when all the accounts of the link are synced
+    account = Column(String(64), nullable=False, default="")
+    watermark = Column(DateTime)
+    synced_at = Column(DateTime)
+
+
+class RollupColumns:
+    """Columns shared by the rollups of the transactions.
+
+    A rollup keeps the `total` amount and the `count` of the transactions
+    of an account, category, type and currency in a period (day or
+    month).
+    """
+
+    id = Column(Integer, primary_key=True, index=True)
+    link = Column(String(64), nullable=False)
+    account = Column(String(64), nullable=False)
+    category = Column(String(255), nullable=False)
+    type = Column(String(16), nullable=False)
+    currency = Column(String(8), nullable=False, default="Unknown")
+    total = Column(Float, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class DailyRollup(RollupColumns, Base):
+    """Represents the totals of the transactions by day."""
+
+    __tablename__ = 'transaction_daily_rollups'
+    __table_args__ = (
+        UniqueConstraint(
+            'link', 'account', 'category', 'type', 'currency', 'day'
+        ),
+        Index('ix_daily_rollups_link_day', 'link', 'day'),
+        Index('ix_daily_rollups_account_day', 'account', 'day'),
+    )
+
+    day = Column(Date, nullable=False)
+
+
+class MonthlyRollup(RollupColumns, Base):
+    """Represents the totals of the transactions by month."""
+
+    __tablename__ = 'transaction_monthly_rollups'
+    __table_args__ = (
+        UniqueConstraint(
+            'link', 'account', 'category', 'type', 'currency', 'month'
+        ),
+        Index('ix_monthly_rollups_link_month', 'link', 'month'),
+        Index('ix_monthly_rollups_account_month', 'account', 'month'),
+    )
+
+    # First day of the month
+    month = Column(Date, nullable=False)
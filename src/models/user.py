@@ -13,3 +13,7 @@ class User(Base):
     username = Column(String(255), unique=True, index=True)
     email = Column(String(255), unique=True, index=True)
     hashed_password = Column(String(255))
+    # Increased when the user changes, the older tokens are revoked
+    token_version = Column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
@@ -0,0 +1,4 @@
+"""Init Module for Services Package.
+
+Business logic that combines the Belvo API and the database.
+"""
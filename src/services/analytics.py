@@ -0,0 +1,346 @@
+"""Module `analytics` for aggregate the transactions listed from Belvo.
+
+The transactions are folded into the aggregates page by page, while they
+are listed. Several links (or accounts) are listed concurrently, with a
+limit of requests at the same time, and their aggregates are merged.
+
+A query (groups, metrics, filters and date range) is planned first: the
+filters that Belvo (or the database) can apply are sent with the request,
+so fewer transactions are listed, and the rest are applied locally while
+the transactions are aggregated, in a single pass. The stored transactions
+of a link are read once into typed columns (`columnar_cache`), and the
+next queries of the link are computed over them until it's synced again.
+"""
+
+import asyncio
+import time
+from datetime import date
+from typing import (
+    AsyncGenerator, Dict, Iterable, List, Optional, Sequence, Tuple
+)
+
+from sqlalchemy.orm import Session
+from src.analytics import Aggregator, ColumnarCache, MoneyAggregator
+from src.analytics.aggregation import GROUP_KEYS
+from src.belvo.exceptions import RequestError
+from src.belvo.http import DEFAULT_PAGE_SIZE
+from src.services.transactions import (
+    Source, iter_local_transactions, local_columns
+)
+
+
+# Filters that each source applies itself, when they have a single value
+PUSHDOWN_KEYS = {
+    "belvo": ("type", "category", "account", "currency"),
+    "local": ("type", "account"),
+}
+
+# Values that the aggregation uses for the missing fields, the sources
+# don't know them
+DEFAULT_VALUES = {"Uncategorized", "Unknown"}
+
+# Columns of the stored transactions of each link, for the local queries
+columnar_cache = ColumnarCache(local_columns)
+
+
+def stream_transactions(client, link: str = None, account: str = None,
+                        page: int = 1, date_from: date = None,
+                        date_to: date = None, **params) -> AsyncGenerator:
+    """List the transactions to aggregate from Belvo, lazily.
+
+    The pages are requested while the transactions are consumed, so only
+    the current page and the ones prefetched (`prefetch + 1` pages, 3 for
+    the transactions) are in memory at once.
+
+    Args:
+        client (AsyncClient): Belvo client.
+        link (str, optional): ID of the link.
+        account (str, optional): ID of the account.
+        page (int, optional): First page. Defaults to 1.
+        date_from (date, optional): Only since this value date.
+        date_to (date, optional): Only until this value date (included).
+        **params: Other filters of Belvo, e.g. `type` or `category`.
+
+    Returns:
+        AsyncGenerator: The transactions.
+    """
+    dates = {
+        "value_date__gte": date_from.isoformat() if date_from else None,
+        "value_date__lte": date_to.isoformat() if date_to else None,
+    }
+    return client.Transactions.list(
+        page=page, account=account, link=link, **dates, **params
+    )
+
+
+def parse_filters(values: Iterable[str]) -> Dict[str, List[str]]:
+    """Parse the filters of a query, as `key:value` strings.
+
+    The same key can be repeated, to allow several values.
+
+    Args:
+        values (Iterable[str]): E.g. ["type:OUTFLOW", "category:Food"].
+
+    Raises:
+        ValueError: If a filter is not `key:value` or its key is unknown.
+
+    Returns:
+        Dict[str, List[str]]: Allowed values of each key.
+    """
+    filters: Dict[str, List[str]] = {}
+    for value in values:
+        key, separator, allowed = value.partition(":")
+        if not separator or not allowed:
+            raise ValueError(f"Invalid filter: {value}, use key:value.")
+        if key not in GROUP_KEYS:
+            raise ValueError(
+                f"Unknown key: {key}, use one of {', '.join(GROUP_KEYS)}."
+            )
+        filters.setdefault(key, [])
+        if allowed not in filters[key]:
+            filters[key].append(allowed)
+    return filters
+
+
+def parse_date_range(value: Optional[str]) -> Tuple[date, date]:
+    """Parse a date range, as `YYYY-MM-DD..YYYY-MM-DD`.
+
+    Any end can be empty, e.g. `2024-01-01..` has no end.
+
+    Args:
+        value (Optional[str]): The date range.
+
+    Raises:
+        ValueError: If the range or its dates are invalid.
+
+    Returns:
+        Tuple[date, date]: The first and last days (included), or None.
+    """
+    if not value:
+        return None, None
+    first, separator, last = value.partition("..")
+    if not separator:
+        raise ValueError(
+            f"Invalid date range: {value}, use YYYY-MM-DD..YYYY-MM-DD."
+        )
+    date_from = date.fromisoformat(first) if first else None
+    date_to = date.fromisoformat(last) if last else None
+    if date_from and date_to and date_from > date_to:
+        raise ValueError(f"Invalid date range: {value}, it's reversed.")
+    return date_from, date_to
+
+
+class QueryPlan:
+    """Class `QueryPlan` for split the filters of a query by where they run.
+
+    The `pushed` filters are sent to the source (a single value, without
+    the default values of the aggregation, like "Uncategorized"), the
+    `local` ones are applied while aggregating. All of them (`filters`)
+    are checked while aggregating, so a source that ignores or loosens a
+    pushed filter can't mix other transactions in the results.
+    """
+
+    def __init__(self, filters: Dict[str, List[str]] = None,
+                 date_from: date = None, date_to: date = None,
+                 source: Source = "belvo") -> None:
+        """Plan the filters of a query.
+
+        Args:
+            filters (Dict[str, List[str]], optional): Allowed values of
+                some keys.
+            date_from (date, optional): Only since this value date.
+            date_to (date, optional): Only until this value date (included).
+            source (Source, optional): Where the transactions are listed
+                from. Defaults to "belvo".
+        """
+        self.source = source
+        self.date_from = date_from
+        self.date_to = date_to
+        self.pushed: Dict[str, str] = {}
+        self.local: Dict[str, List[str]] = {}
+        for key, values in (filters or {}).items():
+            values = list(values)
+            if key in PUSHDOWN_KEYS[source] and len(values) == 1 \
+                    and values[0] not in DEFAULT_VALUES:
+                self.pushed[key] = values[0]
+            else:
+                self.local[key] = values
+
+    @property
+    def filters(self) -> Dict[str, List[str]]:
+        """Obtain all the filters, the pushed and the local ones."""
+        return {
+            **{key: [value] for key, value in self.pushed.items()},
+            **self.local,
+        }
+
+    def explain(self) -> Dict:
+        """Describe the plan, for the response of the query."""
+        return {
+            "source": self.source,
+            "pushed_down": {
+                **self.pushed,
+                "date_from": self.date_from and self.date_from.isoformat(),
+                "date_to": self.date_to and self.date_to.isoformat(),
+            },
+            "local": self.local,
+        }
+
+
+async def run_query(client, db: Session, plan: QueryPlan,
+                    group_by: Sequence[str] = ("category",),
+                    metrics: Sequence[str] = ("sum",), link: str = None,
+                    page: int = 1, exact: bool = False) -> Aggregator:
+    """Aggregate the transactions that match a planned query.
+
+    Args:
+        client (AsyncClient): Belvo client.
+        db (Session): Session of the database, for the `local` source.
+        plan (QueryPlan): Filters of the query.
+        group_by (Sequence[str], optional): Keys of the groups.
+            Defaults to ("category",).
+        metrics (Sequence[str], optional): Metrics of the groups.
+            Defaults to ("sum",).
+        link (str, optional): ID of the link.
+        page (int, optional): First page in Belvo. Defaults to 1.
+        exact (bool, optional): Sum exactly in minor units, by currency.
+            Defaults to False.
+
+    Raises:
+        ValueError: If a key or a metric is unknown.
+
+    Returns:
+        Aggregator: The aggregates of the transactions. A local query of a
+            link is computed over its cached columns (the exact sums over
+            their minor units, converted once).
+    """
+    kind = MoneyAggregator if exact else Aggregator
+    aggregator = kind(group_by, metrics, filters=plan.filters)
+    dates = {"date_from": plan.date_from, "date_to": plan.date_to}
+    if plan.source == "local" and link is not None:
+        columns = columnar_cache.load(
+            link, iter_local_transactions(db, link=link)
+        )
+        keys = list(dict.fromkeys([*aggregator.group_by, *plan.filters]))
+        return aggregator.update_frame(columns.frame(
+            keys, {key: [value] for key, value in plan.pushed.items()},
+            exact=exact, **dates
+        ))
+    if plan.source == "local":
+        return aggregator.update_stream(iter_local_transactions(
+            db, link=link, **dates, **plan.pushed
+        ))
+    return await aggregator.aupdate_stream(
+        stream_transactions(client, link=link, page=page, **dates,
+                            **plan.pushed),
+        chunk_size=DEFAULT_PAGE_SIZE
+    )
+
+
+def _account_link(account: Dict) -> str:
+    """Obtain the ID of the link of a Belvo account."""
+    link = account.get("link")
+    return link.get("id") if isinstance(link, dict) else link
+
+
+async def aggregate_links(client, links: Sequence[str] = (),
+                          accounts: Sequence[str] = (),
+                          group_by: Sequence[str] = ("category", "type"),
+                          metrics: Sequence[str] = ("sum",),
+                          max_concurrency: int = 5, exact: bool = False,
+                          **filters) -> Tuple[Aggregator, List[Dict]]:
+    """Aggregate the transactions of several links, concurrently.
+
+    The transactions of each link are listed at the same time (up to
+    `max_concurrency` links), and filtered by the accounts if any. Without
+    links, the transactions of each account are listed instead, from its
+    link (Belvo always needs the link), found with `Accounts.get_many`. A
+    link (or account) that fails doesn't stop the others, its error is in
+    its result.
+
+    Args:
+        client (AsyncClient): Belvo client.
+        links (Sequence[str], optional): IDs of the links.
+        accounts (Sequence[str], optional): IDs of the accounts.
+        group_by (Sequence[str], optional): Keys of the groups.
+            Defaults to ("category", "type").
+        metrics (Sequence[str], optional): Metrics of the groups.
+            Defaults to ("sum",).
+        max_concurrency (int, optional): Max links listed at the same time.
+            Defaults to 5.
+        exact (bool, optional): Sum exactly in minor units, by currency.
+        **filters: The `page`, `date_from` and `date_to` of the lists.
+
+    Raises:
+        ValueError: If a key or a metric is unknown.
+
+    Returns:
+        Tuple[Aggregator, List[Dict]]: The merged aggregates, and for each
+            link (or account) in order, its `success`, number of
+            transactions (`count`), `seconds` and error if it failed.
+    """
+    links, accounts = list(dict.fromkeys(links)), list(dict.fromkeys(accounts))
+    account_filter = {"account": accounts} if links and accounts else None
+    if links:
+        targets = [{"link": link} for link in links]
+    else:
+        targets = [
+            {"account": found["id"], "link": _account_link(found["data"])}
+            if found["success"] else
+            {"account": found["id"], "success": False,
+             "status_code": found["status_code"], "detail": found["detail"],
+             "count": 0, "seconds": 0.0}
+            for found in await client.Accounts.get_many(
+                accounts, max_concurrency=max_concurrency
+            )
+        ]
+    kind = MoneyAggregator if exact else Aggregator
+    total = kind(group_by, metrics, filters=account_filter)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def fetch(target: Dict) -> Tuple[Aggregator, Dict]:
+        """Aggregate the transactions of a link and time it."""
+        if target.get("success") is False:
+            # The link of the account wasn't found
+            return None, target
+        async with semaphore:
+            aggregator = kind(group_by, metrics, filters=account_filter)
+            started = time.perf_counter()
+            count = 0
+
+            async def counted(transactions):
+                """Count the transactions while they are aggregated."""
+                nonlocal count
+                async for transaction in transactions:
+                    count += 1
+                    yield transaction
+
+            result = {**target, "success": True}
+            try:
+                await aggregator.aupdate_stream(
+                    counted(stream_transactions(client, **target, **filters)),
+                    chunk_size=DEFAULT_PAGE_SIZE
+                )
+            except RequestError as req_err:
+                aggregator = None
+                result.update(
+                    success=False, status_code=req_err.status_code,
+                    detail=req_err.detail
+                )
+            except Exception as exc:
+                aggregator = None
+                result.update(success=False, status_code=None, detail=str(exc))
+            result.update(
+                count=count,
+                seconds=round(time.perf_counter() - started, 6)
+            )
+            return aggregator, result
+
+    results = []
+    for aggregator, result in await asyncio.gather(
+        *[fetch(target) for target in targets]
+    ):
+        if aggregator is not None:
+            total.merge(aggregator)
+        results.append(result)
+    return total, results
@@ -0,0 +1,246 @@
+"""Module `rollups` for keep the totals of the transactions by period.
+
+The daily and monthly rollups are updated with the changes of each batch
+of synced transactions, so they never need to scan the whole history.
+A date range is answered with the monthly rollups of its full months and
+the daily rollups of the days at its edges, so the work depends on the
+number of buckets, not on the number of transactions.
+
+The totals are kept by currency, and the rows round them to the exact
+minor units of their currency, amounts of different currencies are
+never added.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from src.analytics.money import from_minor_units, to_minor_units
+from src.models.transaction import DailyRollup, MonthlyRollup, Transaction
+
+
+# (link, account, category, type, currency, day) -> [total, count]
+Deltas = Dict[Tuple, List[float]]
+
+
+def rollup_key(values: Dict) -> Optional[Tuple]:
+    """Obtain the rollup key of the values of a `Transaction`.
+
+    Args:
+        values (Dict): Values of the columns of the transaction.
+
+    Returns:
+        Optional[Tuple]: The key, or None if the transaction has no date
+            (it can't be in any period).
+    """
+    if values.get("value_date") is None:
+        return None
+    return (
+        values["link"], values["account"],
+        values.get("category") or "Uncategorized",
+        values.get("type") or "Unknown",
+        values.get("currency") or "Unknown",
+        values["value_date"],
+    )
+
+
+def add_delta(deltas: Deltas, values: Dict, sign: int = 1) -> None:
+    """Add (or remove, with sign -1) a transaction to the deltas.
+
+    Args:
+        deltas (Deltas): Changes of the rollups to update.
+        values (Dict): Values of the columns of the transaction.
+        sign (int, optional): 1 to add the transaction, -1 to remove it.
+    """
+    key = rollup_key(values)
+    if key is None:
+        return
+    delta = deltas.setdefault(key, [0.0, 0])
+    delta[0] += sign * (values.get("amount") or 0)
+    delta[1] += sign
+
+
+def _month(day: date) -> date:
+    """Obtain the first day of the month."""
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    """Obtain the first day of the next month."""
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def apply_deltas(db: Session, deltas: Deltas) -> None:
+    """Update the daily and monthly rollups with the deltas.
+
+    Args:
+        db (Session): Session of the database, it's not committed.
+        deltas (Deltas): Changes of the rollups.
+    """
+    for model, period, bucket in (
+        (DailyRollup, "day", lambda day: day),
+        (MonthlyRollup, "month", _month),
+    ):
+        changes: Deltas = {}
+        for (*key, day), (total, count) in deltas.items():
+            change = changes.setdefault((*key, bucket(day)), [0.0, 0])
+            change[0] += total
+            change[1] += count
+
+        column = getattr(model, period)
+        rows = db.query(model).filter(
+            model.link.in_({key[0] for key in changes}),
+            column.in_({key[-1] for key in changes}),
+        )
+        existing = {
+            (row.link, row.account, row.category, row.type, row.currency,
+             getattr(row, period)): row
+            for row in rows
+        }
+        for key, (total, count) in changes.items():
+            row = existing.get(key)
+            if row is None and count <= 0:
+                # Stored before the rollups existed, a full sync rebuilds
+                # them (`rebuild_rollups`)
+                continue
+            if row is None:
+                link, account, category, type, currency, when = key
+                db.add(model(
+                    link=link, account=account, category=category, type=type,
+                    currency=currency, total=total, count=count,
+                    **{period: when}
+                ))
+                continue
+            row.total += total
+            row.count += count
+            if row.count <= 0:
+                db.delete(row)
+    db.flush()
+
+
+def rebuild_rollups(db: Session, link: str) -> None:
+    """Compute again the rollups of a link from its stored transactions.
+
+    Repairs the rollups that drifted, e.g. of the transactions stored
+    before the rollups existed. A full sync of the link calls it.
+
+    Args:
+        db (Session): Session of the database, it's not committed.
+        link (str): ID of the link.
+    """
+    for model in (DailyRollup, MonthlyRollup):
+        db.query(model).filter(model.link == link).delete()
+
+    deltas: Deltas = {}
+    columns = db.query(
+        Transaction.link, Transaction.account, Transaction.category,
+        Transaction.type, Transaction.currency, Transaction.value_date,
+        func.sum(Transaction.amount), func.count(Transaction.id)
+    ).filter(Transaction.link == link).group_by(
+        Transaction.link, Transaction.account, Transaction.category,
+        Transaction.type, Transaction.currency, Transaction.value_date
+    )
+    for *group, day, total, count in columns:
+        key = rollup_key(dict(
+            zip(("link", "account", "category", "type", "currency"), group),
+            value_date=day
+        ))
+        if key is not None:
+            delta = deltas.setdefault(key, [0.0, 0])
+            delta[0] += total
+            delta[1] += count
+    apply_deltas(db, deltas)
+
+
+def split_range(date_from: date = None, date_to: date = None) -> List[Tuple]:
+    """Split a date range in monthly and daily buckets.
+
+    Args:
+        date_from (date, optional): First day, None is unbounded.
+        date_to (date, optional): Last day (included), None is unbounded.
+
+    Returns:
+        List[Tuple]: (model, first, last) of each part, with the first and
+            last (both included, or None) day/month of the model.
+    """
+    first_month = date_from
+    if date_from is not None and date_from.day != 1:
+        first_month = _next_month(date_from)
+    # The month of `date_to` is full only if it's its last day
+    end_month = None
+    if date_to is not None:
+        end_month = _month(date_to)
+        if (date_to + timedelta(days=1)).day == 1:
+            end_month = _next_month(date_to)
+
+    if first_month is not None and end_month is not None \
+            and first_month >= end_month:
+        return [(DailyRollup, date_from, date_to)]
+
+    parts = [(
+        MonthlyRollup, first_month,
+        end_month - timedelta(days=1) if end_month is not None else None
+    )]
+    if date_from is not None and date_from < first_month:
+        parts.append(
+            (DailyRollup, date_from, first_month - timedelta(days=1))
+        )
+    if date_to is not None and end_month <= date_to:
+        parts.append((DailyRollup, end_month, date_to))
+    return parts
+
+
+def rollup_rows(db: Session, link: str = None, account: str = None,
+                type: str = None, date_from: date = None,
+                date_to: date = None) -> List[Dict]:
+    """Obtain the totals by category, type and currency from the rollups.
+
+    Args:
+        db (Session): Session of the database.
+        link (str, optional): Only of this link.
+        account (str, optional): Only of this account.
+        type (str, optional): Only of this type (INFLOW or OUTFLOW).
+        date_from (date, optional): Only since this value date.
+        date_to (date, optional): Only until this value date (included).
+
+    Returns:
+        List[Dict]: Rows like the ones of `MoneyAggregator.rows`, with the
+            `category`, `type`, `currency`, `sum` (exact `Decimal`, rounded
+            to the minor unit of the currency) and `count`.
+    """
+    totals: Dict[Tuple, List[float]] = {}
+    for model, first, last in split_range(date_from, date_to):
+        column = model.day if model is DailyRollup else model.month
+        query = db.query(
+            model.category, model.type, model.currency,
+            func.sum(model.total), func.sum(model.count)
+        )
+        if link is not None:
+            query = query.filter(model.link == link)
+        if account is not None:
+            query = query.filter(model.account == account)
+        if type is not None:
+            query = query.filter(model.type == type)
+        if first is not None:
+            query = query.filter(column >= first)
+        if last is not None:
+            query = query.filter(column <= last)
+
+        for *group, total, count in query.group_by(
+            model.category, model.type, model.currency
+        ):
+            state = totals.setdefault(tuple(group), [0.0, 0])
+            state[0] += total
+            state[1] += count
+
+    return [
+        {
+            "category": category, "type": kind, "currency": currency,
+            "sum": from_minor_units(
+                to_minor_units(total, currency), currency
+            ),
+            "count": count,
+        }
+        for (category, kind, currency), (total, count) in totals.items()
+    ]
@@ -0,0 +1,368 @@
+"""Module `transactions` for keep a local copy of the Belvo transactions.
+
+The sync downloads only the transactions created since the last sync of
+the link (the watermark) minus a lookback window, and inserts or updates
+them in the database. Belvo has no filter by modification date, so a
+transaction changed after it was created (e.g. recategorized) is only
+updated while it's inside the lookback window, older changes (and the
+transactions deleted in Belvo) need a full sync.
+Then the transactions can be listed and aggregated from the database,
+with indexed filters, instead of calling Belvo on every request. The
+columns of the stored transactions of a link are cached for the
+aggregations (`local_columns`), a sync of the link drops them.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Generator, Iterable, List, Literal, Optional
+from urllib.parse import urlencode
+
+from sqlalchemy.orm import Query, Session
+from src.belvo.http import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
+)
+from src.core.cache import TTLCache
+from src.models.transaction import Transaction, TransactionSync
+from src.services.rollups import (
+    Deltas, add_delta, apply_deltas, rebuild_rollups
+)
+
+
+# Where the transactions endpoints read from
+Source = Literal["belvo", "local"]
+
+# Transactions inserted or updated at once
+BATCH_SIZE = 500
+
+# Transactions created up to this time before the watermark are requested
+# again on each sync, to update their changes
+SYNC_LOOKBACK = timedelta(days=7)
+
+# Columns of the stored transactions of each link, see `ColumnarCache`
+local_columns = TTLCache(maxsize=128, ttl=600)
+
+
+def parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO datetime of Belvo to a naive UTC datetime.
+
+    Args:
+        value (Optional[str]): E.g. "2024-01-10T11:45:24.001Z".
+
+    Returns:
+        Optional[datetime]: The datetime, or None if it's missing/invalid.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_date(value: Optional[str]) -> Optional[date]:
+    """Parse the date (YYYY-MM-DD...) of a Belvo transaction."""
+    try:
+        return date.fromisoformat(value[:10]) if value else None
+    except ValueError:
+        return None
+
+
+def transaction_values(transaction: Dict, link: str) -> Dict:
+    """Obtain the values of the columns of a Belvo transaction.
+
+    Args:
+        transaction (Dict): Belvo transaction.
+        link (str): ID of the link of the transaction.
+
+    Returns:
+        Dict: Values for a `Transaction` row.
+    """
+    account = transaction.get("account") or {}
+    merchant = transaction.get("merchant") or {}
+    return {
+        "id": transaction["id"],
+        "link": link,
+        "account": (
+            account.get("id") if isinstance(account, dict) else account
+        ) or "",
+        "category": transaction.get("category"),
+        "merchant": (
+            merchant.get("name") if isinstance(merchant, dict) else merchant
+        ),
+        "type": transaction.get("type"),
+        "amount": float(transaction.get("amount") or 0),
+        "currency": transaction.get("currency"),
+        "value_date": parse_date(
+            transaction.get("value_date")
+            or transaction.get("accounting_date")
+        ),
+        "created_at": parse_datetime(transaction.get("created_at")),
+        "data": transaction,
+    }
+
+
+def upsert_transactions(db: Session, link: str,
+                        transactions: List[Dict]) -> int:
+    """Insert the new transactions and update the existing ones.
+
+    The daily and monthly rollups are updated with the changes.
+
+    Args:
+        db (Session): Session of the database, it's not committed.
+        link (str): ID of the link of the transactions.
+        transactions (List[Dict]): Belvo transactions.
+
+    Returns:
+        int: Number of inserted or updated transactions.
+    """
+    rows = {
+        transaction["id"]: transaction_values(transaction, link)
+        for transaction in transactions
+    }
+    deltas: Deltas = {}
+    existing = db.query(Transaction).filter(Transaction.id.in_(list(rows)))
+    for transaction in existing:
+        add_delta(deltas, {
+            column: getattr(transaction, column) for column in (
+                "link", "account", "category", "type", "amount",
+                "currency", "value_date"
+            )
+        }, sign=-1)
+        values = rows.pop(transaction.id)
+        for column, value in values.items():
+            setattr(transaction, column, value)
+        add_delta(deltas, values)
+    for values in rows.values():
+        db.add(Transaction(**values))
+        add_delta(deltas, values)
+    apply_deltas(db, deltas)
+    return len(transactions)
+
+
+def remove_transactions(db: Session,
+                        transactions: Iterable[Transaction]) -> int:
+    """Delete the stored transactions and update the rollups.
+
+    Args:
+        db (Session): Session of the database, it's not committed.
+        transactions (Iterable[Transaction]): Rows to delete.
+
+    Returns:
+        int: Number of deleted transactions.
+    """
+    deltas: Deltas = {}
+    removed = 0
+    for transaction in transactions:
+        add_delta(deltas, {
+            column: getattr(transaction, column) for column in (
+                "link", "account", "category", "type", "amount",
+                "currency", "value_date"
+            )
+        }, sign=-1)
+        db.delete(transaction)
+        removed += 1
+    apply_deltas(db, deltas)
+    return removed
+
+
+async def sync_transactions(client, db: Session, link: str,
+                            account: str = None, full: bool = False,
+                            lookback: timedelta = SYNC_LOOKBACK) -> Dict:
+    """Download the new transactions of a link and store them.
+
+    Only the transactions created since the watermark of the last sync,
+    minus the `lookback`, are requested (the ones already stored are
+    updated). The changes of older transactions are not seen, a `full`
+    sync requests all the transactions again, deletes the stored ones that
+    Belvo doesn't return anymore and computes again the rollups of the
+    link, repairing them if they drifted. If the sync fails, nothing is stored
+    and the watermark stays, so the next sync starts from the same point.
+    Once stored, the cached columns of the link are dropped.
+
+    Args:
+        client (AsyncClient): Belvo client.
+        db (Session): Session of the database.
+        link (str): ID of the link to sync.
+        account (str, optional): Only sync this account.
+        full (bool, optional): Ignore the watermark. Defaults to False.
+        lookback (timedelta, optional): Time before the watermark to
+            request again. Defaults to `SYNC_LOOKBACK`.
+
+    Returns:
+        Dict: The `link`, `account`, the number of `synced` (and `removed`
+            in a full sync) transactions and the new `watermark`.
+    """
+    state = db.query(TransactionSync).filter_by(
+        link=link, account=account or ""
+    ).one_or_none()
+    if state is None:
+        state = TransactionSync(link=link, account=account or "")
+        db.add(state)
+
+    params = {"account": account, "page_size": MAX_PAGE_SIZE}
+    if state.watermark is not None and not full:
+        params["created_at__gte"] = (state.watermark - lookback).isoformat()
+
+    watermark = None if full else state.watermark
+    synced = removed = 0
+    seen = set()
+    batch = []
+    try:
+        async for transaction in client.Transactions.list(link, **params):
+            batch.append(transaction)
+            if full:
+                seen.add(transaction["id"])
+            created_at = parse_datetime(transaction.get("created_at"))
+            if created_at and (watermark is None or created_at > watermark):
+                watermark = created_at
+            if len(batch) >= BATCH_SIZE:
+                synced += upsert_transactions(db, link, batch)
+                batch = []
+        synced += upsert_transactions(db, link, batch)
+        if full:
+            stale = db.query(Transaction).filter(Transaction.link == link)
+            if account is not None:
+                stale = stale.filter(Transaction.account == account)
+            removed = remove_transactions(db, [
+                transaction for transaction in stale
+                if transaction.id not in seen
+            ])
+            rebuild_rollups(db, link)
+
+        state.watermark = watermark
+        state.synced_at = datetime.utcnow()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    local_columns.invalidate(link)
+
+    result = {
+        "link": link,
+        "account": account,
+        "synced": synced,
+        "watermark": watermark.isoformat() if watermark else None,
+    }
+    if full:
+        result["removed"] = removed
+    return result
+
+
+def query_transactions(db: Session, link: str = None, account: str = None,
+                       type: str = None, date_from: date = None,
+                       date_to: date = None) -> Query:
+    """Query the stored transactions, the newest first.
+
+    Args:
+        db (Session): Session of the database.
+        link (str, optional): Only of this link.
+        account (str, optional): Only of this account.
+        type (str, optional): Only of this type (INFLOW or OUTFLOW).
+        date_from (date, optional): Only since this value date.
+        date_to (date, optional): Only until this value date (included).
+
+    Returns:
+        Query: Query of `Transaction` rows.
+    """
+    query = db.query(Transaction)
+    if link is not None:
+        query = query.filter(Transaction.link == link)
+    if account is not None:
+        query = query.filter(Transaction.account == account)
+    if type is not None:
+        query = query.filter(Transaction.type == type)
+    if date_from is not None:
+        query = query.filter(Transaction.value_date >= date_from)
+    if date_to is not None:
+        query = query.filter(Transaction.value_date <= date_to)
+    return query.order_by(
+        Transaction.value_date.desc(), Transaction.id
+    )
+
+
+def local_page(db: Session, cursor: str = None, page: int = 1,
+               page_size: int = None, **filters) -> Dict:
+    """Get a page of the stored transactions, like `Transactions.page`.
+
+    Args:
+        db (Session): Session of the database.
+        cursor (str, optional): Cursor of the page, from the `next` of the
+            previous page. It already includes the filters.
+        page (int, optional): Number of the page. Defaults to 1.
+        page_size (int, optional): Transactions per page, up to
+            `MAX_PAGE_SIZE`. Defaults to `DEFAULT_PAGE_SIZE`, like Belvo.
+        **filters: Filters of `query_transactions`.
+
+    Raises:
+        ValueError: If the cursor is not valid.
+
+    Returns:
+        Dict: The `count`, the `results` and the `next` cursor.
+    """
+    if cursor is not None:
+        params = decode_cursor(cursor)
+        page = int(params.get("page", 1))
+        page_size = int(
+            params.get("page_size", page_size or DEFAULT_PAGE_SIZE)
+        )
+        filters = {
+            key: params[key] for key in ("link", "account", "type")
+            if key in params
+        }
+        for key in ("date_from", "date_to"):
+            if key in params:
+                filters[key] = date.fromisoformat(params[key])
+    page = max(1, page or 1)
+    page_size = max(1, min(page_size or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+    query = query_transactions(db, **filters)
+    count = query.count()
+    rows = query.offset((page - 1) * page_size).limit(page_size).all()
+
+    next_cursor = None
+    if page * page_size < count:
+        params = {key: value for key, value in filters.items() if value}
+        params.update(page=page + 1, page_size=page_size)
+        next_cursor = encode_cursor(f"?{urlencode(params)}")
+    return {
+        "count": count,
+        "results": [row.data for row in rows],
+        "next": next_cursor,
+    }
+
+
+def iter_local_transactions(db: Session, batch_size: int = 1000,
+                            **filters) -> Generator[Dict, None, None]:
+    """Iterate the stored transactions, with the fields to aggregate them.
+
+    Only the columns are read (not the whole Belvo transaction), in
+    batches, so the memory stays bounded.
+
+    Args:
+        db (Session): Session of the database.
+        batch_size (int, optional): Rows read at once. Defaults to 1000.
+        **filters: Filters of `query_transactions`.
+
+    Yields:
+        Generator[Dict, None, None]: Transactions with the `category`,
+            `merchant`, `account`, `type`, `amount`, `currency` and
+            `value_date`.
+    """
+    columns = query_transactions(db, **filters).with_entities(
+        Transaction.category, Transaction.merchant, Transaction.account,
+        Transaction.type, Transaction.amount, Transaction.currency,
+        Transaction.value_date
+    ).yield_per(batch_size)
+    for (category, merchant, account, type, amount, currency,
+         value_date) in columns:
+        yield {
+            "category": category,
+            "merchant": merchant,
+            "account": account,
+            "type": type,
+            "amount": amount,
+            "currency": currency,
+            "value_date": value_date.isoformat() if value_date else None,
+        }
@@ -0,0 +1,4 @@
+"""Init Module for Utils Package.
+
+Auxiliary functions shared by the layers of the application.
+"""
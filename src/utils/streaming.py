@@ -0,0 +1,103 @@
+"""Module `streaming` for send big lists without hold them in memory."""
+
+import json
+import logging
+from typing import AsyncIterator, Literal
+
+from fastapi.responses import StreamingResponse
+
+
+StreamFormat = Literal["json", "ndjson"]
+
+
+async def _chain(first, items: AsyncIterator) -> AsyncIterator:
+    """Yield the first item and then the rest of the items."""
+    yield first
+    async for item in items:
+        yield item
+
+
+async def _json_chunks(items: AsyncIterator, key: str,
+                       message: str) -> AsyncIterator[bytes]:
+    """Encode the items inside the envelope of a `SuccessResponse`.
+
+    Args:
+        items (AsyncIterator): Items to write in the list of `data[key]`.
+        key (str): Key of the list inside `data`.
+        message (str): Message of the response.
+
+    Yields:
+        AsyncIterator[bytes]: Chunks of the JSON document.
+    """
+    yield '{{"success": true, "data": {{{}: ['.format(json.dumps(key)).encode()
+
+    separator = b""
+    try:
+        async for item in items:
+            yield separator + json.dumps(item).encode()
+            separator = b", "
+    except Exception as exc:
+        # The status was already sent, the client gets a truncated document
+        logging.error(f"Streaming of {key} interrupted: {exc}")
+        return
+
+    yield ']}}, "message": {}}}'.format(json.dumps(message)).encode()
+
+
+async def _ndjson_chunks(items: AsyncIterator,
+                         key: str) -> AsyncIterator[bytes]:
+    """Encode each item as a JSON document in its own line.
+
+    A stream interrupted by an error ends with an `{"error": ...}` line,
+    so the client can tell it apart from a complete one.
+
+    Args:
+        items (AsyncIterator): Items to write.
+        key (str): Name of the items, only used for logging.
+
+    Yields:
+        AsyncIterator[bytes]: One line for each item.
+    """
+    try:
+        async for item in items:
+            yield json.dumps(item).encode() + b"\n"
+    except Exception as exc:
+        logging.error(f"Streaming of {key} interrupted: {exc}")
+        detail = getattr(exc, "detail", None) or str(exc)
+        yield json.dumps({
+            "error": detail,
+            "status_code": getattr(exc, "status_code", 500),
+        }, default=str).encode() + b"\n"
+
+
+async def stream_items(items: AsyncIterator, key: str, message: str,
+                       stream_format: StreamFormat = "json"
+                       ) -> StreamingResponse:
+    """Create a response that writes each item as soon as it's available.
+
+    The first item is awaited before the response starts, so the errors of
+    the first request (the most common) still use the normal error response.
+
+    Args:
+        items (AsyncIterator): Items to send, e.g. `AsyncResource.list()`.
+        key (str): Key of the list inside `data`, e.g. "accounts".
+        message (str): Message of the response.
+        stream_format (StreamFormat, optional): "json" for the same
+            document as `SuccessResponse`, "ndjson" for one item per line.
+
+    Returns:
+        StreamingResponse: The response for the endpoint.
+    """
+    try:
+        first = await items.__anext__()
+        items = _chain(first, items)
+    except StopAsyncIteration:
+        pass
+
+    if stream_format == "ndjson":
+        return StreamingResponse(
+            _ndjson_chunks(items, key), media_type="application/x-ndjson"
+        )
+    return StreamingResponse(
+        _json_chunks(items, key, message), media_type="application/json"
+    )
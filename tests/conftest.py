@@ -2,6 +2,37 @@
 
 import pytest
 from src.belvo.http import APISession
+from src.belvo.instance import async_registry, registry
+from src.core.auth import principal_cache, token_versions
+from src.services.transactions import local_columns
+
+
+@pytest.fixture(autouse=True)
+def reset_belvo_registry():
+    """Forget the shared Belvo Clients between tests."""
+    registry.clear()
+    async_registry.clear()
+    yield
+    registry.clear()
+    async_registry.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_principal_cache():
+    """Forget the cached users of the tokens between tests."""
+    principal_cache.invalidate()
+    token_versions.invalidate()
+    yield
+    principal_cache.invalidate()
+    token_versions.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def reset_local_columns():
+    """Forget the cached columns of the stored transactions between tests."""
+    local_columns.invalidate()
+    yield
+    local_columns.invalidate()
 
 
 @pytest.fixture
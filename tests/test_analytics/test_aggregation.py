@@ -0,0 +1,327 @@
+"""Tests for the `aggregation` Module."""
+
+import asyncio
+import random
+import tracemalloc
+
+import pytest
+from src.analytics.aggregation import (
+    Aggregator, TransactionFrame, aggregate, iter_chunks, merge_groups,
+    top_items, top_rows
+)
+
+
+TRANSACTIONS = [
+    {
+        "type": "OUTFLOW", "category": "Groceries", "amount": 50,
+        "merchant": {"name": "Oxxo"}, "account": {"id": "acc_1"},
+        "value_date": "2024-01-05",
+    },
+    {
+        "type": "OUTFLOW", "category": "Groceries", "amount": 100,
+        "merchant": {"name": "Walmart"}, "account": {"id": "acc_2"},
+        "value_date": "2024-01-20",
+    },
+    {
+        "type": "INFLOW", "category": "Salary", "amount": 1000,
+        "merchant": None, "account": "acc_1",
+        "value_date": "2024-02-01",
+    },
+    {
+        "type": "OUTFLOW", "category": None, "amount": 25.5,
+        "merchant": {"name": "Oxxo"}, "account": {"id": "acc_1"},
+        "accounting_date": "2024-02-03T00:00:00",
+    },
+]
+
+BACKENDS = [True, False]
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_aggregate_by_category(use_numpy):
+    """Test to sum the amounts by category, in order of appearance."""
+    rows = aggregate(TRANSACTIONS, use_numpy=use_numpy)
+
+    assert rows == [
+        {"category": "Groceries", "sum": 150.0},
+        {"category": "Salary", "sum": 1000.0},
+        {"category": "Uncategorized", "sum": 25.5},
+    ]
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_aggregate_all_metrics_by_several_keys(use_numpy):
+    """Test every metric grouped by a combination of keys."""
+    rows = aggregate(
+        TRANSACTIONS, group_by=["month", "type"],
+        metrics=["sum", "count", "mean", "min", "max"], use_numpy=use_numpy
+    )
+
+    assert rows == [
+        {
+            "month": "2024-01", "type": "OUTFLOW",
+            "sum": 150.0, "count": 2, "mean": 75.0, "min": 50.0, "max": 100.0,
+        },
+        {
+            "month": "2024-02", "type": "INFLOW",
+            "sum": 1000.0, "count": 1, "mean": 1000.0,
+            "min": 1000.0, "max": 1000.0,
+        },
+        {
+            "month": "2024-02", "type": "OUTFLOW",
+            "sum": 25.5, "count": 1, "mean": 25.5, "min": 25.5, "max": 25.5,
+        },
+    ]
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_aggregate_with_filters(use_numpy):
+    """Test only the transactions with the allowed values are aggregated."""
+    rows = aggregate(
+        TRANSACTIONS, group_by=["merchant", "account", "day"],
+        metrics=["count"], filters={"type": ["OUTFLOW"]},
+        use_numpy=use_numpy
+    )
+
+    assert rows == [
+        {"merchant": "Oxxo", "account": "acc_1", "day": "2024-01-05",
+         "count": 1},
+        {"merchant": "Walmart", "account": "acc_2", "day": "2024-01-20",
+         "count": 1},
+        {"merchant": "Oxxo", "account": "acc_1", "day": "2024-02-03",
+         "count": 1},
+    ]
+    assert aggregate(
+        TRANSACTIONS, filters={"type": ["REFUND"]}, use_numpy=use_numpy
+    ) == []
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_aggregate_without_groups(use_numpy):
+    """Test the totals of all the transactions, and of an empty list."""
+    assert aggregate(
+        TRANSACTIONS, group_by=[], metrics=["sum", "count"],
+        use_numpy=use_numpy
+    ) == [{"sum": 1175.5, "count": 4}]
+    assert aggregate([], use_numpy=use_numpy) == []
+
+
+def test_aggregate_unknown_key_or_metric():
+    """Test the unknown keys and metrics raise ValueError."""
+    with pytest.raises(ValueError, match="Unknown key: bank"):
+        aggregate(TRANSACTIONS, group_by=["bank"])
+    with pytest.raises(ValueError, match="Unknown key: bank"):
+        aggregate(TRANSACTIONS, filters={"bank": ["erebor"]})
+    with pytest.raises(ValueError, match="Unknown metric: median"):
+        aggregate(TRANSACTIONS, metrics=["median"])
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_frame_groups_need_the_keys(use_numpy):
+    """Test the frame can only group by the extracted keys."""
+    frame = TransactionFrame.from_transactions(
+        TRANSACTIONS, ["category"], use_numpy=use_numpy
+    )
+
+    assert len(frame) == 4
+    with pytest.raises(ValueError, match="merchant is not in the frame"):
+        frame.groups(["merchant"])
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_frame_groups_without_extremes(use_numpy):
+    """Test the min and max are skipped if they are not needed."""
+    frame = TransactionFrame.from_transactions(
+        TRANSACTIONS, ["type"], use_numpy=use_numpy
+    )
+
+    assert frame.groups(["type"], extremes=False)[("INFLOW",)] == \
+        [1000.0, 1, float("inf"), float("-inf")]
+
+
+def test_aggregator_update_in_chunks_and_merge():
+    """Test the chunks and merged aggregators give the same result."""
+    single = Aggregator(["category"], ["sum", "count", "min", "max"])
+    single.update(TRANSACTIONS)
+
+    chunks = Aggregator(["category"], ["sum", "count", "min", "max"])
+    for transaction in TRANSACTIONS:
+        chunks.update([transaction])
+    merged = Aggregator(["category"], ["sum", "count", "min", "max"])
+    merged.update(TRANSACTIONS[:2]).merge(
+        Aggregator(["category"], ["sum", "count", "min", "max"])
+        .update(TRANSACTIONS[2:])
+    )
+
+    assert chunks.rows() == single.rows()
+    assert merged.rows() == single.rows()
+
+
+def test_merge_groups():
+    """Test to merge the partial results of the groups."""
+    groups = {("Food",): [10.0, 1, 10.0, 10.0]}
+
+    merge_groups(groups, {
+        ("Food",): [5.0, 2, 1.0, 4.0], ("Rent",): [7.0, 1, 7.0, 7.0]
+    })
+
+    assert groups == {
+        ("Food",): [15.0, 3, 1.0, 10.0], ("Rent",): [7.0, 1, 7.0, 7.0]
+    }
+
+
+def test_numpy_and_python_agree_on_big_histories():
+    """Test both backends give the same result on random transactions."""
+    rng = random.Random(42)
+    transactions = [
+        {
+            "type": rng.choice(["INFLOW", "OUTFLOW"]),
+            "category": rng.choice(["Food", "Rent", "Travel", None]),
+            "merchant": {"name": f"merchant_{rng.randrange(300)}"},
+            "amount": round(rng.uniform(-100, 5000), 2),
+            "value_date": f"2023-{rng.randrange(1, 13):02d}-"
+                          f"{rng.randrange(1, 29):02d}",
+        }
+        for _ in range(5000)
+    ]
+    options = {
+        # Many combinations, the ids of the groups need to be compressed
+        "group_by": ["type", "merchant", "category", "day"],
+        "metrics": ["sum", "count", "mean", "min", "max"],
+    }
+
+    numpy_rows = aggregate(transactions, use_numpy=True, **options)
+    python_rows = aggregate(transactions, use_numpy=False, **options)
+
+    assert len(numpy_rows) == len(python_rows)
+    for numpy_row, python_row in zip(numpy_rows, python_rows):
+        assert numpy_row == pytest.approx(python_row)
+
+
+PAGE_SIZE = 100
+
+
+def _page(number):
+    """Create a page of new transactions, like a page of a Belvo list."""
+    return [
+        {
+            "id": f"txn_{number}_{index}", "amount": index % 50 + 0.5,
+            "type": "OUTFLOW" if index % 3 else "INFLOW",
+            "category": f"Category {index % 7}",
+            "merchant": {"name": f"Merchant {index % 11}"},
+            "value_date": f"2024-01-{index % 28 + 1:02d}",
+            "description": "x" * 50,
+        }
+        for index in range(PAGE_SIZE)
+    ]
+
+
+def _stream(pages):
+    """Yield the transactions of the pages, requested one by one."""
+    for number in range(pages):
+        yield from _page(number)
+
+
+async def _astream(pages):
+    """Yield the transactions of the pages, like `AsyncTransactions.list`."""
+    for number in range(pages):
+        for transaction in _page(number):
+            yield transaction
+
+
+def _peak_memory(function):
+    """Obtain the peak of memory allocated while calling the function."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_iter_chunks():
+    """Test to split an iterable in lists, the last one can be shorter."""
+    assert list(iter_chunks(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(iter_chunks([], 2)) == []
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_update_stream_is_like_update(use_numpy):
+    """Test to fold a stream in chunks gives the same rows."""
+    expected = aggregate(
+        _stream(3), ["category", "type"], ["sum", "count"],
+        use_numpy=use_numpy
+    )
+    aggregator = Aggregator(
+        ["category", "type"], ["sum", "count"], use_numpy=use_numpy
+    )
+    assert aggregator.update_stream(_stream(3), chunk_size=7).rows() == \
+        expected
+
+    aggregator = Aggregator(
+        ["category", "type"], ["sum", "count"], use_numpy=use_numpy
+    )
+    asyncio.run(aggregator.aupdate_stream(_astream(3), chunk_size=7))
+    assert aggregator.rows() == expected
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_update_stream_memory_is_bounded_by_a_page(use_numpy):
+    """Test the peak memory of a long stream doesn't grow with its pages.
+
+    The generators don't prefetch, the bound of the real Belvo list is
+    tested with its prefetch in the `analytics` service tests.
+    """
+    page = _peak_memory(lambda: _page(0))
+
+    def fold(pages):
+        aggregator = Aggregator(["category", "type"], use_numpy=use_numpy)
+        aggregator.update_stream(_stream(pages), chunk_size=PAGE_SIZE)
+
+    def afold(pages):
+        aggregator = Aggregator(["category", "type"], use_numpy=use_numpy)
+        asyncio.run(aggregator.aupdate_stream(
+            _astream(pages), chunk_size=PAGE_SIZE
+        ))
+
+    # The page being folded, its columns and the one being created
+    assert _peak_memory(lambda: fold(200)) < 5 * page
+    # The event loop itself needs some memory, but it doesn't grow
+    assert _peak_memory(lambda: afold(200)) < \
+        _peak_memory(lambda: afold(2)) + 2 * page
+    # Materialize the whole history instead needs all the pages
+    assert _peak_memory(lambda: aggregate(list(_stream(200)))) > 100 * page
+
+
+def test_top_items_with_a_heap_or_sorted():
+    """Test to select the first items, the ties in order of appearance."""
+    items = [("a", 3), ("b", 9), ("c", 1), ("d", 9), ("e", 5)]
+
+    def value(item):
+        return item[1]
+
+    assert top_items(items, value, 3) == [("b", 9), ("d", 9), ("e", 5)]
+    assert top_items(items, value, 2, "asc") == [("c", 1), ("a", 3)]
+    assert top_items(items, value) == sorted(items, key=value, reverse=True)
+    assert top_items(iter(items), value, 10) == top_items(items, value)
+    with pytest.raises(ValueError, match="Unknown order: up"):
+        top_items(items, value, 2, "up")
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_aggregator_top(use_numpy):
+    """Test to obtain only the rows of the top groups."""
+    aggregator = Aggregator(
+        ["merchant"], ["sum", "count"], use_numpy=use_numpy
+    ).update(TRANSACTIONS)
+
+    assert aggregator.top(1) == \
+        [{"merchant": "Unknown", "sum": 1000.0, "count": 1}]
+    assert aggregator.top(2, "count") == [
+        {"merchant": "Oxxo", "sum": 75.5, "count": 2},
+        {"merchant": "Walmart", "sum": 100.0, "count": 1},
+    ]
+    assert aggregator.top(order="asc") == \
+        top_rows(aggregator.rows(), "sum", order="asc")
+    with pytest.raises(ValueError, match="Unknown metric: median"):
+        aggregator.top(1, "median")
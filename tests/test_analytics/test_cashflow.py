@@ -0,0 +1,60 @@
+"""Tests for the `cashflow` Module."""
+
+from decimal import Decimal
+
+from src.analytics.cashflow import (
+    cashflow_aggregator, cashflow_summary, summarize_transactions
+)
+
+
+TRANSACTIONS = [
+    {"type": "OUTFLOW", "category": "Groceries", "amount": 50,
+     "currency": "MXN"},
+    {"type": "OUTFLOW", "category": "Groceries", "amount": 100,
+     "currency": "MXN"},
+    {"type": "INFLOW", "category": "Groceries", "amount": 30,
+     "currency": "MXN"},
+    {"type": "INFLOW", "category": "Salary", "amount": 1000,
+     "currency": "MXN"},
+    {"type": "REFUND", "category": "Salary", "amount": 5, "currency": "MXN"},
+    {"type": "OUTFLOW", "category": "Fun", "amount": 0.1, "currency": "USD"},
+    {"type": "OUTFLOW", "category": "Fun", "amount": 0.2, "currency": "USD"},
+]
+
+
+def test_summarize_transactions():
+    """Test the INFLOW, OUTFLOW and net of each category and in total."""
+    summary = summarize_transactions(TRANSACTIONS)
+
+    assert summary["MXN"] == {
+        "by_category": {
+            "Groceries": {"INFLOW": 30, "OUTFLOW": 150, "net": -120},
+            "Salary": {"INFLOW": 1000, "OUTFLOW": 0, "net": 1000},
+        },
+        "totals": {"INFLOW": 1030, "OUTFLOW": 150, "net": 880},
+    }
+
+
+def test_summarize_transactions_exactly_by_currency():
+    """Test the amounts are exact and never added across currencies."""
+    summary = summarize_transactions(TRANSACTIONS)
+
+    assert set(summary) == {"MXN", "USD"}
+    assert summary["USD"]["totals"] == {
+        "INFLOW": 0, "OUTFLOW": Decimal("0.30"), "net": Decimal("-0.30")
+    }
+
+
+def test_cashflow_summary_of_chunks():
+    """Test the summary of an aggregator updated page by page."""
+    aggregator = cashflow_aggregator()
+    for transaction in TRANSACTIONS:
+        aggregator.update([transaction])
+
+    assert cashflow_summary(aggregator.rows()) == \
+        summarize_transactions(TRANSACTIONS)
+
+
+def test_summarize_without_transactions():
+    """Test the summary of an empty list."""
+    assert summarize_transactions([]) == {}
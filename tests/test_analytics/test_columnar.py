@@ -0,0 +1,201 @@
+"""Tests for the `columnar` Module."""
+
+import asyncio
+import random
+from datetime import date
+
+import pytest
+from src.analytics.aggregation import aggregate
+from src.analytics.columnar import (
+    NO_DATE, ColumnarCache, TransactionColumns, epoch_day
+)
+from src.analytics.money import MoneyAggregator, money_aggregate
+from src.core.cache import TTLCache
+
+
+TRANSACTIONS = [
+    {
+        "type": "OUTFLOW", "category": "Groceries", "amount": 50,
+        "merchant": {"name": "Oxxo"}, "account": {"id": "acc_1"},
+        "value_date": "2024-01-05",
+    },
+    {
+        "type": "OUTFLOW", "category": "Groceries", "amount": 100,
+        "merchant": {"name": "Walmart"}, "account": {"id": "acc_2"},
+        "value_date": "2024-01-31",
+    },
+    {
+        "type": "INFLOW", "category": "Salary", "amount": 1000,
+        "merchant": None, "account": "acc_1",
+        "value_date": "2024-02-01",
+    },
+    {
+        "type": "OUTFLOW", "category": None, "amount": 25.5,
+        "merchant": {"name": "Oxxo"}, "account": {"id": "acc_1"},
+    },
+]
+
+BACKENDS = [True, False]
+
+
+def test_epoch_day():
+    """Test to convert the dates to days since the epoch."""
+    assert epoch_day("1970-01-02") == 1
+    assert epoch_day("2024-01-05T10:00:00") == 19727
+    assert epoch_day("05/01/2024") == NO_DATE
+    assert epoch_day(None) == NO_DATE
+
+
+def test_columns_are_typed_arrays():
+    """Test the columns are compact arrays with dictionary codes."""
+    columns = TransactionColumns().append(TRANSACTIONS[:2])
+    columns.append(TRANSACTIONS[2:])
+
+    assert len(columns) == 4
+    assert columns.amounts.typecode == "d"
+    assert columns.units.typecode == "q"
+    assert columns.days.typecode == "q"
+    assert list(columns.codes["merchant"]) == [0, 1, 2, 0]
+    assert columns.labels["merchant"] == ["Oxxo", "Walmart", "Unknown"]
+    assert columns.labels["category"] == \
+        ["Groceries", "Salary", "Uncategorized"]
+    assert columns.nbytes == 4 * (8 + 8 + 8 + 5 * 4)
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_columns_aggregate_like_the_dicts(use_numpy):
+    """Test the groups of the columns are the groups of the dicts."""
+    columns = TransactionColumns(use_numpy=use_numpy).append(TRANSACTIONS)
+
+    for group_by in (
+        ["category"], ["merchant", "type"], ["account", "month"], ["day"],
+        [],
+    ):
+        assert columns.aggregate(group_by, ["sum", "count", "max"]) == \
+            aggregate(TRANSACTIONS, group_by, ["sum", "count", "max"])
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_columns_exact_frame_of_minor_units(use_numpy):
+    """Test the exact frame sums the minor units kept in the columns."""
+    transactions = [
+        {"category": "Fees", "amount": 0.1, "currency": "MXN"},
+        {"category": "Fees", "amount": 0.2, "currency": "MXN"},
+        {"category": "Fees", "amount": 500, "currency": "JPY"},
+    ]
+    columns = TransactionColumns(use_numpy=use_numpy).append(transactions)
+
+    assert list(columns.units) == [10, 20, 500]
+    assert money_aggregate(transactions) == MoneyAggregator(
+        use_numpy=use_numpy
+    ).update_frame(columns.frame(["category"], exact=True)).rows()
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_columns_filters_and_date_range(use_numpy):
+    """Test to filter by codes and by dates, without date isn't in range."""
+    columns = TransactionColumns(use_numpy=use_numpy).append(TRANSACTIONS)
+
+    assert columns.aggregate(
+        ["category"], filters={"type": ["OUTFLOW"], "merchant": ["Oxxo"]}
+    ) == [
+        {"category": "Groceries", "sum": 50.0},
+        {"category": "Uncategorized", "sum": 25.5},
+    ]
+    assert columns.aggregate(
+        ["month"], date_from=date(2024, 1, 10), date_to=date(2024, 2, 1)
+    ) == [{"month": "2024-01", "sum": 100.0}, {"month": "2024-02", "sum": 1000.0}]  # noqa: E501
+    assert columns.aggregate(["category"], date_from=date(2024, 2, 1)) == \
+        [{"category": "Salary", "sum": 1000.0}]
+    assert columns.aggregate(
+        ["category"], filters={"type": ["Missing"]}
+    ) == []
+    assert columns.groups(["type"], extremes=False)[("INFLOW",)][:2] == \
+        [1000.0, 1]
+
+    with pytest.raises(ValueError, match="Unknown filter: day"):
+        columns.select({"day": ["2024-01-05"]})
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_columns_append_while_a_frame_is_held(use_numpy):
+    """Test to append rows while a frame is used, it keeps its rows."""
+    columns = TransactionColumns(use_numpy=use_numpy).append(TRANSACTIONS)
+    frame = columns.frame(["category"])
+
+    columns.append(TRANSACTIONS)
+
+    assert len(columns) == 8
+    assert len(frame.amounts) == 4
+    assert frame.groups(["category"])[("Groceries",)][:2] == [150.0, 2]
+    assert columns.aggregate(["category"])[0] == \
+        {"category": "Groceries", "sum": 300.0}
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_columns_of_a_big_history(use_numpy):
+    """Test the columns agree with the dicts on many random rows."""
+    rng = random.Random(0)
+    transactions = [
+        {
+            "type": rng.choice(["INFLOW", "OUTFLOW"]),
+            "category": rng.choice(["Food", "Rent", "Fun", None]),
+            "merchant": {"name": f"merchant_{rng.randrange(50)}"},
+            "amount": round(rng.uniform(1, 500), 2),
+            "value_date": f"2023-{rng.randrange(1, 13):02d}-"
+                          f"{rng.randrange(1, 29):02d}",
+        }
+        for _ in range(2000)
+    ]
+    columns = TransactionColumns(use_numpy=use_numpy)
+    for start in range(0, len(transactions), 300):
+        columns.append(transactions[start:start + 300])
+
+    rows = columns.aggregate(
+        ["month", "category"], ["sum", "count"],
+        filters={"type": ["OUTFLOW"]}, date_to=date(2023, 6, 30)
+    )
+    expected = aggregate(
+        [
+            transaction for transaction in transactions
+            if transaction["value_date"] <= "2023-06-30"
+        ],
+        ["month", "category"], ["sum", "count"],
+        filters={"type": ["OUTFLOW"]}
+    )
+    assert len(rows) == len(expected)
+    for row, other in zip(rows, expected):
+        assert row["sum"] == pytest.approx(other.pop("sum"))
+        assert {**row, "sum": None} == {**other, "sum": None}
+
+
+def test_columnar_cache_by_link():
+    """Test the columns are built once per link, until invalidated."""
+    cache = ColumnarCache(TTLCache(maxsize=10, ttl=60))
+    consumed = []
+
+    def stream():
+        for transaction in TRANSACTIONS:
+            consumed.append(transaction)
+            yield transaction
+
+    columns = cache.load("link_1", stream(), chunk_size=3)
+    assert len(columns) == 4
+    assert cache.load("link_1", stream()) is columns
+    assert len(consumed) == 4
+
+    assert cache.invalidate("link_1") == 1
+    assert cache.get("link_1") is None
+
+
+def test_columnar_cache_async_load():
+    """Test to build the columns of a link from an async generator."""
+    cache = ColumnarCache()
+
+    async def stream():
+        for transaction in TRANSACTIONS:
+            yield transaction
+
+    columns = asyncio.run(cache.aload("link_1", stream(), chunk_size=3))
+    assert len(columns) == 4
+    assert asyncio.run(cache.aload("link_1", stream())) is columns
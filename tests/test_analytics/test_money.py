@@ -0,0 +1,129 @@
+"""Tests for the `money` Module."""
+
+import random
+from decimal import Decimal
+
+import pytest
+from src.analytics.money import (
+    MoneyAggregator, currency_digits, from_minor_units, minor_unit_frame,
+    money_aggregate, to_minor_units
+)
+
+
+BACKENDS = [True, False]
+
+
+def test_minor_units_by_currency():
+    """Test to convert the amounts with the scale of their currency."""
+    assert currency_digits("MXN") == 2
+    assert currency_digits("CLP") == 0
+    assert currency_digits("KWD") == 3
+    assert currency_digits(None) == 2
+
+    assert to_minor_units(0.29, "MXN") == 29
+    assert to_minor_units("10.255", "MXN") == 1026
+    assert to_minor_units(Decimal("1500"), "CLP") == 1500
+    assert to_minor_units(1.2345, "KWD") == 1234
+    assert to_minor_units(None) == 0
+
+    assert from_minor_units(1025, "MXN") == Decimal("10.25")
+    assert from_minor_units(1500, "CLP") == Decimal("1500")
+    assert str(from_minor_units(-5, "BRL")) == "-0.05"
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_minor_unit_frame_is_integer(use_numpy):
+    """Test the amounts of the frame are integer minor units."""
+    frame = minor_unit_frame([
+        {"amount": 0.1, "currency": "MXN"},
+        {"amount": 1500, "currency": "CLP"},
+        {"amount": 2.675, "currency": "USD"},
+    ], ["category"], use_numpy=use_numpy)
+
+    assert list(frame.amounts) == [10, 1500, 268]
+    assert all(isinstance(amount, int) for amount in list(
+        frame.amounts.tolist() if use_numpy else frame.amounts
+    ))
+    assert frame.labels["currency"] == ["MXN", "CLP", "USD"]
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_money_aggregate_is_exact(use_numpy):
+    """Test the sums have no drift, unlike the float sums."""
+    transactions = [
+        {"category": "Fees", "amount": 0.1, "currency": "MXN"}
+    ] * 10_000
+    assert sum(transaction["amount"] for transaction in transactions) != 1000
+
+    assert money_aggregate(transactions, use_numpy=use_numpy) == \
+        [{"category": "Fees", "currency": "MXN", "sum": Decimal("1000.00")}]
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_money_aggregate_by_currency(use_numpy):
+    """Test the currencies are never added, and all the metrics."""
+    transactions = [
+        {"category": "Food", "type": "OUTFLOW", "amount": 10.25,
+         "currency": "MXN"},
+        {"category": "Food", "type": "OUTFLOW", "amount": 0.5,
+         "currency": "MXN"},
+        {"category": "Food", "type": "OUTFLOW", "amount": 1500,
+         "currency": "CLP"},
+        {"category": "Salary", "type": "INFLOW", "amount": 100,
+         "currency": "MXN"},
+    ]
+
+    rows = money_aggregate(
+        transactions, ["category"], ["sum", "count", "mean", "min", "max"],
+        filters={"type": ["OUTFLOW"]}, use_numpy=use_numpy
+    )
+    assert rows == [
+        {"category": "Food", "currency": "MXN", "sum": Decimal("10.75"),
+         "count": 2, "mean": Decimal("5.375"), "min": Decimal("0.50"),
+         "max": Decimal("10.25")},
+        {"category": "Food", "currency": "CLP", "sum": Decimal("1500"),
+         "count": 1, "mean": Decimal("1500"), "min": Decimal("1500"),
+         "max": Decimal("1500")},
+    ]
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_money_aggregator_agrees_with_decimal(use_numpy):
+    """Test the chunks of a big history sum exactly like `Decimal`."""
+    rng = random.Random(0)
+    transactions = [
+        {
+            "category": rng.choice(["Food", "Rent", "Fun"]),
+            "currency": rng.choice(["MXN", "CLP"]),
+            "amount": round(rng.uniform(-1000, 100_000), 2),
+        }
+        for _ in range(5000)
+    ]
+    for transaction in transactions:
+        if transaction["currency"] == "CLP":
+            transaction["amount"] = round(transaction["amount"])
+
+    aggregator = MoneyAggregator(["category"], ["sum"], use_numpy=use_numpy)
+    for start in range(0, len(transactions), 1000):
+        aggregator.update(transactions[start:start + 1000])
+
+    expected = {}
+    for transaction in transactions:
+        key = (transaction["category"], transaction["currency"])
+        expected[key] = expected.get(key, 0) + \
+            Decimal(str(transaction["amount"]))
+    assert {
+        (row["category"], row["currency"]): row["sum"]
+        for row in aggregator.rows()
+    } == expected
+
+
+def test_money_sums_over_the_float_precision():
+    """Test the int64 sums stay exact beyond the 53 bits of a float."""
+    transactions = [
+        {"category": "Big", "currency": "MXN", "amount": 2 ** 52 / 100},
+        {"category": "Big", "currency": "MXN", "amount": 2 ** 52 / 100},
+        {"category": "Big", "currency": "MXN", "amount": 0.01},
+    ]
+    rows = money_aggregate(transactions, use_numpy=True)
+    assert rows[0]["sum"] == from_minor_units(2 ** 53 + 1, "MXN")
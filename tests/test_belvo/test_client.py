@@ -1,8 +1,12 @@
 """Tests for the Client class for Belvo."""
 
+import asyncio
+from unittest.mock import patch
+
 import pytest
-from src.belvo.client import Client
+from src.belvo.client import AsyncClient, Client
 from src.belvo.exceptions import BelvoException
+from src.belvo.http import AsyncAPISession
 
 
 @pytest.fixture
@@ -52,3 +56,39 @@ def test_client_resources_uses_same_session_as_client(resource_name):
     )
 
     assert client.session is getattr(client, resource_name).session
+
+
+def test_async_client_login_only_once():
+    """Test AsyncClient performs the login only the first time."""
+    client = AsyncClient(
+        secret_key_id="y", secret_key_password="z", url="http://fake.url"
+    )
+    with patch.object(AsyncAPISession, 'login', return_value=True) as login:
+        asyncio.run(client.login())
+        asyncio.run(client.login())
+
+    assert login.await_count == 1
+
+
+def test_async_client_will_raise_exception_when_login_has_failed():
+    """Test AsyncClient raises exception when login has failed."""
+    client = AsyncClient(
+        secret_key_id="a", secret_key_password="b", url="http://fake.url"
+    )
+    with patch.object(AsyncAPISession, 'login', return_value=False), \
+            pytest.raises(BelvoException) as exc:
+        asyncio.run(client.login())
+
+    assert str(exc.value) == "Login failed."
+
+
+@pytest.mark.parametrize(
+    "resource_name", ["Accounts", "Links", "Owners", "Transactions"]
+)
+def test_async_client_resources_uses_same_session(resource_name):
+    """Test AsyncClient resources uses same session as AsyncClient."""
+    client = AsyncClient(
+        secret_key_id="y", secret_key_password="z", url="http://fake.url"
+    )
+
+    assert client.session is getattr(client, resource_name).session
@@ -0,0 +1,61 @@
+"""Tests for the `decoders` Module."""
+
+from unittest.mock import patch
+
+import pytest
+from src.belvo import decoders
+from src.belvo.decoders import get_decoder, json_decoder, orjson_decoder
+from src.belvo.http import APISession
+
+
+BODY = b'{"results": [{"amount": 10.5, "category": "Caf\\u00e9"}]}'
+
+
+@pytest.mark.parametrize("decoder", [json_decoder, orjson_decoder])
+def test_decoders_decode_the_same(decoder):
+    """Test every decoder returns the same objects."""
+    assert decoder(BODY) == {
+        "results": [{"amount": 10.5, "category": "Café"}]
+    }
+
+
+@pytest.mark.parametrize("decoder", [json_decoder, orjson_decoder])
+def test_decoders_raise_value_error(decoder):
+    """Test every decoder raises ValueError with an invalid JSON."""
+    with pytest.raises(ValueError):
+        decoder(b"<html>Bad Gateway</html>")
+
+
+def test_get_decoder():
+    """Test to get the decoders by name, `auto` prefers orjson."""
+    assert get_decoder("json") is json_decoder
+    assert get_decoder("orjson") is orjson_decoder
+    assert get_decoder() is orjson_decoder
+
+    with pytest.raises(ValueError):
+        get_decoder("yaml")
+
+
+def test_get_decoder_without_orjson():
+    """Test the stdlib is the fallback when orjson is not installed."""
+    with patch.object(decoders, "orjson", None):
+        assert get_decoder() is json_decoder
+        with pytest.raises(ImportError):
+            get_decoder("orjson")
+
+
+def test_session_use_the_decoder(responses, fake_url):
+    """Test the session decodes the responses with its decoder."""
+    responses.add(
+        responses.GET, f"{fake_url}/api/resource/1/", body=BODY
+    )
+    calls = []
+
+    def decoder(content):
+        calls.append(content)
+        return json_decoder(content)
+
+    session = APISession(fake_url, decoder=decoder)
+
+    assert session.get("/api/resource/", "1")["results"][0]["amount"] == 10.5
+    assert calls == [BODY]
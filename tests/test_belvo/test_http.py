@@ -1,7 +1,18 @@
 """Tests for the HTTP module."""
 
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
 import pytest
-from src.belvo.http import APISession
+from requests import ConnectionError, HTTPError
+from src.belvo.exceptions import RequestError
+from src.belvo.http import (
+    MAX_PAGE_SIZE, APISession, AsyncAPISession, decode_cursor, encode_cursor,
+    normalize_params, page_params
+)
+from src.belvo.retry import HedgePolicy, RetryPolicy
 
 
 @pytest.mark.parametrize("wrong_http_code", [400, 401, 403, 500])
@@ -81,6 +92,248 @@ def test_get_yields_results_whit_next_page(responses, fake_url, api_session):
     ]
 
 
+def test_list_with_prefetch_yields_all_pages(responses, fake_url, api_session):
+    """Test the list with prefetch yields the results of every page.
+
+    Args:
+        responses (fixture): PyTest responses fixture.
+        fake_url (str): Fake URL for the Belvo API.
+        api_session (fixture): Fake API Session for the Belvo API.
+    """
+    resource_url = "{}/api/resources/".format(fake_url)
+    for page in range(1, 4):
+        url = resource_url if page == 1 else f"{resource_url}?page={page}"
+        responses.add(responses.GET, url, status=200, json={
+            "next": f"{resource_url}?page={page + 1}" if page < 3 else None,
+            "results": [page * 10, page * 10 + 1],
+        })
+
+    results = list(api_session.list("/api/resources/", prefetch=2))
+
+    assert results == [10, 11, 20, 21, 30, 31]
+
+
+def test_list_stops_after_max_pages(responses, fake_url, api_session):
+    """Test the list doesn't follow `next` after `max_pages` pages.
+
+    Args:
+        responses (fixture): PyTest responses fixture.
+        fake_url (str): Fake URL for the Belvo API.
+        api_session (fixture): Fake API Session for the Belvo API.
+    """
+    resource_url = f"{fake_url}/api/resources/"
+    responses.add(
+        responses.GET, f"{resource_url}?page_size=2", json={
+            "next": f"{resource_url}?page=2&page_size=2", "results": [1, 2]
+        }
+    )
+
+    results = list(api_session.list(
+        "/api/resources/", page_size=2, max_pages=1
+    ))
+
+    assert results == [1, 2]
+    assert len(responses.calls) == 2  # login and the first page
+
+
+def test_page_returns_one_page_and_cursor(responses, fake_url, api_session):
+    """Test the page makes a single request and the cursor gets the next.
+
+    Args:
+        responses (fixture): PyTest responses fixture.
+        fake_url (str): Fake URL for the Belvo API.
+        api_session (fixture): Fake API Session for the Belvo API.
+    """
+    resource_url = f"{fake_url}/api/resources/"
+    responses.add(
+        responses.GET, f"{resource_url}?link=1&page_size={MAX_PAGE_SIZE}",
+        json={
+            "count": 3, "results": [1, 2],
+            "next": f"{resource_url}?link=1&page=2&page_size=2",
+        }
+    )
+    responses.add(
+        responses.GET, f"{resource_url}?link=1&page=2&page_size=2",
+        json={"count": 3, "results": [3], "next": None}
+    )
+
+    first = api_session.page(
+        "/api/resources/", params={"link": "1"}, page_size=5000
+    )
+    last = api_session.page(
+        "/api/resources/", params={"link": "2"}, cursor=first["next"]
+    )
+
+    assert first["results"] == [1, 2]
+    assert first["count"] == 3
+    assert last == {"count": 3, "results": [3], "next": None}
+
+
+def test_page_params():
+    """Test the page size is added to a copy of the params, within limits."""
+    params = {"link": "1"}
+
+    assert page_params(params) == {"link": "1"}
+    assert page_params(params, 0) == {"link": "1", "page_size": 1}
+    assert page_params(None, 50) == {"page_size": 50}
+    assert page_params(params, MAX_PAGE_SIZE + 1)["page_size"] == \
+        MAX_PAGE_SIZE
+    assert params == {"link": "1"}
+
+
+def test_cursor_keeps_only_the_query():
+    """Test the cursor can't point to another host."""
+    cursor = encode_cursor("http://evil.url/api/resources/?page=2&link=1")
+
+    assert "evil" not in cursor
+    assert decode_cursor(cursor) == {"page": "2", "link": "1"}
+    assert encode_cursor(None) is None
+
+
+@pytest.mark.parametrize("cursor", ["%%%", "", "cGFnZQ", "_w"])
+def test_decode_invalid_cursor(cursor):
+    """Test an invalid cursor raises ValueError."""
+    with pytest.raises(ValueError, match="Invalid cursor."):
+        decode_cursor(cursor)
+
+
+def test_get_share_identical_concurrent_requests(
+        responses, fake_url, api_session):
+    """Test identical requests at the same time share one Belvo request.
+
+    Args:
+        responses (fixture): PyTest responses fixture.
+        fake_url (str): Fake URL for the Belvo API.
+        api_session (fixture): Fake API Session for the Belvo API.
+    """
+    resource_url = f"{fake_url}/api/resource/123/"
+
+    def slow_response(request):
+        time.sleep(0.2)
+        return 200, {}, '{"id": "123"}'
+
+    responses.add_callback(responses.GET, resource_url, slow_response)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(
+            lambda _: api_session.get("/api/resource/", "123"), range(4)
+        ))
+
+    resource_calls = [
+        call for call in responses.calls if call.request.url == resource_url
+    ]
+    assert results == [{"id": "123"}] * 4
+    assert len(resource_calls) == 1
+
+
+def test_get_retry_transient_errors(responses, fake_url, api_session):
+    """Test a 503 and a connection error are retried, honor Retry-After.
+
+    Args:
+        responses (fixture): PyTest responses fixture.
+        fake_url (str): Fake URL for the Belvo API.
+        api_session (fixture): Fake API Session for the Belvo API.
+    """
+    resource_url = f"{fake_url}/api/resource/123/"
+    responses.add(
+        responses.GET, resource_url, json={}, status=503,
+        headers={"Retry-After": "0"}
+    )
+    responses.add(responses.GET, resource_url, body=ConnectionError())
+    responses.add(responses.GET, resource_url, json={"id": "123"})
+
+    response = api_session.get(
+        "/api/resource/", "123",
+        retry_policy=RetryPolicy(attempts=3, backoff=0.01)
+    )
+
+    assert response == {"id": "123"}
+
+
+def test_get_raise_when_retries_are_exhausted(
+        responses, fake_url, api_session):
+    """Test the last error is raised when there are no more attempts.
+
+    Args:
+        responses (fixture): PyTest responses fixture.
+        fake_url (str): Fake URL for the Belvo API.
+        api_session (fixture): Fake API Session for the Belvo API.
+    """
+    resource_url = f"{fake_url}/api/resource/123/"
+    responses.add(responses.GET, resource_url, json={}, status=503)
+    responses.add(responses.GET, resource_url, body=ConnectionError())
+
+    with pytest.raises(HTTPError):
+        api_session.get(
+            "/api/resource/", "123", retry_policy=RetryPolicy(attempts=1)
+        )
+    with pytest.raises(ConnectionError):
+        api_session.get(
+            "/api/resource/", "123", retry_policy=RetryPolicy(attempts=1)
+        )
+
+
+def test_get_hedge_slow_requests(responses, fake_url, api_session):
+    """Test a slow request is duplicated and the first response wins.
+
+    Args:
+        responses (fixture): PyTest responses fixture.
+        fake_url (str): Fake URL for the Belvo API.
+        api_session (fixture): Fake API Session for the Belvo API.
+    """
+    resource_url = f"{fake_url}/api/resource/123/"
+    delays = [0.5, 0.0]
+
+    def response(request):
+        time.sleep(delays.pop(0))
+        return 200, {}, '{"id": "123"}'
+
+    responses.add_callback(responses.GET, resource_url, response)
+    hedge_policy = HedgePolicy(min_samples=1, min_delay=0.05)
+    hedge_policy.record(0.05)
+
+    start = time.perf_counter()
+    result = api_session.get(
+        "/api/resource/", "123", hedge_policy=hedge_policy
+    )
+
+    assert result == {"id": "123"}
+    assert time.perf_counter() - start < 0.4
+    assert hedge_policy.hedged == 1
+
+
+def test_get_hedge_raise_when_all_fail(responses, fake_url, api_session):
+    """Test the error is raised if the request and its duplicate fail.
+
+    Args:
+        responses (fixture): PyTest responses fixture.
+        fake_url (str): Fake URL for the Belvo API.
+        api_session (fixture): Fake API Session for the Belvo API.
+    """
+    def response(request):
+        time.sleep(0.1)
+        raise ConnectionError("Reset")
+
+    responses.add_callback(
+        responses.GET, f"{fake_url}/api/resource/123/", response
+    )
+    hedge_policy = HedgePolicy(min_samples=1, min_delay=0.01)
+    hedge_policy.record(0.01)
+
+    with pytest.raises(ConnectionError):
+        api_session.get(
+            "/api/resource/", "123", hedge_policy=hedge_policy,
+            retry_policy=RetryPolicy(attempts=1)
+        )
+
+
+def test_normalize_params():
+    """Test the params are sorted, without None values and timeout."""
+    params = {"b": 1, "a": ["x", "y"], "c": None, "timeout": 10}
+
+    assert normalize_params(params) == (("a", ("x", "y")), ("b", 1))
+    assert normalize_params(None) == ()
+
+
 def test_login_sets_correct_user_agent(responses, fake_url):
     """Test that login sets the correct user agent.
 
@@ -111,3 +364,304 @@ def test_login_sets_key_id(responses, fake_url):
     session.login(secret_key_id="monty", secret_key_password="python")
 
     assert session.key_id == "monty"
+
+
+def test_get_login_again_when_unauthorized(responses, fake_url, api_session):
+    """Test that a 401 response performs a new login and retries once.
+
+    Args:
+        responses (fixture): PyTest responses fixture.
+        fake_url (str): Fake URL for the Belvo API.
+        api_session (fixture): Fake API Session for the Belvo API.
+    """
+    resource_url = f"{fake_url}/api/resource/123/"
+    expected_response = {"id": "123", "name": "Test Resource"}
+
+    responses.add(responses.GET, resource_url, json={}, status=401)
+    responses.add(
+        responses.GET, resource_url, json=expected_response, status=200
+    )
+    response = api_session.get("/api/resource/", "123")
+
+    login_calls = [
+        call for call in responses.calls
+        if call.request.url == f"{fake_url}/api/"
+    ]
+    assert response == expected_response
+    assert len(login_calls) == 2
+
+
+def test_get_raise_when_unauthorized_without_login(responses, fake_url):
+    """Test that a 401 response is raised if the session never logged in.
+
+    Args:
+        responses (fixture): PyTest responses fixture.
+        fake_url (str): Fake URL for the Belvo API.
+    """
+    responses.add(
+        responses.GET, f"{fake_url}/api/resource/123/", json={}, status=401
+    )
+    session = APISession(fake_url)
+
+    with pytest.raises(HTTPError):
+        session.get("/api/resource/", "123")
+
+
+# ### ### ### ###
+# Start Tests for the `AsyncAPISession` Class:
+# ### ### ### ###
+
+
+def _async_session(fake_url, routes):
+    """Create an AsyncAPISession answered by a mocked transport.
+
+    Args:
+        fake_url (str): Fake URL for the Belvo API.
+        routes (dict): Map of URL to a list of (status, json) responses,
+            consumed in order for each request to that URL.
+    """
+    calls = []
+
+    def handler(request):
+        calls.append(str(request.url))
+        status, payload = routes[str(request.url)].pop(0)
+        return httpx.Response(status, json=payload)
+
+    session = AsyncAPISession(fake_url, transport=httpx.MockTransport(handler))
+    return session, calls
+
+
+@pytest.mark.parametrize("wrong_http_code", [400, 401, 403, 500])
+def test_async_login_false_whit_bad_response(wrong_http_code, fake_url):
+    """Test that async login returns False when the response is not 200."""
+    session, _ = _async_session(
+        fake_url, {f"{fake_url}/api/": [(wrong_http_code, {})]}
+    )
+    result = asyncio.run(session.login("monty", "python"))
+
+    assert not result
+    assert session.key_id == "monty"
+
+
+def test_async_get_method(fake_url):
+    """Test the get method of the AsyncAPISession."""
+    expected_response = {"id": "123", "name": "Test Resource"}
+    session, _ = _async_session(fake_url, {
+        f"{fake_url}/api/": [(200, {})],
+        f"{fake_url}/api/resource/123/": [(200, expected_response)],
+    })
+
+    async def run():
+        await session.login("monty", "python")
+        return await session.get("/api/resource/", "123")
+
+    assert asyncio.run(run()) == expected_response
+    assert session.headers["User-Agent"] == "fapi-financial (2024)"
+
+
+def test_async_list_yields_results_whit_next_page(fake_url):
+    """Test the async list follows the next page and skip None params."""
+    resource_url = f"{fake_url}/api/resources/"
+    session, calls = _async_session(fake_url, {
+        f"{resource_url}?link=1": [
+            (200, {"next": f"{resource_url}?page=2", "results": [1, 2]})
+        ],
+        f"{resource_url}?page=2": [(200, {"next": None, "results": [3]})],
+    })
+
+    async def run():
+        params = {"link": "1", "account": None}
+        return [item async for item in session.list(
+            "/api/resources/", params=params
+        )]
+
+    assert asyncio.run(run()) == [1, 2, 3]
+    assert calls == [f"{resource_url}?link=1", f"{resource_url}?page=2"]
+
+
+def test_async_get_login_again_when_unauthorized(fake_url):
+    """Test that a 401 response performs a new login and retries once."""
+    expected_response = {"id": "123"}
+    session, calls = _async_session(fake_url, {
+        f"{fake_url}/api/": [(200, {}), (200, {})],
+        f"{fake_url}/api/resource/123/": [
+            (401, {}), (200, expected_response)
+        ],
+    })
+
+    async def run():
+        await session.login("monty", "python")
+        return await session.get("/api/resource/", "123")
+
+    assert asyncio.run(run()) == expected_response
+    assert calls.count(f"{fake_url}/api/") == 2
+
+
+def test_async_get_raise_request_error(fake_url):
+    """Test that an error response is raised as a RequestError."""
+    session, _ = _async_session(fake_url, {
+        f"{fake_url}/api/resource/123/": [(404, {"detail": "Not found"})],
+    })
+
+    with pytest.raises(RequestError) as exc:
+        asyncio.run(session.get("/api/resource/", "123"))
+
+    assert exc.value.status_code == 404
+    assert exc.value.detail == {"detail": "Not found"}
+
+
+def test_async_get_raise_request_error_without_json(fake_url):
+    """Test that an error response without JSON keeps the text detail."""
+    def handler(request):
+        return httpx.Response(502, text="Bad Gateway")
+
+    session = AsyncAPISession(fake_url, transport=httpx.MockTransport(handler))
+
+    with pytest.raises(RequestError) as exc:
+        asyncio.run(session.get("/api/resource/", "123"))
+
+    assert exc.value.status_code == 502
+    assert exc.value.detail == "Bad Gateway"
+    asyncio.run(session.aclose())
+
+
+def test_async_get_share_identical_concurrent_requests(fake_url):
+    """Test identical async requests at the same time share one request."""
+    calls = []
+
+    async def handler(request):
+        calls.append(str(request.url))
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"id": "123"})
+
+    session = AsyncAPISession(fake_url, transport=httpx.MockTransport(handler))
+
+    async def run():
+        return await asyncio.gather(*[
+            session.get("/api/resource/", "123", params={"page": 1})
+            for _ in range(5)
+        ])
+
+    assert asyncio.run(run()) == [{"id": "123"}] * 5
+    assert len(calls) == 1
+
+
+def test_async_get_retry_transient_errors(fake_url):
+    """Test the async get retries a 429 and a connection error."""
+    attempts = []
+
+    def handler(request):
+        attempts.append(1)
+        if len(attempts) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        if len(attempts) == 2:
+            raise httpx.ConnectError("Reset")
+        return httpx.Response(200, json={"id": "123"})
+
+    session = AsyncAPISession(
+        fake_url, transport=httpx.MockTransport(handler),
+        retry_policy=RetryPolicy(attempts=3, backoff=0.01)
+    )
+
+    assert asyncio.run(session.get("/api/resource/", "123")) == {"id": "123"}
+    assert len(attempts) == 3
+
+
+def test_async_get_raise_when_retries_are_exhausted(fake_url):
+    """Test the async get raises the connection error of the last attempt."""
+    def handler(request):
+        raise httpx.ConnectError("Reset")
+
+    session = AsyncAPISession(
+        fake_url, transport=httpx.MockTransport(handler),
+        retry_policy=RetryPolicy(attempts=2, backoff=0.01)
+    )
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(session.get("/api/resource/", "123"))
+
+
+def test_async_get_hedge_slow_requests(fake_url):
+    """Test a slow async request is duplicated and the loser cancelled."""
+    delays = [1.0, 0.0]
+
+    async def handler(request):
+        await asyncio.sleep(delays.pop(0))
+        return httpx.Response(200, json={"id": "123"})
+
+    session = AsyncAPISession(fake_url, transport=httpx.MockTransport(handler))
+    hedge_policy = HedgePolicy(min_samples=1, min_delay=0.05)
+    hedge_policy.record(0.05)
+
+    start = time.perf_counter()
+    result = asyncio.run(session.get(
+        "/api/resource/", "123", hedge_policy=hedge_policy
+    ))
+
+    assert result == {"id": "123"}
+    assert time.perf_counter() - start < 0.5
+    assert hedge_policy.hedged == 1
+
+
+def test_async_get_hedge_raise_when_all_fail(fake_url):
+    """Test the async error is raised if all the requests fail."""
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        raise httpx.ConnectError("Reset")
+
+    session = AsyncAPISession(
+        fake_url, transport=httpx.MockTransport(handler),
+        retry_policy=RetryPolicy(attempts=1)
+    )
+    hedge_policy = HedgePolicy(min_samples=1, min_delay=0.01)
+    hedge_policy.record(0.01)
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(session.get(
+            "/api/resource/", "123", hedge_policy=hedge_policy
+        ))
+
+
+def test_async_page_returns_one_page_and_cursor(fake_url):
+    """Test the async page makes a single request and returns the cursor."""
+    resource_url = f"{fake_url}/api/resources/"
+    session, calls = _async_session(fake_url, {
+        f"{resource_url}?link=1&page_size=500": [(200, {
+            "count": 3, "results": [1, 2],
+            "next": f"{resource_url}?link=1&page=2&page_size=500",
+        })],
+        f"{resource_url}?link=1&page=2&page_size=500": [
+            (200, {"count": 3, "results": [3], "next": None})
+        ],
+    })
+
+    async def run():
+        first = await session.page(
+            "/api/resources/", params={"link": "1"}, page_size=500
+        )
+        last = await session.page("/api/resources/", cursor=first["next"])
+        return first, last
+
+    first, last = asyncio.run(run())
+
+    assert first["results"] == [1, 2]
+    assert last["next"] is None
+    assert len(calls) == 2
+
+
+def test_async_list_stops_after_max_pages(fake_url):
+    """Test the async list doesn't follow `next` after `max_pages` pages."""
+    resource_url = f"{fake_url}/api/resources/"
+    session, calls = _async_session(fake_url, {
+        resource_url: [
+            (200, {"next": f"{resource_url}?page=2", "results": [1, 2]})
+        ],
+    })
+
+    async def run():
+        return [item async for item in session.list(
+            "/api/resources/", max_pages=1
+        )]
+
+    assert asyncio.run(run()) == [1, 2]
+    assert calls == [resource_url]
@@ -1,11 +1,14 @@
 """Tests for the `instance` Module for Injects."""
 
+import asyncio
 from unittest.mock import patch
 
 import pytest
-from src.belvo.client import Client
-from src.belvo.http import APISession
-from src.belvo.instance import get_belvo_client
+from src.belvo.client import AsyncClient, Client
+from src.belvo.http import APISession, AsyncAPISession
+from src.belvo.instance import (
+    ClientRegistry, get_async_belvo_client, get_belvo_client
+)
 
 
 @pytest.fixture
@@ -43,3 +46,43 @@ def test_belvo_client_instance_creation(mock_belvo_client):
         assert isinstance(client, Client)
     except Exception as e:
         pytest.fail(f"Unexpected error occurred: {e}")
+
+
+def test_belvo_client_is_shared_between_calls(mock_belvo_client):
+    """Test Belvo Client is created only once and then reused."""
+    assert get_belvo_client() is get_belvo_client()
+
+
+def test_client_registry_login_only_once():
+    """Test ClientRegistry performs the login only once per credentials."""
+    registry = ClientRegistry()
+    with patch.object(APISession, 'login', return_value=True) as mock_login:
+        first = registry.get("id", "password", "http://fake.url")
+        second = registry.get("id", "password", "http://fake.url")
+        other = registry.get("other_id", "password", "http://fake.url")
+
+    assert first is second
+    assert first is not other
+    assert mock_login.call_count == 2
+
+
+def test_client_registry_clear():
+    """Test ClientRegistry creates a new Client after clear."""
+    registry = ClientRegistry()
+    with patch.object(APISession, 'login', return_value=True):
+        first = registry.get("id", "password", "http://fake.url")
+        registry.clear()
+        second = registry.get("id", "password", "http://fake.url")
+
+    assert first is not second
+
+
+def test_async_belvo_client_is_shared_and_logged_in():
+    """Test Belvo AsyncClient is logged in once and then reused."""
+    with patch.object(AsyncAPISession, 'login', return_value=True) as login:
+        first = asyncio.run(get_async_belvo_client())
+        second = asyncio.run(get_async_belvo_client())
+
+    assert isinstance(first, AsyncClient)
+    assert first is second
+    assert login.await_count == 1
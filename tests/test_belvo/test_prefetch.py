@@ -0,0 +1,152 @@
+"""Tests for the `prefetch` Module."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from src.belvo.prefetch import aprefetch, prefetch
+
+
+def test_prefetch_keeps_the_order_of_pages():
+    """Test prefetch yields all the pages in the same order."""
+    assert list(prefetch(iter(range(10)), depth=2)) == list(range(10))
+
+
+def test_prefetch_raise_errors_of_the_pages():
+    """Test prefetch raises the error found while fetching a page."""
+    def pages():
+        yield 1
+        raise ValueError("Page failed")
+
+    results = []
+    with pytest.raises(ValueError, match="Page failed"):
+        for page in prefetch(pages(), depth=2):
+            results.append(page)
+
+    assert results == [1]
+
+
+def test_prefetch_fetch_at_most_depth_pages_ahead():
+    """Test prefetch memory is bounded by the depth of the buffer."""
+    fetched = []
+
+    def pages():
+        for number in range(100):
+            fetched.append(number)
+            yield number
+
+    generator = prefetch(pages(), depth=2)
+    assert next(generator) == 0
+    time.sleep(0.3)
+
+    # 1 consumed + 2 buffered + 1 waiting for space in the buffer
+    assert len(fetched) <= 4
+    generator.close()
+
+
+def test_prefetch_stops_the_thread_when_closed():
+    """Test prefetch stops fetching when the consumer leaves."""
+    fetched = []
+
+    def pages():
+        for number in range(100):
+            fetched.append(number)
+            yield number
+
+    generator = prefetch(pages(), depth=1)
+    next(generator)
+    generator.close()
+    time.sleep(0.3)
+    total = len(fetched)
+    time.sleep(0.3)
+
+    assert len(fetched) == total < 100
+
+
+def test_prefetch_closes_the_pages_when_closed():
+    """Test prefetch closes the pages when the consumer leaves."""
+    closed = threading.Event()
+
+    def pages():
+        try:
+            for number in range(100):
+                yield number
+        finally:
+            closed.set()
+
+    generator = prefetch(pages(), depth=1)
+    next(generator)
+    generator.close()
+
+    assert closed.wait(1)
+
+
+def test_aprefetch_keeps_the_order_of_pages():
+    """Test aprefetch yields all the pages in the same order."""
+    async def pages():
+        for number in range(10):
+            await asyncio.sleep(0)
+            yield number
+
+    async def run():
+        return [page async for page in aprefetch(pages(), depth=2)]
+
+    assert asyncio.run(run()) == list(range(10))
+
+
+def test_aprefetch_fetch_next_page_while_consuming():
+    """Test aprefetch requests the next page while the current is used."""
+    async def pages():
+        for number in range(3):
+            await asyncio.sleep(0.1)
+            yield number
+
+    async def run():
+        results = []
+        async for page in aprefetch(pages(), depth=1):
+            await asyncio.sleep(0.1)
+            results.append(page)
+        return results
+
+    start = time.perf_counter()
+    assert asyncio.run(run()) == [0, 1, 2]
+
+    # Sequential would take 0.6s, pipelined takes around 0.4s
+    assert time.perf_counter() - start < 0.55
+
+
+def test_aprefetch_raise_errors_of_the_pages():
+    """Test aprefetch raises the error found while fetching a page."""
+    async def pages():
+        yield 1
+        raise ValueError("Page failed")
+
+    async def run():
+        return [page async for page in aprefetch(pages(), depth=2)]
+
+    with pytest.raises(ValueError, match="Page failed"):
+        asyncio.run(run())
+
+
+def test_aprefetch_closes_the_pages_when_the_consumer_leaves():
+    """Test aprefetch stops the task and closes the pages at once."""
+    fetched, closed = [], []
+
+    async def pages():
+        try:
+            for number in range(100):
+                fetched.append(number)
+                yield number
+        finally:
+            closed.append(True)
+
+    async def run():
+        generator = aprefetch(pages(), depth=2)
+        first = await generator.__anext__()
+        await generator.aclose()
+        # Closed now, not when the loop finalizes the generators
+        return first, list(closed)
+
+    assert asyncio.run(run()) == (0, [True])
+    assert len(fetched) < 100
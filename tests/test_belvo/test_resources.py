@@ -1,8 +1,14 @@
 """Tests for the Resources module."""
 
+import asyncio
+from unittest.mock import patch
+
 import pytest
-from src.belvo.http import APISession
-from src.belvo.resources.base import Resource
+from src.belvo.exceptions import RequestError
+from src.belvo.http import APISession, AsyncAPISession
+from src.belvo.resources import AsyncTransactions
+from src.belvo.resources.base import AsyncResource, Resource
+from src.core.cache import TTLCache
 
 
 @pytest.fixture
@@ -62,3 +68,314 @@ def test_resource_list_method(responses, fake_url, resource):
 
     assert len(results) == 2
     assert results == expected_response
+
+
+def test_resource_page_method(responses, fake_url, resource):
+    """Test the page method gets only one page with the next cursor.
+
+    Args:
+        responses (fixture): PyTest responses fixture.
+        fake_url (str): Fake URL for the Belvo API.
+        resource (fixture): Fake Resource for the Belvo API.
+    """
+    resource.endpoint = "/api/resources/"
+    resource_url = f"{fake_url}{resource.endpoint}"
+    responses.add(
+        responses.GET, f"{resource_url}?fields=id&page_size=10", json={
+            "count": 20, "results": [{"id": "1"}],
+            "next": f"{resource_url}?fields=id&page=2&page_size=10",
+        }
+    )
+
+    page = resource.page(page_size=10, fields="id")
+
+    assert page["results"] == [{"id": "1"}]
+    assert page["next"] is not None
+    assert len(responses.calls) == 1
+
+
+def test_async_transactions_page_method(fake_url):
+    """Test the page of the AsyncTransactions filters by the Link."""
+    transactions = AsyncTransactions(AsyncAPISession(fake_url))
+
+    with patch.object(AsyncAPISession, 'page', return_value={}) as mock_page:
+        asyncio.run(transactions.page("link_id", page_size=100))
+
+    mock_page.assert_awaited_once_with(
+        "/api/transactions/", params={"link": "link_id"}, cursor=None,
+        page_size=100, retry_policy=AsyncTransactions.retry_policy
+    )
+
+
+def test_async_resource_get_method(fake_url):
+    """Test the get method from the AsyncResource class."""
+    session = AsyncAPISession(fake_url)
+    resource = AsyncResource(session)
+    resource.endpoint = "/api/resource/"
+
+    with patch.object(AsyncAPISession, 'get', return_value={"id": "1"}) \
+            as mock_get:
+        response = asyncio.run(resource.get("1", fields="id"))
+
+    assert response == {"id": "1"}
+    mock_get.assert_awaited_once_with(
+        "/api/resource/", "1", params={"fields": "id"}
+    )
+
+
+def test_async_transactions_list_method(fake_url):
+    """Test the list method from the AsyncTransactions class."""
+    session = AsyncAPISession(fake_url)
+    resource = AsyncTransactions(session)
+    expected_response = [{"id": "1"}, {"id": "2"}]
+
+    async def run():
+        return [item async for item in resource.list("link_id")]
+
+    with patch.object(AsyncAPISession, '_get', return_value={
+        "results": expected_response, "next": None
+    }) as mock_get:
+        results = asyncio.run(run())
+
+    assert results == expected_response
+    mock_get.assert_awaited_once_with(
+        f"{fake_url}/api/transactions/", params={"link": "link_id"},
+        retry_policy=AsyncTransactions.retry_policy
+    )
+
+
+# ### ### ### ###
+# Start Tests for the cache of Resources:
+# ### ### ### ###
+
+
+@pytest.fixture
+def cached_resource(mock_session):
+    """Mock a resource with a cache for API."""
+    resource = Resource(mock_session, cache=TTLCache())
+    resource.endpoint = "/api/resources/"
+    resource.cache_ttl = 60
+    return resource
+
+
+def test_resource_get_uses_cache(responses, fake_url, cached_resource):
+    """Test the get method only calls Belvo the first time."""
+    responses.add(
+        responses.GET, f"{fake_url}/api/resources/1/",
+        json={"id": "1"}, status=200
+    )
+
+    assert cached_resource.get("1") == {"id": "1"}
+    assert cached_resource.get("1") == {"id": "1"}
+    assert len(responses.calls) == 1
+    assert cached_resource.cache.stats()["hits"] == 1
+
+
+def test_resource_list_uses_cache(responses, fake_url, cached_resource):
+    """Test the list is cached once all the items were consumed."""
+    responses.add(
+        responses.GET, f"{fake_url}/api/resources/", status=200,
+        json={"results": [{"id": "1"}, {"id": "2"}], "next": None}
+    )
+
+    first = list(cached_resource.list(institution="bank", other=None))
+    second = list(cached_resource.list(institution="bank"))
+
+    assert first == second == [{"id": "1"}, {"id": "2"}]
+    assert len(responses.calls) == 1
+
+
+def test_resource_list_cache_returns_copies(responses, fake_url,
+                                            cached_resource):
+    """Test the changes of a caller don't change the cached responses."""
+    responses.add(
+        responses.GET, f"{fake_url}/api/resources/1/",
+        json={"id": "1"}, status=200
+    )
+    responses.add(
+        responses.GET, f"{fake_url}/api/resources/", status=200,
+        json={"results": [{"id": "1"}], "next": None}
+    )
+    for item in cached_resource.list():
+        item["id"] = "changed"
+    next(cached_resource.list())["id"] = "changed"
+    cached_resource.get("1")["id"] = "changed"
+    cached_resource.get("1")["id"] = "changed"
+
+    assert list(cached_resource.list()) == [{"id": "1"}]
+    assert cached_resource.get("1") == {"id": "1"}
+
+
+def test_resource_long_list_not_cached(responses, fake_url,
+                                       cached_resource):
+    """Test the lists longer than `cache_max_items` are not cached."""
+    cached_resource.cache_max_items = 2
+    responses.add(
+        responses.GET, f"{fake_url}/api/resources/", status=200,
+        json={"results": [{"id": "1"}, {"id": "2"}], "next": None}
+    )
+    responses.add(
+        responses.GET, f"{fake_url}/api/resources/", status=200,
+        json={"results": [{"id": "1"}, {"id": "2"}, {"id": "3"}],
+              "next": None}
+    )
+
+    assert len(list(cached_resource.list())) == 2
+    cached_resource.invalidate()
+    assert len(list(cached_resource.list())) == 3
+    assert len(cached_resource.cache) == 0
+
+
+def test_resource_lists_weigh_their_items(responses, fake_url,
+                                          cached_resource):
+    """Test the cached lists are bounded by their total items."""
+    cached_resource._cache = TTLCache(maxweight=3)
+    for ids in (["1", "2"], ["3", "4"]):
+        responses.add(
+            responses.GET, f"{fake_url}/api/resources/", status=200,
+            json={"results": [{"id": id} for id in ids], "next": None}
+        )
+
+    list(cached_resource.list(owner="a"))
+    list(cached_resource.list(owner="b"))
+
+    # Both lists weigh 4 items, the first one is evicted
+    assert len(cached_resource.cache) == 1
+    assert cached_resource.cache.stats()["weight"] == 2
+    assert list(cached_resource.list(owner="b")) == [{"id": "3"}, {"id": "4"}]
+
+
+def test_resource_invalidate(responses, fake_url, cached_resource):
+    """Test the invalidate method removes the object and the lists."""
+    responses.add(
+        responses.GET, f"{fake_url}/api/resources/1/",
+        json={"id": "1"}, status=200
+    )
+    responses.add(
+        responses.GET, f"{fake_url}/api/resources/2/",
+        json={"id": "2"}, status=200
+    )
+    responses.add(
+        responses.GET, f"{fake_url}/api/resources/", status=200,
+        json={"results": [{"id": "1"}], "next": None}
+    )
+    cached_resource.get("1")
+    cached_resource.get("2")
+    list(cached_resource.list())
+
+    assert cached_resource.invalidate("1") == 2
+    assert cached_resource.invalidate() == 1
+    assert Resource(cached_resource.session).invalidate() == 0
+
+
+def test_resource_without_ttl_dont_use_cache(responses, fake_url, resource):
+    """Test the resources with cache_ttl 0 always call Belvo."""
+    resource.endpoint = "/api/resources/"
+    resource._cache = TTLCache()
+    responses.add(
+        responses.GET, f"{fake_url}/api/resources/1/",
+        json={"id": "1"}, status=200
+    )
+    resource.get("1")
+    resource.get("1")
+
+    assert len(responses.calls) == 2
+    assert len(resource.cache) == 0
+
+
+def test_async_resource_uses_cache(fake_url):
+    """Test the async get and list methods use the cache."""
+    resource = AsyncResource(AsyncAPISession(fake_url), cache=TTLCache())
+    resource.endpoint = "/api/resources/"
+    resource.cache_ttl = 60
+
+    async def run():
+        await resource.get("1")
+        await resource.get("1")
+        first = [item async for item in resource.list()]
+        second = [item async for item in resource.list()]
+        return first, second
+
+    with patch.object(AsyncAPISession, 'get', return_value={"id": "1"}) \
+            as mock_get, \
+            patch.object(AsyncAPISession, '_get', return_value={
+                "results": [{"id": "1"}], "next": None
+            }) as mock_list:
+        first, second = asyncio.run(run())
+
+    assert first == second == [{"id": "1"}]
+    assert mock_get.await_count == 1
+    assert mock_list.await_count == 1
+
+
+# ### ### ### ###
+# Start Tests for the `get_many` method of Resources:
+# ### ### ### ###
+
+
+def test_resource_get_many_keeps_order_and_errors(
+        responses, fake_url, resource):
+    """Test get_many returns the results in order, with the errors."""
+    resource.endpoint = "/api/resources/"
+    responses.add(
+        responses.GET, f"{fake_url}/api/resources/1/",
+        json={"id": "1"}, status=200
+    )
+    responses.add(
+        responses.GET, f"{fake_url}/api/resources/2/",
+        json={"detail": "Not found"}, status=404
+    )
+    responses.add(
+        responses.GET, f"{fake_url}/api/resources/3/",
+        body="Bad Gateway", status=502
+    )
+
+    results = resource.get_many(["1", "2", "3", "4"], max_concurrency=2)
+
+    assert [result["id"] for result in results] == ["1", "2", "3", "4"]
+    assert results[0] == {"id": "1", "success": True, "data": {"id": "1"}}
+    assert results[1] == {
+        "id": "2", "success": False,
+        "status_code": 404, "detail": {"detail": "Not found"}
+    }
+    assert results[2]["status_code"] == 502
+    assert results[2]["detail"] == "Bad Gateway"
+    assert results[3]["success"] is False
+    assert results[3]["status_code"] is None
+
+
+def test_resource_get_many_without_ids(resource):
+    """Test get_many without IDs doesn't make requests."""
+    assert resource.get_many([]) == []
+
+
+def test_async_resource_get_many_limits_concurrency(fake_url):
+    """Test the async get_many never exceeds the max concurrency."""
+    resource = AsyncResource(AsyncAPISession(fake_url))
+    resource.endpoint = "/api/resources/"
+    running = []
+    max_running = []
+
+    async def fake_get(endpoint, id, params=None):
+        running.append(id)
+        max_running.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(id)
+        if id == "bad":
+            raise RequestError(404, {"detail": "Not found"})
+        if id == "broken":
+            raise ValueError("Broken")
+        return {"id": id}
+
+    ids = [str(number) for number in range(10)] + ["bad", "broken"]
+    with patch.object(AsyncAPISession, 'get', side_effect=fake_get):
+        results = asyncio.run(resource.get_many(ids, max_concurrency=3))
+
+    assert max(max_running) == 3
+    assert [result["id"] for result in results] == ids
+    assert results[0]["data"] == {"id": "0"}
+    assert results[-2]["status_code"] == 404
+    assert results[-1] == {
+        "id": "broken", "success": False,
+        "status_code": None, "detail": "Broken"
+    }
@@ -0,0 +1,64 @@
+"""Tests for the `retry` Module."""
+
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from src.belvo.retry import HedgePolicy, RetryPolicy, retry_after_seconds
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None), ("", None), ("3", 3.0), ("-1", 0.0), ("soon", None),
+])
+def test_retry_after_seconds(value, expected):
+    """Test to parse the Retry-After header in seconds."""
+    assert retry_after_seconds(value) == expected
+
+
+def test_retry_after_seconds_http_date():
+    """Test to parse the Retry-After header as an HTTP date."""
+    date = datetime.now(timezone.utc) + timedelta(seconds=10)
+
+    assert 8 < retry_after_seconds(format_datetime(date, usegmt=True)) <= 10
+
+
+def test_retry_policy_should_retry():
+    """Test to retry only transient errors while there are attempts."""
+    policy = RetryPolicy(attempts=3)
+
+    assert policy.should_retry(1)
+    assert policy.should_retry(2, 503)
+    assert not policy.should_retry(3, 503)
+    assert not policy.should_retry(1, 404)
+    assert not policy.should_retry(1, 429, retry_after="120")
+    assert policy.should_retry(1, 429, retry_after="1")
+
+
+def test_retry_policy_delay_with_jitter():
+    """Test the delay is a random wait up to the exponential backoff."""
+    policy = RetryPolicy(backoff=0.1, max_backoff=0.3)
+
+    assert all(0 <= policy.delay(1) <= 0.1 for _ in range(50))
+    assert all(0 <= policy.delay(2) <= 0.2 for _ in range(50))
+    assert all(0 <= policy.delay(5) <= 0.3 for _ in range(50))
+    assert policy.delay(1, retry_after="2") == 2
+
+
+def test_hedge_policy_threshold():
+    """Test the threshold is the percentile of the recent latencies."""
+    policy = HedgePolicy(percentile=90, min_samples=10, min_delay=0.01)
+
+    for number in range(1, 10):
+        policy.record(number / 100)
+    assert policy.threshold() is None
+
+    policy.record(0.10)
+    assert policy.threshold() == 0.09
+
+
+def test_hedge_policy_min_delay():
+    """Test the threshold is never lower than the min delay."""
+    policy = HedgePolicy(min_samples=1, min_delay=0.5)
+    policy.record(0.01)
+
+    assert policy.threshold() == 0.5
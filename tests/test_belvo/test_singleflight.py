@@ -0,0 +1,102 @@
+"""Tests for the `singleflight` Module."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+import pytest
+from src.belvo.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight_share_concurrent_calls():
+    """Test concurrent calls with the same key make only one call."""
+    flights = SingleFlight()
+    started = Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return {"id": "1"}
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        leader = pool.submit(flights.do, "key", fn)
+        started.wait()
+        waiters = [pool.submit(flights.do, "key", fn) for _ in range(4)]
+        results = [leader.result()] + [w.result() for w in waiters]
+
+    assert len(calls) == 1
+    assert flights.shared == 4
+    assert all(result is results[0] for result in results)
+
+
+def test_single_flight_share_exceptions():
+    """Test the waiters receive the exception of the call."""
+    flights = SingleFlight()
+    started = Event()
+
+    def fn():
+        started.set()
+        time.sleep(0.2)
+        raise ValueError("Request failed")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flights.do, "key", fn)
+        started.wait()
+        waiter = pool.submit(flights.do, "key", fn)
+
+        with pytest.raises(ValueError):
+            leader.result()
+        with pytest.raises(ValueError):
+            waiter.result()
+
+
+def test_single_flight_calls_again_after_finish():
+    """Test the calls are only shared while they are in flight."""
+    flights = SingleFlight()
+    calls = []
+
+    assert flights.do("key", lambda: calls.append(1)) is None
+    assert flights.do("key", lambda: calls.append(1)) is None
+    assert len(calls) == 2
+
+
+def test_async_single_flight_share_concurrent_calls():
+    """Test concurrent tasks with the same key make only one call."""
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"id": "1"}
+
+    async def run():
+        same = [flights.do("key", fn) for _ in range(5)]
+        return await asyncio.gather(*same, flights.do("other", fn))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 2
+    assert flights.shared == 4
+    assert all(result == {"id": "1"} for result in results)
+
+
+def test_async_single_flight_survive_cancelled_caller():
+    """Test a cancelled caller doesn't cancel the shared call."""
+    flights = AsyncSingleFlight()
+
+    async def fn():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run():
+        first = asyncio.ensure_future(flights.do("key", fn))
+        second = asyncio.ensure_future(flights.do("key", fn))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "result"
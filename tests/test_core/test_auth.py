@@ -1,8 +1,11 @@
 """Tests for Class Auth Core in Module."""
 
+import time
 from datetime import datetime, timedelta
+from unittest.mock import patch
 
-from src.core.auth import AuthHandler
+from src.core.auth import AuthHandler, token_digest
+from src.core.cache import TTLCache
 
 
 def test_password_hashing():
@@ -36,3 +39,38 @@ def test_jwt_token_raise_jwt_error():
     decoded_data = auth.decode_access_token(token + "invalid")
 
     assert decoded_data is None
+
+
+def test_jwt_token_decoded_from_cache():
+    """Test to decode a verified token again without verifying it."""
+    auth = AuthHandler()
+    token = auth.create_access_token({"sub": "user"})
+
+    first = auth.decode_access_token(token)
+    with patch("src.core.auth.jwt.decode") as decode:
+        second = auth.decode_access_token(token)
+
+    decode.assert_not_called()
+    assert first == second
+    assert auth.token_cache.stats()["hits"] == 1
+
+
+def test_jwt_token_cached_until_it_expires():
+    """Test to evict a verified token from the cache when it expires."""
+    auth = AuthHandler()
+    token = auth.create_access_token({"sub": "user"})
+    exp = auth.decode_access_token(token)["exp"]
+
+    with patch("src.core.cache.time.monotonic",
+               return_value=time.monotonic() + exp - time.time() + 1):
+        assert auth.token_cache.get(token_digest(token)) is None
+
+
+def test_jwt_token_invalid_not_cached():
+    """Test to never cache a token that fails the verification."""
+    auth = AuthHandler(token_cache=TTLCache(maxsize=4))
+    token = auth.create_access_token({"sub": "user"}) + "invalid"
+
+    assert auth.decode_access_token(token) is None
+    assert auth.decode_access_token(token) is None
+    assert len(auth.token_cache) == 0
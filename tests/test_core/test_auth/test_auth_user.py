@@ -1,11 +1,12 @@
 """Test cases for the Functions: Auth User in the Auth Core Module."""
 
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 from fastapi import HTTPException
 from src.models.user import User
-from src.core.auth import AuthHandler, authenticate_user
+from src.core.auth import AuthHandler, auth, authenticate_user
+from src.core.hashing import password_context
 
 
 @pytest.fixture
@@ -47,3 +48,36 @@ def test_authenticate_user_failure(mock_db_session):
 
     assert exc.value.status_code == 401
     assert str(exc.value.detail) == "Incorrect username or password"
+
+
+def test_authenticate_user_rehash_outdated(mock_db_session):
+    """Test to hash again a password whose hash has less rounds."""
+    user = User(id=1, username="existing_user",
+                hashed_password=password_context(4).hash("password"))
+    mock_db_session.query.return_value.\
+        filter.return_value.first.return_value = user
+
+    with patch.object(auth, "pwd_context", password_context(5)):
+        authenticate_user("existing_user", "password", mock_db_session)
+
+    update = mock_db_session.query.return_value.filter.return_value.update
+    new_hash = update.call_args.args[0][User.hashed_password]
+    assert new_hash.startswith("$2b$05$")
+    mock_db_session.commit.assert_called_once()
+
+
+def test_authenticate_user_rehash_failure(mock_db_session):
+    """Test to login with the old hash if the new one can't be saved."""
+    user = User(id=1, username="existing_user",
+                hashed_password=password_context(4).hash("password"))
+    mock_db_session.query.return_value.\
+        filter.return_value.first.return_value = user
+    mock_db_session.commit.side_effect = Exception("DB Error")
+
+    with patch.object(auth, "pwd_context", password_context(5)):
+        authenticated_user = authenticate_user(
+            "existing_user", "password", mock_db_session
+        )
+
+    assert authenticated_user is user
+    mock_db_session.rollback.assert_called_once()
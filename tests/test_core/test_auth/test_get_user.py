@@ -1,12 +1,17 @@
 """Test cases for the Functions: Get User in the Auth Core Module."""
 
+import time
 from unittest.mock import MagicMock
 
 import pytest
 from jose import jwt
 from fastapi import HTTPException
 from src.models.user import User
-from src.core.auth import SECRET_KEY, ALGORITHM, get_current_user
+from src.core import auth
+from src.core.auth import (
+    SECRET_KEY, ALGORITHM, get_current_user, invalidate_user,
+    principal_cache, token_claims, token_versions
+)
 
 
 @pytest.fixture
@@ -72,3 +77,92 @@ def test_get_current_user_user_not_found(mock_db_session, mock_token):
 
     assert exc.value.status_code == 404
     assert str(exc.value.detail) == "User not found"
+
+
+def test_get_current_user_cached(mock_db_session, mock_token, mock_user):
+    """Test to get current user from the cache with the same token."""
+    mock_db_session.query.return_value.\
+        filter.return_value.first.return_value = mock_user
+    hits = principal_cache.hits
+
+    first = get_current_user(mock_token, mock_db_session)
+    second = get_current_user(mock_token, mock_db_session)
+
+    assert first.username == second.username == "existing_user"
+    assert mock_db_session.query.call_count == 1
+    assert principal_cache.stats()["hits"] == hits + 1
+
+
+def test_get_current_user_cached_until_token_expires(mock_db_session,
+                                                     mock_user):
+    """Test to keep the cached user no longer than the token."""
+    mock_db_session.query.return_value.\
+        filter.return_value.first.return_value = mock_user
+    payload = {"sub": "existing_user", "exp": int(time.time()) + 60}
+    token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+    get_current_user(token, mock_db_session)
+
+    expires = next(iter(principal_cache._data.values()))[0]
+    assert expires <= time.monotonic() + 60
+
+
+def test_get_current_user_invalidated(mock_db_session, mock_token,
+                                      mock_user):
+    """Test to query again the user after its principals are invalidated."""
+    mock_db_session.query.return_value.\
+        filter.return_value.first.return_value = mock_user
+
+    get_current_user(mock_token, mock_db_session)
+    assert invalidate_user("existing_user") == 1
+    get_current_user(mock_token, mock_db_session)
+
+    assert mock_db_session.query.call_count == 2
+
+
+@pytest.fixture
+def claims_token():
+    """Mock Valid Self-Contained Token, of the version 2."""
+    payload = {
+        "sub": "existing_user", "uid": 7, "email": "user@example.com",
+        "ver": 2,
+    }
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def test_token_claims(monkeypatch):
+    """Test to add the id, email and version to the claims if enabled."""
+    user = User(id=7, username="user", email="user@example.com",
+                token_version=2)
+
+    assert token_claims(user) == {"sub": "user"}
+    monkeypatch.setattr(auth, "SELF_CONTAINED_TOKENS", True)
+    assert token_claims(user) == {
+        "sub": "user", "uid": 7, "email": "user@example.com", "ver": 2
+    }
+
+
+def test_get_current_user_from_claims(mock_db_session, claims_token):
+    """Test to get current user from the claims when its version is known."""
+    mock_db_session.query.return_value.filter.return_value.first.\
+        return_value = User(username="existing_user", token_version=2)
+
+    first = get_current_user(claims_token, mock_db_session)
+    second = get_current_user(claims_token, mock_db_session)
+
+    assert mock_db_session.query.call_count == 1
+    assert first.username == "existing_user"
+    assert (second.id, second.email) == (7, "user@example.com")
+
+
+def test_get_current_user_claims_revoked(mock_db_session, claims_token):
+    """Test to reject a self-contained token with an old version."""
+    mock_db_session.query.return_value.filter.return_value.first.\
+        return_value = User(username="existing_user", token_version=3)
+
+    with pytest.raises(HTTPException) as exc:
+        get_current_user(claims_token, mock_db_session)
+
+    assert exc.value.status_code == 401
+    assert str(exc.value.detail) == "Token revoked"
+    assert token_versions.get("existing_user") == 3
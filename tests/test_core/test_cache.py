@@ -0,0 +1,99 @@
+"""Tests for the TTLCache Class in the Cache Core Module."""
+
+from unittest.mock import patch
+
+from src.core.cache import TTLCache
+
+
+def test_cache_get_and_set():
+    """Test to save and get a value, counting hits and misses."""
+    cache = TTLCache()
+
+    assert cache.get("key") is None
+    cache.set("key", {"id": "1"})
+
+    assert cache.get("key") == {"id": "1"}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_ratio"] == 0.5
+
+
+def test_cache_value_expires_after_ttl():
+    """Test to expire a value after its time to live."""
+    cache = TTLCache(ttl=10)
+
+    with patch("src.core.cache.time.monotonic", return_value=100):
+        cache.set("key", "value")
+        cache.set("other", "value", ttl=30)
+    with patch("src.core.cache.time.monotonic", return_value=111):
+        assert cache.get("key") is None
+        assert cache.get("other") == "value"
+
+    assert len(cache) == 1
+
+
+def test_cache_evict_least_recently_used():
+    """Test to evict the least recently used value when it's full."""
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_ignore_none_values_and_zero_ttl():
+    """Test to not save None values or values without time to live."""
+    cache = TTLCache()
+    cache.set("none", None)
+    cache.set("zero", "value", ttl=0)
+
+    assert len(cache) == 0
+
+
+def test_cache_invalidate():
+    """Test to remove values by key, by predicate, or all of them."""
+    cache = TTLCache()
+    for key in [("a", 1), ("a", 2), ("b", 1)]:
+        cache.set(key, "value")
+
+    assert cache.invalidate(key=("a", 1)) == 1
+    assert cache.invalidate(key=("a", 1)) == 0
+    assert cache.invalidate(where=lambda key: key[0] == "b") == 1
+    assert cache.invalidate() == 1
+    assert len(cache) == 0
+
+
+def test_cache_stats_without_lookups():
+    """Test the hit ratio without any lookup."""
+    assert TTLCache(maxsize=5).stats() == {
+        "hits": 0, "misses": 0, "evictions": 0,
+        "size": 0, "maxsize": 5, "weight": 0, "maxweight": None,
+        "hit_ratio": 0.0,
+    }
+
+
+def test_cache_evict_by_total_weight():
+    """Test to evict the least recently used values over the max weight."""
+    cache = TTLCache(maxweight=10)
+    cache.set("a", [1] * 4, weight=4)
+    cache.set("b", [2] * 4, weight=4)
+    cache.set("a", [1] * 3, weight=3)
+    cache.set("c", [3] * 5, weight=5)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1] * 3
+    assert cache.stats()["weight"] == 8
+    assert cache.stats()["evictions"] == 1
+
+    # Too heavy to be cached at all
+    cache.set("d", [4] * 11, weight=11)
+    assert cache.get("d") is None
+    assert cache.invalidate("c") == 1
+    assert cache.stats()["weight"] == 3
+    cache.invalidate()
+    assert cache.stats()["weight"] == 0
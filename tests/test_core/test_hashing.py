@@ -0,0 +1,246 @@
+"""Tests for the HashingPool Class in the Hashing Core Module."""
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+from passlib.context import CryptContext
+from src.core import hashing
+from src.core.hashing import (
+    HashingPool, QueueFullError, calibrate_rounds, configured_rounds,
+    password_context
+)
+
+
+# The minimum cost of bcrypt, to keep the tests fast
+CONTEXT = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4)
+
+
+def test_pool_hash_and_verify():
+    """Test to hash a password and verify it in the pool."""
+    pool = HashingPool(max_workers=2)
+
+    async def run():
+        hashed = await pool.hash(CONTEXT, "password")
+        return (
+            hashed,
+            await pool.verify(CONTEXT, "password", hashed),
+            await pool.verify(CONTEXT, "wrong", hashed),
+        )
+
+    hashed, valid, invalid = asyncio.run(run())
+    pool.shutdown()
+
+    assert hashed.startswith("$2b$04$")
+    assert valid is True
+    assert invalid is False
+    assert pool.stats()["completed"] == 3
+    assert pool.stats()["queued"] == 0
+    assert pool.stats()["running"] == 0
+
+
+def test_pool_doesnt_block_the_event_loop():
+    """Test to keep the event loop running while a password is hashed."""
+    pool = HashingPool(max_workers=1)
+    release = threading.Event()
+    ticks = []
+
+    def slow_hash(settings, password):
+        release.wait(5)
+        return "hashed"
+
+    async def tick():
+        for _ in range(3):
+            ticks.append(True)
+            await asyncio.sleep(0)
+        release.set()
+
+    async def run():
+        return await asyncio.gather(
+            pool._run(slow_hash, "settings", "password"), tick()
+        )
+
+    hashed, _ = asyncio.run(run())
+    pool.shutdown()
+
+    assert hashed == "hashed"
+    assert len(ticks) == 3
+
+
+def test_pool_counts_and_bounds_the_queue():
+    """Test to count the calls waiting for a worker and reject the extra."""
+    pool = HashingPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    def slow_hash(settings, password):
+        release.wait(5)
+        return password
+
+    async def run():
+        first = asyncio.ensure_future(pool._run(slow_hash, "", "first"))
+        second = asyncio.ensure_future(pool._run(slow_hash, "", "second"))
+        await asyncio.sleep(0.05)
+        depth = pool.stats()
+        with pytest.raises(QueueFullError):
+            await pool._run(slow_hash, "", "third")
+        release.set()
+        return depth, await asyncio.gather(first, second)
+
+    depth, results = asyncio.run(run())
+    pool.shutdown()
+
+    assert depth["running"] == 1
+    assert depth["queued"] == 1
+    assert results == ["first", "second"]
+    assert pool.stats()["max_queued"] == 1
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["completed"] == 2
+
+
+def test_pool_counts_a_call_cancelled_before_it_starts():
+    """Test a call cancelled in the queue leaves it, the count never < 0."""
+    pool = HashingPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    def slow_hash(settings, password):
+        release.wait(5)
+        return password
+
+    async def run():
+        first = asyncio.ensure_future(pool._run(slow_hash, "", "first"))
+        second = asyncio.ensure_future(pool._run(slow_hash, "", "second"))
+        await asyncio.sleep(0.05)
+        second.cancel()
+        await asyncio.gather(second, return_exceptions=True)
+        depth = pool.stats()
+        # The queue has room again
+        third = asyncio.ensure_future(pool._run(slow_hash, "", "third"))
+        await asyncio.sleep(0.05)
+        release.set()
+        return depth, await asyncio.gather(first, third)
+
+    depth, results = asyncio.run(run())
+    pool.shutdown()
+
+    assert (depth["queued"], depth["running"]) == (0, 1)
+    assert results == ["first", "third"]
+    assert (pool.stats()["queued"], pool.stats()["running"]) == (0, 0)
+    assert pool.pending == 0
+    assert pool.stats()["completed"] == 3
+
+
+def test_pool_with_processes():
+    """Test to hash a password in a pool of processes."""
+    pool = HashingPool(max_workers=1, executor="process")
+
+    async def run():
+        hashed = await pool.hash(CONTEXT, "password")
+        return await pool.verify(CONTEXT, "password", hashed)
+
+    assert asyncio.run(run()) is True
+    pool.shutdown()
+    assert pool.stats()["completed"] == 2
+
+
+def test_pool_unknown_executor():
+    """Test to reject an unknown executor."""
+    with pytest.raises(ValueError, match="Unknown executor: fiber"):
+        HashingPool(executor="fiber")
+
+
+def test_pool_from_env(monkeypatch):
+    """Test to configure the pool with the environment variables."""
+    monkeypatch.setenv("HASHING_WORKERS", "4")
+    monkeypatch.setenv("HASHING_MAX_QUEUE", "0")
+
+    pool = HashingPool.from_env()
+
+    assert pool.max_workers == 4
+    assert pool.max_queue == 0
+    assert pool.executor == "thread"
+
+
+def test_pool_verify_and_update():
+    """Test to verify a password and hash it again if it's outdated."""
+    pool = HashingPool(max_workers=1)
+    hashed = CONTEXT.hash("password")
+    stronger = password_context(5)
+
+    async def run():
+        return (
+            await pool.verify_and_update(CONTEXT, "password", hashed),
+            await pool.verify_and_update(stronger, "password", hashed),
+            await pool.verify_and_update(stronger, "wrong", hashed),
+        )
+
+    current, outdated, invalid = asyncio.run(run())
+    pool.shutdown()
+
+    assert current == (True, None)
+    assert outdated[0] is True
+    assert outdated[1].startswith("$2b$05$")
+    assert invalid == (False, None)
+
+
+def fake_hash_seconds(rounds, samples=3):
+    """Fake time of a hash: 1 ms at 4 rounds, doubled by each round."""
+    return 0.001 * 2 ** (rounds - 4)
+
+
+def test_hash_seconds():
+    """Test to measure the time of a hash with the rounds."""
+    assert 0 < hashing.hash_seconds(4, samples=2) < 1
+
+
+@pytest.mark.parametrize("target_ms, expected", [
+    (250, 11), (256, 12), (300, 12), (5000, 16), (1, 10),
+])
+def test_calibrate_rounds(target_ms, expected):
+    """Test to choose the highest rounds that hash within the target."""
+    with patch.object(hashing, "hash_seconds", fake_hash_seconds):
+        assert calibrate_rounds(target_ms) == expected
+
+
+def test_calibrate_rounds_invalid_range():
+    """Test to reject rounds out of the range of bcrypt."""
+    with pytest.raises(ValueError, match="Invalid rounds: 3..16"):
+        calibrate_rounds(min_rounds=3)
+
+
+def test_configured_rounds(monkeypatch):
+    """Test to read the rounds of the environment, calibrating `auto`."""
+    configured_rounds.cache_clear()
+    assert configured_rounds() is None
+
+    configured_rounds.cache_clear()
+    monkeypatch.setenv("BCRYPT_ROUNDS", "11")
+    assert configured_rounds() == 11
+
+    configured_rounds.cache_clear()
+    monkeypatch.setenv("BCRYPT_ROUNDS", "auto")
+    monkeypatch.setenv("BCRYPT_TARGET_MS", "70")
+    with patch.object(hashing, "hash_seconds", fake_hash_seconds):
+        assert configured_rounds() == 10
+    configured_rounds.cache_clear()
+
+
+def test_password_context_outdated_hashes():
+    """Test to mark as outdated the hashes with less rounds."""
+    context = password_context(5)
+
+    assert context.needs_update(CONTEXT.hash("password"))
+    assert not context.needs_update(context.hash("password"))
+    assert password_context().to_string() == CryptContext(
+        schemes=["bcrypt"], deprecated="auto"
+    ).to_string()
+
+
+def test_main_prints_the_rounds(capsys):
+    """Test to print the calibrated rounds from the command line."""
+    with patch.object(hashing, "hash_seconds", fake_hash_seconds):
+        hashing.main(["--target-ms", "70"])
+
+    output = capsys.readouterr().out
+    assert "bcrypt rounds: 10 (64 ms)" in output
+    assert "BCRYPT_ROUNDS=10" in output
@@ -5,7 +5,10 @@ import uuid
 import pytest
 from fastapi.testclient import TestClient
 from src.main import app
-from src.core.database import Base, engine
+from src.core import auth
+from src.core.database import Base, default_session, engine
+from src.core.hashing import password_context
+from src.models.user import User
 
 
 client = TestClient(app)
@@ -71,6 +74,43 @@ def test_token_user(setup_and_teardown_db):
     assert "access_token" in response.json()
 
 
+def test_login_user_with_hashing_pool_full(setup_and_teardown_db,
+                                           monkeypatch):
+    """Test to EndPoint `login` when too many passwords are being hashed."""
+    create_test_user()
+    monkeypatch.setattr(auth.hashing_pool, "max_queue", 1)
+    monkeypatch.setattr(auth.hashing_pool, "pending", 1)
+    response = client.post(
+        "/v1/auth/login",
+        json={
+            "username": "testuser", "password": "password",
+            "email": "testuser@example.com"
+        }
+    )
+    assert response.status_code == 503
+    assert response.json()["message"] == "Too many requests, try again later"
+
+
+def test_login_user_rehash_outdated(setup_and_teardown_db, monkeypatch):
+    """Test to EndPoint `login` hashing again an outdated password hash."""
+    create_test_user()
+    monkeypatch.setattr(auth.auth, "pwd_context", password_context(13))
+    response = client.post(
+        "/v1/auth/login",
+        json={
+            "username": "testuser", "password": "password",
+            "email": "testuser@example.com"
+        }
+    )
+    assert response.status_code == 200
+
+    db = default_session()
+    user = db.query(User).filter(User.username == "testuser").first()
+    assert user.hashed_password.startswith("$2b$13$")
+    assert user.token_version == 0
+    db.close()
+
+
 def test_login_and_read_current_user(setup_and_teardown_db):
     """Test to EndPoint `users/me` for read current user."""
     create_test_user()
@@ -92,6 +132,56 @@ def test_login_and_read_current_user(setup_and_teardown_db):
     assert "username" in response.json()
 
 
+def test_read_current_user_cached_and_invalidated(setup_and_teardown_db):
+    """Test to EndPoint `users/me` with a cached user, until it changes."""
+    create_test_user()
+    token = client.post(
+        "/v1/auth/token",
+        data={"username": "testuser", "password": "password"}
+    ).json().get("access_token")
+    headers = {"Authorization": f"Bearer {token}"}
+    hits = auth.principal_cache.hits
+
+    client.get("/v1/auth/users/me", headers=headers)
+    client.get("/v1/auth/users/me", headers=headers)
+    assert auth.principal_cache.stats()["hits"] == hits + 1
+
+    db = default_session()
+    user = db.query(User).filter(User.username == "testuser").first()
+    user.email = "changed@example.com"
+    db.commit()
+    db.close()
+
+    response = client.get("/v1/auth/users/me", headers=headers)
+    assert response.json()["email"] == "changed@example.com"
+
+
+def test_read_current_user_from_claims(setup_and_teardown_db, monkeypatch):
+    """Test to EndPoint `users/me` with the claims, until the user changes."""
+    monkeypatch.setattr(auth, "SELF_CONTAINED_TOKENS", True)
+    create_test_user()
+    token = client.post(
+        "/v1/auth/token",
+        data={"username": "testuser", "password": "password"}
+    ).json().get("access_token")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/v1/auth/users/me", headers=headers)
+    assert response.json()["email"] == "testuser@example.com"
+    assert auth.token_versions.get("testuser") == 0
+
+    db = default_session()
+    user = db.query(User).filter(User.username == "testuser").first()
+    user.email = "changed@example.com"
+    db.commit()
+    assert user.token_version == 1
+    db.close()
+
+    response = client.get("/v1/auth/users/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["message"] == "Token revoked"
+
+
 def test_need_auth_with_login(setup_and_teardown_db):
     """Test to EndPoint `need-auth` Auth for access to need auth."""
     create_test_user()
@@ -1,13 +1,13 @@
 """Tests for Belvo Accounts EndPoints for the FastAPI-Financial application."""
 
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 
 import pytest
-from requests import HTTPError
 from fastapi.testclient import TestClient
 from src.main import app
-from src.belvo.client import Client
-from src.belvo.http import APISession
+from src.belvo.client import AsyncClient
+from src.belvo.exceptions import RequestError
+from src.belvo.http import AsyncAPISession
 from src.core.database import Base, engine
 
 client = TestClient(app)
@@ -18,15 +18,15 @@ def mock_belvo_client():
     """Mock for Belvo Client in Tests.
 
     This mock is used to avoid making requests to the Belvo API.
-    Need assign values for the APISession.login and APISession.get methods.
+    Need assign values for the AsyncAPISession login and get methods.
     And also simulate the Client instance, used for inject in EndPoints.
     """
-    with patch.object(APISession, 'login', return_value=True), \
-         patch.object(APISession, '_get') as mock_get, \
-         patch.object(APISession, 'get') as mock_get_detail, \
-         patch('src.belvo.instance.get_belvo_client') as mock_client:
+    with patch.object(AsyncAPISession, 'login', return_value=True), \
+         patch.object(AsyncAPISession, '_get') as mock_get, \
+         patch.object(AsyncAPISession, 'get') as mock_get_detail, \
+         patch('src.belvo.instance.get_async_belvo_client') as mock_client:
 
-        # Config mocks for APISession GET methods
+        # Config mocks for AsyncAPISession GET methods
         mock_get.return_value = {
             "results": [{"id": "123", "name": "Test Account"}], "next": None
         }
@@ -35,7 +35,9 @@ def mock_belvo_client():
         }
 
         # Instance fake Client
-        mock_client_instance = Client("fake_id", "fake_password", "fake_url")
+        mock_client_instance = AsyncClient(
+            "fake_id", "fake_password", "fake_url"
+        )
         mock_client.return_value = mock_client_instance
 
         yield mock_client_instance
@@ -43,15 +45,16 @@ def mock_belvo_client():
 
 @pytest.fixture
 def mock_belvo_client_with_error():
-    """Mock for Belvo Client in Tests, raise HTTPError."""
-    with patch.object(APISession, 'login', return_value=True), \
-            patch.object(APISession, '_get', side_effect=HTTPError(
-                response=Mock(status_code=404,
-                              json=lambda: {"error": "Not found"})
+    """Mock for Belvo Client in Tests, raise RequestError."""
+    with patch.object(AsyncAPISession, 'login', return_value=True), \
+            patch.object(AsyncAPISession, '_get', side_effect=RequestError(
+                404, {"error": "Not found"}
             )), \
-         patch('src.belvo.instance.get_belvo_client') as mock_client:
+         patch('src.belvo.instance.get_async_belvo_client') as mock_client:
 
-        mock_client_instance = Client("fake_id", "fake_password", "fake_url")
+        mock_client_instance = AsyncClient(
+            "fake_id", "fake_password", "fake_url"
+        )
         mock_client.return_value = mock_client_instance
 
         yield mock_client_instance
@@ -109,6 +112,18 @@ def test_endpoint_account_get_list(setup_and_teardown_db, mock_belvo_client):
     assert response.json()["data"]["accounts"][0]["name"] == "Test Account"
 
 
+def test_endpoint_account_get_list_stream(
+        setup_and_teardown_db, mock_belvo_client):
+    """Test for streaming a list of Belvo Accounts."""
+    response = client.get(
+        "/v1/belvo/accounts", params={"stream": "json"},
+        headers={"Authorization": f"Bearer {_obtain_token_from_login()}"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["accounts"][0]["id"] == "123"
+
+
 def test_endpoint_account_get_specific(
         setup_and_teardown_db, mock_belvo_client):
     """Test for getting a specific Belvo Account by ID."""
@@ -124,6 +139,19 @@ def test_endpoint_account_get_specific(
     assert response.json()["data"]["name"] == "Test Account"
 
 
+def test_endpoint_account_get_many(setup_and_teardown_db, mock_belvo_client):
+    """Test for getting several Belvo Accounts by ID."""
+    response = client.get(
+        "/v1/belvo/accounts", params={"ids": ["1", "2"]},
+        headers={"Authorization": f"Bearer {_obtain_token_from_login()}"}
+    )
+
+    assert response.status_code == 200
+    accounts = response.json()["data"]["accounts"]
+    assert [account["id"] for account in accounts] == ["1", "2"]
+    assert all(account["success"] for account in accounts)
+
+
 def test_endpoint_account_get_http_error(
         setup_and_teardown_db, mock_belvo_client_with_error):
     """Test for handling HTTPError when getting Belvo Account by ID."""
@@ -1,13 +1,13 @@
 """Tests for Belvo Owners EndPoints for the FastAPI-Financial application."""
 
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 
 import pytest
-from requests import HTTPError
 from fastapi.testclient import TestClient
 from src.main import app
-from src.belvo.client import Client
-from src.belvo.http import APISession
+from src.belvo.client import AsyncClient
+from src.belvo.exceptions import RequestError
+from src.belvo.http import AsyncAPISession
 
 client = TestClient(app)
 
@@ -17,15 +17,15 @@ def mock_belvo_client():
     """Mock for Belvo Client in Tests.
 
     This mock is used to avoid making requests to the Belvo API.
-    Need assign values for the APISession.login and APISession.get methods.
+    Need assign values for the AsyncAPISession login and get methods.
     And also simulate the Client instance, used for inject in EndPoints.
     """
-    with patch.object(APISession, 'login', return_value=True), \
-         patch.object(APISession, '_get') as mock_get, \
-         patch.object(APISession, 'get') as mock_get_detail, \
-         patch('src.belvo.instance.get_belvo_client') as mock_client:
+    with patch.object(AsyncAPISession, 'login', return_value=True), \
+         patch.object(AsyncAPISession, '_get') as mock_get, \
+         patch.object(AsyncAPISession, 'get') as mock_get_detail, \
+         patch('src.belvo.instance.get_async_belvo_client') as mock_client:
 
-        # Config mocks for APISession GET methods
+        # Config mocks for AsyncAPISession GET methods
         mock_get.return_value = {
             "results": [{"id": "123", "name": "Test Owner"}], "next": None
         }
@@ -34,7 +34,9 @@ def mock_belvo_client():
         }
 
         # Instance fake Client
-        mock_client_instance = Client("fake_id", "fake_password", "fake_url")
+        mock_client_instance = AsyncClient(
+            "fake_id", "fake_password", "fake_url"
+        )
         mock_client.return_value = mock_client_instance
 
         yield mock_client_instance
@@ -42,15 +44,16 @@ def mock_belvo_client():
 
 @pytest.fixture
 def mock_belvo_client_with_error():
-    """Mock for Belvo Client in Tests, raise HTTPError."""
-    with patch.object(APISession, 'login', return_value=True), \
-            patch.object(APISession, '_get', side_effect=HTTPError(
-                response=Mock(status_code=404,
-                              json=lambda: {"error": "Not found"})
+    """Mock for Belvo Client in Tests, raise RequestError."""
+    with patch.object(AsyncAPISession, 'login', return_value=True), \
+            patch.object(AsyncAPISession, '_get', side_effect=RequestError(
+                404, {"error": "Not found"}
             )), \
-         patch('src.belvo.instance.get_belvo_client') as mock_client:
+         patch('src.belvo.instance.get_async_belvo_client') as mock_client:
 
-        mock_client_instance = Client("fake_id", "fake_password", "fake_url")
+        mock_client_instance = AsyncClient(
+            "fake_id", "fake_password", "fake_url"
+        )
         mock_client.return_value = mock_client_instance
 
         yield mock_client_instance
@@ -66,6 +69,14 @@ def test_endpoint_owner_get_list(mock_belvo_client):
     assert response.json()["data"]["owners"][0]["name"] == "Test Owner"
 
 
+def test_endpoint_owner_get_list_stream(mock_belvo_client):
+    """Test for streaming a list of Belvo Owners."""
+    response = client.get("/v1/belvo/owners", params={"stream": "json"})
+
+    assert response.status_code == 200
+    assert response.json()["data"]["owners"][0]["id"] == "123"
+
+
 def test_endpoint_owner_get_specific(mock_belvo_client):
     """Test for getting a specific Belvo Owner by ID."""
     response = client.get("/v1/belvo/owners", params={"id": "123"})
@@ -77,6 +88,15 @@ def test_endpoint_owner_get_specific(mock_belvo_client):
     assert response.json()["data"]["name"] == "Test Owner"
 
 
+def test_endpoint_owner_get_many(mock_belvo_client):
+    """Test for getting several Belvo Owners by ID."""
+    response = client.get("/v1/belvo/owners", params={"ids": ["1", "2"]})
+
+    assert response.status_code == 200
+    assert [owner["id"] for owner in response.json()["data"]["owners"]] == \
+        ["1", "2"]
+
+
 def test_endpoint_owner_get_http_error(mock_belvo_client_with_error):
     """Test for handling HTTPError when getting Belvo Owner by ID."""
     response = client.get("/v1/belvo/owners", params={"id": "nonexistent_id"})
@@ -1,15 +1,14 @@
 """Tests for Belvo Transactions EndPoints for the FastAPI-Financial app."""
 
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 
 import pytest
-from requests import HTTPError
 from fastapi.testclient import TestClient
 from src.main import app
-from src.belvo.client import Client
-from src.belvo.http import APISession
+from src.belvo.client import AsyncClient
+from src.belvo.exceptions import RequestError
+from src.belvo.http import AsyncAPISession
 from src.core.database import Base, engine
-from src.api.v1.endpoints.belvo_transactions import group_mount_transactions
 
 client = TestClient(app)
 
@@ -19,15 +18,15 @@ def mock_belvo_client():
     """Mock for Belvo Client in Tests.
 
     This mock is used to avoid making requests to the Belvo API.
-    Need assign values for the APISession.login and APISession.get methods.
+    Need assign values for the AsyncAPISession login and get methods.
     And also simulate the Client instance, used for inject in EndPoints.
     """
-    with patch.object(APISession, 'login', return_value=True), \
-         patch.object(APISession, '_get') as mock_get, \
-         patch.object(APISession, 'get') as mock_get_detail, \
-         patch('src.belvo.instance.get_belvo_client') as mock_client:
+    with patch.object(AsyncAPISession, 'login', return_value=True), \
+         patch.object(AsyncAPISession, '_get') as mock_get, \
+         patch.object(AsyncAPISession, 'get') as mock_get_detail, \
+         patch('src.belvo.instance.get_async_belvo_client') as mock_client:
 
-        # Config mocks for APISession GET methods
+        # Config mocks for AsyncAPISession GET methods
         mock_get.return_value = {
             "results": [{"id": "123", "name": "Test Transaction"}],
             "next": None
@@ -37,7 +36,9 @@ def mock_belvo_client():
         }
 
         # Instance fake Client
-        mock_client_instance = Client("fake_id", "fake_password", "fake_url")
+        mock_client_instance = AsyncClient(
+            "fake_id", "fake_password", "fake_url"
+        )
         mock_client.return_value = mock_client_instance
 
         yield mock_client_instance
@@ -45,15 +46,16 @@ def mock_belvo_client():
 
 @pytest.fixture
 def mock_belvo_client_with_error():
-    """Mock for Belvo Client in Tests, raise HTTPError."""
-    with patch.object(APISession, 'login', return_value=True), \
-            patch.object(APISession, '_get', side_effect=HTTPError(
-                response=Mock(status_code=404,
-                              json=lambda: {"error": "Not found"})
+    """Mock for Belvo Client in Tests, raise RequestError."""
+    with patch.object(AsyncAPISession, 'login', return_value=True), \
+            patch.object(AsyncAPISession, '_get', side_effect=RequestError(
+                404, {"error": "Not found"}
             )), \
-         patch('src.belvo.instance.get_belvo_client') as mock_client:
+         patch('src.belvo.instance.get_async_belvo_client') as mock_client:
 
-        mock_client_instance = Client("fake_id", "fake_password", "fake_url")
+        mock_client_instance = AsyncClient(
+            "fake_id", "fake_password", "fake_url"
+        )
         mock_client.return_value = mock_client_instance
 
         yield mock_client_instance
@@ -73,24 +75,62 @@ def test_endpoint_transaction_get_list(mock_belvo_client):
         "Test Transaction"
 
 
+def test_endpoint_transaction_get_page_with_cursor(mock_belvo_client):
+    """Test for getting only one page of Transactions and the next cursor."""
+    with patch.object(AsyncAPISession, '_get', return_value={
+        "count": 2, "results": [{"id": "1"}],
+        "next": "http://fake.url/api/transactions/?link=123&page=2",
+    }) as mock_get:
+        response = client.get(
+            "/v1/belvo/transactions",
+            params={"link": "123", "page_size": 1}
+        )
+        cursor = response.json()["data"]["next"]
+        client.get("/v1/belvo/transactions", params={"cursor": cursor})
+
+    assert response.status_code == 200
+    assert response.json()["data"]["count"] == 2
+    assert mock_get.call_count == 2
+    assert mock_get.call_args.kwargs["params"] == {"link": "123", "page": "2"}
+
+
+def test_endpoint_transaction_get_page_size_too_big(mock_belvo_client):
+    """Test for rejecting a page size bigger than the Belvo max."""
+    response = client.get(
+        "/v1/belvo/transactions", params={"link": "123", "page_size": 5000}
+    )
+
+    assert response.status_code == 422
+
+
+def test_endpoint_transaction_get_invalid_cursor(mock_belvo_client):
+    """Test for rejecting an invalid cursor."""
+    response = client.get(
+        "/v1/belvo/transactions", params={"cursor": "%%%"}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["message"] == "Invalid cursor."
+
+
 def test_endpoint_transaction_get_http_error(mock_belvo_client_with_error):
     """Test for handling HTTPError when getting Belvo Transaction by ID."""
     response = client.get(
         "/v1/belvo/transactions", params={"id": "nonexistent_id"}
     )
 
-    assert response.status_code == 500
+    assert response.status_code == 404
     assert "success" in response.json()
     assert not response.json()["success"]
     assert "message" in response.json()
-    assert response.json()["message"] == "404: {'error': 'Not found'}"
+    assert response.json()["message"] == "{'error': 'Not found'}"
 
 
 def test_endpoint_transaction_get_error(mock_belvo_client_with_error):
     """Test for getting Belvo Transaction by ID with error."""
     response = client.get("/v1/belvo/transactions", params={"id": "999"})
 
-    assert response.status_code == 500
+    assert response.status_code == 404
     assert "success" in response.json()
     assert not response.json()["success"]
     assert "message" in response.json()
@@ -145,10 +185,32 @@ def test_endpoint_transactions_outcomes(setup_and_teardown_db, mock_belvo_client
     )
 
     assert response.status_code == 200
-    assert "transactions_by_category" in response.json()["data"]
+    assert "transactions_by_currency" in response.json()["data"]
     # TODO: Add more asserts!!!
 
 
+def test_endpoint_outcomes_checks_the_pushed_type(setup_and_teardown_db, mock_belvo_client):  # noqa: E501
+    """Test the type sent to Belvo is checked again in the totals."""
+    with patch.object(AsyncAPISession, '_get', return_value={
+        "results": [
+            {"type": "OUTFLOW", "category": "Food", "amount": 40,
+             "currency": "MXN", "account": {"id": "123"}},
+            {"type": "INFLOW", "category": "Food", "amount": 5,
+             "currency": "MXN", "account": {"id": "123"}},
+        ],
+        "next": None
+    }):
+        response = client.get(
+            "/v1/belvo/transactions-outcomes/",
+            params={"account": "123", "link": "123"},
+            headers={"Authorization": f"Bearer {_obtain_token_from_login()}"}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["transactions_by_currency"] == \
+        {"MXN": {"Food": 40}}
+
+
 def test_endpoint_incomes_get_http_error(
         setup_and_teardown_db, mock_belvo_client_with_error):
     """Test for handling HTTPError getting grouped outcomes by Category."""
@@ -158,11 +220,11 @@ def test_endpoint_incomes_get_http_error(
         headers={"Authorization": f"Bearer {_obtain_token_from_login()}"}
     )
 
-    assert response.status_code == 500
+    assert response.status_code == 404
     assert "success" in response.json()
     assert not response.json()["success"]
     assert "message" in response.json()
-    assert response.json()["message"] == "404: {'error': 'Not found'}"
+    assert response.json()["message"] == "{'error': 'Not found'}"
 
 
 # TESTS FOR INCOMES ENDPOINT:
@@ -175,7 +237,7 @@ def test_endpoint_transactions_incomes(setup_and_teardown_db, mock_belvo_client)
     )
 
     assert response.status_code == 200
-    assert "transactions_by_category" in response.json()["data"]
+    assert "transactions_by_currency" in response.json()["data"]
     # TODO: Add more asserts!!!
 
 
@@ -188,36 +250,383 @@ def test_endpoint_outcomes_get_http_error(
         headers={"Authorization": f"Bearer {_obtain_token_from_login()}"}
     )
 
-    assert response.status_code == 500
+    assert response.status_code == 404
     assert "success" in response.json()
     assert not response.json()["success"]
     assert "message" in response.json()
-    assert response.json()["message"] == "404: {'error': 'Not found'}"
-
-
-# Test for aux function!
-def test_group_mount_transactions():
-    """Test for grouping transactions by category."""
-    test_transactions = [
-        {"type": "OUTFLOW", "category": "Groceries", "amount": 50},
-        {"type": "OUTFLOW", "category": "Groceries", "amount": 100},
-        {"type": "OUTFLOW", "category": "Utilities", "amount": 75},
-        {"type": "INFLOW", "category": "Salary", "amount": 1000},
-        {"type": "OUTFLOW", "category": "Entertainment", "amount": 50},
-        {"type": "INFLOW", "category": "Investments", "amount": 200},
-    ]
+    assert response.json()["message"] == "{'error': 'Not found'}"
+
+
+# TESTS FOR SUMMARY ENDPOINT:
+def test_endpoint_transactions_summary(setup_and_teardown_db, mock_belvo_client):  # noqa: E501
+    """Test for getting incomes, outcomes and net by category at once."""
+    with patch.object(AsyncAPISession, '_get', return_value={
+        "results": [
+            {"type": "OUTFLOW", "category": "Food", "amount": 40,
+             "currency": "MXN", "account": {"id": "123"}},
+            {"type": "INFLOW", "category": "Food", "amount": 10,
+             "currency": "MXN", "account": {"id": "123"}},
+            {"type": "INFLOW", "category": "Salary", "amount": 100,
+             "currency": "MXN", "account": {"id": "123"}},
+            {"type": "OUTFLOW", "category": "Fun", "amount": 0.1,
+             "currency": "USD", "account": {"id": "123"}},
+            {"type": "OUTFLOW", "category": "Fun", "amount": 0.2,
+             "currency": "USD", "account": {"id": "123"}},
+        ],
+        "next": None
+    }) as mock_get:
+        response = client.get(
+            "/v1/belvo/transactions-summary/",
+            params={"page": 1, "account": "123", "link": "123"},
+            headers={"Authorization": f"Bearer {_obtain_token_from_login()}"}
+        )
+
+    assert response.status_code == 200
+    assert mock_get.call_count == 1
+    summary = response.json()["data"]["transactions_summary"]
+    assert summary["MXN"]["by_category"]["Food"] == \
+        {"INFLOW": 10, "OUTFLOW": 40, "net": -30}
+    assert summary["MXN"]["totals"] == \
+        {"INFLOW": 110, "OUTFLOW": 40, "net": 70}
+    # Exact, and never added to the other currencies
+    assert summary["USD"]["totals"] == \
+        {"INFLOW": 0, "OUTFLOW": 0.3, "net": -0.3}
+
+
+def test_endpoint_summary_get_http_error(
+        setup_and_teardown_db, mock_belvo_client_with_error):
+    """Test for handling HTTPError when getting the summary."""
+    response = client.get(
+        "/v1/belvo/transactions-summary/",
+        params={"page": 1, "account": "123", "link": "123"},
+        headers={"Authorization": f"Bearer {_obtain_token_from_login()}"}
+    )
 
-    result = group_mount_transactions(test_transactions, "OUTFLOW")
+    assert response.status_code == 404
+    assert not response.json()["success"]
+    assert response.json()["message"] == "{'error': 'Not found'}"
+
+
+# TESTS FOR SYNC AND LOCAL SOURCE:
+def _sync_transactions(token):
+    """Sync two transactions of the link 123 to the database."""
+    with patch.object(AsyncAPISession, '_get', return_value={
+        "results": [
+            {"id": "t1", "type": "OUTFLOW", "category": "Food",
+             "amount": 40, "currency": "MXN", "account": {"id": "123"},
+             "value_date": "2024-01-02",
+             "created_at": "2024-01-02T10:00:00Z"},
+            {"id": "t2", "type": "INFLOW", "category": "Salary",
+             "amount": 100, "currency": "MXN", "account": {"id": "123"},
+             "value_date": "2024-01-01",
+             "created_at": "2024-01-01T10:00:00Z"},
+        ],
+        "next": None
+    }):
+        return client.post(
+            "/v1/belvo/transactions/sync/", params={"link": "123"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+
+def test_endpoint_transactions_sync(setup_and_teardown_db, mock_belvo_client):  # noqa: E501
+    """Test for syncing the transactions of a link to the database."""
+    response = _sync_transactions(_obtain_token_from_login())
 
-    assert result == {
-        "Groceries": 150,
-        "Utilities": 75,
-        "Entertainment": 50
+    assert response.status_code == 200
+    assert response.json()["data"]["sync"] == {
+        "link": "123", "account": None, "synced": 2,
+        "watermark": "2024-01-02T10:00:00",
     }
 
-    result = group_mount_transactions(test_transactions, "INFLOW")
 
-    assert result == {
-        "Salary": 1000,
-        "Investments": 200
-    }
+def test_endpoint_transactions_sync_http_error(
+        setup_and_teardown_db, mock_belvo_client_with_error):
+    """Test for handling HTTPError when syncing the transactions."""
+    response = client.post(
+        "/v1/belvo/transactions/sync/", params={"link": "123"},
+        headers={"Authorization": f"Bearer {_obtain_token_from_login()}"}
+    )
+
+    assert response.status_code == 404
+    assert response.json()["message"] == "{'error': 'Not found'}"
+
+
+def test_endpoint_transactions_from_local(setup_and_teardown_db, mock_belvo_client):  # noqa: E501
+    """Test for listing and aggregating the synced transactions."""
+    token = _obtain_token_from_login()
+    _sync_transactions(token)
+
+    with patch.object(AsyncAPISession, '_get') as mock_get:
+        page = client.get(
+            "/v1/belvo/transactions",
+            params={"link": "123", "source": "local", "page_size": 1}
+        )
+        summary = client.get(
+            "/v1/belvo/transactions-summary/",
+            params={"link": "123", "source": "local"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+    assert mock_get.call_count == 0
+    assert page.json()["data"]["count"] == 2
+    assert page.json()["data"]["transactions"][0]["id"] == "t1"
+    assert page.json()["data"]["next"] is not None
+    totals = summary.json()["data"]["transactions_summary"]["MXN"]["totals"]
+    assert totals == {"INFLOW": 100, "OUTFLOW": 40, "net": 60}
+
+
+def test_endpoint_incomes_and_outcomes_from_local_rollups(
+        setup_and_teardown_db, mock_belvo_client):
+    """Test for the totals of a date range, read from the rollups."""
+    token = _obtain_token_from_login()
+    _sync_transactions(token)
+
+    with patch.object(AsyncAPISession, '_get') as mock_get:
+        outcomes = client.get(
+            "/v1/belvo/transactions-outcomes/",
+            params={"link": "123", "source": "local"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        incomes = client.get(
+            "/v1/belvo/transactions-incomes/",
+            params={"link": "123", "source": "local",
+                    "date_from": "2024-01-02", "date_to": "2024-01-31"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+    assert mock_get.call_count == 0
+    assert outcomes.json()["data"]["transactions_by_currency"] == \
+        {"MXN": {"Food": 40}}
+    assert incomes.json()["data"]["transactions_by_currency"] == {}
+
+
+def test_endpoint_summary_sends_the_date_range_to_belvo(
+        setup_and_teardown_db, mock_belvo_client):
+    """Test the date range is filtered by Belvo, not after the request."""
+    response = client.get(
+        "/v1/belvo/transactions-summary/",
+        params={"link": "123", "date_from": "2024-01-01",
+                "date_to": "2024-01-31"},
+        headers={"Authorization": f"Bearer {_obtain_token_from_login()}"}
+    )
+
+    assert response.status_code == 200
+    params = AsyncAPISession._get.call_args.kwargs["params"]
+    assert params["value_date__gte"] == "2024-01-01"
+    assert params["value_date__lte"] == "2024-01-31"
+
+
+# TESTS FOR SUMMARY OF SEVERAL LINKS ENDPOINT:
+def test_endpoint_transactions_summary_links(setup_and_teardown_db, mock_belvo_client):  # noqa: E501
+    """Test for merging the summary of several links, listed at once."""
+    def pages(url, params=None, **policies):
+        return {
+            "results": [
+                {"type": "OUTFLOW", "category": "Food", "amount": 10,
+                 "currency": "MXN"},
+                {"type": "INFLOW", "category": params["link"], "amount": 1,
+                 "currency": "MXN"},
+            ],
+            "next": None
+        }
+
+    with patch.object(AsyncAPISession, '_get', side_effect=pages):
+        response = client.get(
+            "/v1/belvo/transactions-summary/links/",
+            params={"links": ["l1", "l2"], "max_concurrency": 2},
+            headers={"Authorization": f"Bearer {_obtain_token_from_login()}"}
+        )
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["transactions_summary"]["MXN"]["by_category"]["Food"] == \
+        {"INFLOW": 0, "OUTFLOW": 20, "net": -20}
+    assert data["transactions_summary"]["MXN"]["totals"] == \
+        {"INFLOW": 2, "OUTFLOW": 20, "net": -18}
+    assert [link["link"] for link in data["links"]] == ["l1", "l2"]
+    assert all(link["count"] == 2 for link in data["links"])
+    assert all("seconds" in link for link in data["links"])
+
+
+def test_endpoint_transactions_summary_links_errors(
+        setup_and_teardown_db, mock_belvo_client_with_error):
+    """Test for the links that fail, and for a request without links."""
+    token = _obtain_token_from_login()
+    response = client.get(
+        "/v1/belvo/transactions-summary/links/",
+        params={"links": ["l1"]},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["data"]["links"][0]["success"] is False
+    assert response.json()["data"]["links"][0]["status_code"] == 404
+
+    response = client.get(
+        "/v1/belvo/transactions-summary/links/",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 400
+    assert response.json()["message"] == \
+        "At least one link or account is required."
+
+
+# TESTS FOR ANALYTICS ENDPOINT:
+def test_endpoint_transactions_analytics(setup_and_teardown_db, mock_belvo_client):  # noqa: E501
+    """Test for any aggregation, with the filters pushed down to Belvo."""
+    with patch.object(AsyncAPISession, '_get', return_value={
+        "results": [
+            {"type": "OUTFLOW", "category": "Food", "amount": 40,
+             "merchant": {"name": "Oxxo"}, "value_date": "2024-01-02"},
+            {"type": "OUTFLOW", "category": "Food", "amount": 10,
+             "merchant": {"name": "Walmart"}, "value_date": "2024-02-02"},
+            {"type": "OUTFLOW", "category": "Fun", "amount": 5,
+             "merchant": {"name": "Oxxo"}, "value_date": "2024-02-03"},
+        ],
+        "next": None
+    }) as mock_get:
+        response = client.get(
+            "/v1/belvo/transactions/analytics/",
+            params={
+                "link": "123", "group_by": ["month", "category"],
+                "metrics": ["sum", "count"],
+                "filters": ["type:OUTFLOW", "merchant:Oxxo"],
+                "date_range": "2024-01-01..2024-03-31",
+            },
+            headers={"Authorization": f"Bearer {_obtain_token_from_login()}"}
+        )
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["rows"] == [
+        {"month": "2024-01", "category": "Food", "sum": 40.0, "count": 1},
+        {"month": "2024-02", "category": "Fun", "sum": 5.0, "count": 1},
+    ]
+    assert data["plan"]["local"] == {"merchant": ["Oxxo"]}
+    params = mock_get.call_args.kwargs["params"]
+    assert params["type"] == "OUTFLOW"
+    assert params["value_date__gte"] == "2024-01-01"
+    assert params["value_date__lte"] == "2024-03-31"
+
+
+def test_endpoint_transactions_analytics_top_from_local(setup_and_teardown_db, mock_belvo_client):  # noqa: E501
+    """Test for the first groups of an aggregation of the database."""
+    token = _obtain_token_from_login()
+    _sync_transactions(token)
+
+    response = client.get(
+        "/v1/belvo/transactions/analytics/",
+        params={"link": "123", "source": "local", "group_by": "type",
+                "limit": 1, "exact": True},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["rows"] == \
+        [{"type": "INFLOW", "currency": "MXN", "sum": 100.0}]
+
+
+def test_endpoint_transactions_analytics_invalid_query(setup_and_teardown_db, mock_belvo_client):  # noqa: E501
+    """Test for the errors of an invalid query."""
+    token = _obtain_token_from_login()
+    for params, message in (
+        ({"group_by": "amount"}, "Unknown key: amount"),
+        ({"metrics": "median"}, "Unknown metric: median"),
+        ({"filters": "type"}, "Invalid filter: type"),
+        ({"date_range": "2024-01-01"}, "Invalid date range: 2024-01-01"),
+    ):
+        response = client.get(
+            "/v1/belvo/transactions/analytics/", params=params,
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 400
+        assert response.json()["message"].startswith(message)
+
+
+def test_endpoint_transactions_analytics_http_error(
+        setup_and_teardown_db, mock_belvo_client_with_error):
+    """Test for handling HTTPError when getting an aggregation."""
+    response = client.get(
+        "/v1/belvo/transactions/analytics/", params={"link": "123"},
+        headers={"Authorization": f"Bearer {_obtain_token_from_login()}"}
+    )
+
+    assert response.status_code == 404
+    assert response.json()["message"] == "{'error': 'Not found'}"
+
+
+# TESTS FOR TOP ENDPOINT:
+def test_endpoint_transactions_top_merchants(setup_and_teardown_db, mock_belvo_client):  # noqa: E501
+    """Test for getting only the merchants with the greatest outcomes."""
+    transactions = [
+        {"type": "OUTFLOW", "merchant": {"name": f"Shop {number}"},
+         "amount": number, "currency": "MXN", "account": {"id": "acc_1"}}
+        for number in range(1, 50)
+    ] + [{"type": "INFLOW", "merchant": {"name": "Boss"}, "amount": 999,
+          "account": {"id": "acc_1"}}]
+
+    def filtered(url, params=None, **policies):
+        return {
+            "results": [
+                transaction for transaction in transactions
+                if transaction["type"] == params["type"]
+            ],
+            "next": None
+        }
+
+    with patch.object(AsyncAPISession, '_get', side_effect=filtered):
+        response = client.get(
+            "/v1/belvo/transactions-top/",
+            params={"link": "123", "account": "acc_1", "by": "merchant",
+                    "limit": 2},
+            headers={"Authorization": f"Bearer {_obtain_token_from_login()}"}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["top_transactions"] == [
+        {"merchant": "Shop 49", "currency": "MXN", "sum": 49.0, "count": 1},
+        {"merchant": "Shop 48", "currency": "MXN", "sum": 48.0, "count": 1},
+    ]
+
+
+def test_endpoint_transactions_top_from_local(setup_and_teardown_db, mock_belvo_client):  # noqa: E501
+    """Test for getting the top categories and merchants of the database."""
+    token = _obtain_token_from_login()
+    _sync_transactions(token)
+
+    responses = [
+        client.get(
+            "/v1/belvo/transactions-top/",
+            params={"link": "123", "source": "local", "by": by,
+                    "type": "INFLOW", "order": "asc"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        for by in ("category", "merchant")
+    ]
+
+    assert responses[0].json()["data"]["top_transactions"] == \
+        [{"category": "Salary", "currency": "MXN", "sum": 100.0, "count": 1}]
+    assert responses[1].json()["data"]["top_transactions"] == \
+        [{"merchant": "Unknown", "currency": "MXN", "sum": 100.0, "count": 1}]
+
+
+def test_endpoint_transactions_top_invalid_params(mock_belvo_client):
+    """Test for validating the limit and the order of the top."""
+    for params in ({"limit": 0}, {"order": "up"}, {"by": "account"}):
+        response = client.get(
+            "/v1/belvo/transactions-top/", params=params,
+            headers={"Authorization": "Bearer token"}
+        )
+        assert response.status_code == 422
+
+
+def test_endpoint_transactions_top_http_error(
+        setup_and_teardown_db, mock_belvo_client_with_error):
+    """Test for handling HTTPError when getting the top."""
+    response = client.get(
+        "/v1/belvo/transactions-top/", params={"link": "123"},
+        headers={"Authorization": f"Bearer {_obtain_token_from_login()}"}
+    )
+
+    assert response.status_code == 404
+    assert response.json()["message"] == "{'error': 'Not found'}"
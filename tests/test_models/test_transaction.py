@@ -0,0 +1,54 @@
+"""Test for Models of the Transactions in the DataBase."""
+
+from src.models.transaction import (
+    DailyRollup, MonthlyRollup, Transaction, TransactionSync
+)
+
+
+def test_transaction_model_attributes():
+    """Test the attributes of the Transaction model."""
+    transaction_attrs = Transaction.__table__.columns.keys()
+    for attr in ['id', 'link', 'account', 'category', 'merchant', 'type',
+                 'amount', 'currency', 'value_date', 'created_at', 'data']:
+        assert attr in transaction_attrs
+
+
+def test_transaction_model_id_is_the_belvo_id():
+    """Test if 'id' is the primary key, without autoincrement."""
+    id_column = Transaction.__table__.columns['id']
+    assert id_column.primary_key
+    assert str(id_column.type) == 'VARCHAR(64)'
+
+
+def test_transaction_model_indexes():
+    """Test the filters of the transactions are indexed."""
+    indexes = {
+        tuple(column.name for column in index.columns)
+        for index in Transaction.__table__.indexes
+    }
+    assert ('link', 'value_date') in indexes
+    assert ('account', 'value_date') in indexes
+    assert ('type',) in indexes
+
+
+def test_transaction_sync_model_unique_link_and_account():
+    """Test there is a single watermark for each link and account."""
+    constraints = [
+        tuple(column.name for column in constraint.columns)
+        for constraint in TransactionSync.__table__.constraints
+        if constraint.__class__.__name__ == 'UniqueConstraint'
+    ]
+    assert ('link', 'account') in constraints
+
+
+def test_rollup_models_unique_bucket():
+    """Test there is a single rollup for each group and day/month."""
+    for model, period in ((DailyRollup, 'day'), (MonthlyRollup, 'month')):
+        constraints = [
+            tuple(column.name for column in constraint.columns)
+            for constraint in model.__table__.constraints
+            if constraint.__class__.__name__ == 'UniqueConstraint'
+        ]
+        assert ('link', 'account', 'category', 'type', 'currency',
+                period) in constraints
+        assert {'total', 'count'} <= set(model.__table__.columns.keys())
@@ -42,3 +42,10 @@ def test_user_model_email_unique():
     """Test if 'email' is set as unique."""
     email_column = User.__table__.columns['email']
     assert email_column.unique
+
+
+def test_user_model_token_version_default():
+    """Test if 'token_version' starts at zero."""
+    token_version_column = User.__table__.columns['token_version']
+    assert not token_version_column.nullable
+    assert token_version_column.default.arg == 0
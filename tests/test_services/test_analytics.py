@@ -0,0 +1,416 @@
+"""Tests for the `analytics` Service Module."""
+
+import asyncio
+import tracemalloc
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.analytics import Aggregator
+from src.belvo.client import AsyncClient
+from src.belvo.exceptions import RequestError
+from src.belvo.http import DEFAULT_PAGE_SIZE, AsyncAPISession
+from src.belvo.resources import AsyncTransactions
+from src.core.database import Base
+from src.services.analytics import (
+    QueryPlan, aggregate_links, columnar_cache, parse_date_range,
+    parse_filters, run_query, stream_transactions
+)
+from src.services.transactions import upsert_transactions
+
+
+TRANSACTIONS = {
+    "link_1": [
+        {"category": "Food", "type": "OUTFLOW", "amount": 10,
+         "account": {"id": "acc_1"}},
+        {"category": "Salary", "type": "INFLOW", "amount": 100,
+         "account": {"id": "acc_2"}},
+    ],
+    "link_2": [
+        {"category": "Food", "type": "OUTFLOW", "amount": 5,
+         "account": {"id": "acc_3"}},
+    ],
+}
+
+
+class FakeTransactions:
+    """Fake Transactions resource, list the transactions of each link."""
+
+    def __init__(self, delay=0.01):
+        """Initialize without calls."""
+        self.delay = delay
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+
+    async def list(self, link=None, account=None, **params):
+        """Yield the transactions of the link, slowly."""
+        self.calls.append({"link": link, "account": account, **params})
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if link == "missing":
+                raise RequestError(404, {"error": "Not found"})
+            if link == "broken":
+                raise RuntimeError("Connection reset")
+            for transaction in TRANSACTIONS.get(link, []):
+                if account is None or transaction["account"]["id"] == account:
+                    yield transaction
+        finally:
+            self.running -= 1
+
+
+class FakeAccounts:
+    """Fake Accounts resource, with the link of each account."""
+
+    links = {"acc_1": "link_1", "acc_3": {"id": "link_2"}}
+
+    async def get_many(self, ids, max_concurrency=10):
+        """Get the accounts, the unknown ones fail."""
+        return [
+            {"id": id, "success": True,
+             "data": {"id": id, "link": self.links[id]}}
+            if id in self.links else
+            {"id": id, "success": False, "status_code": 404,
+             "detail": {"error": "Not found"}}
+            for id in ids
+        ]
+
+
+class FakeClient:
+    """Fake Belvo client with a Transactions resource."""
+
+    def __init__(self):
+        """Initialize the resources."""
+        self.Accounts = FakeAccounts()
+        self.Transactions = FakeTransactions()
+
+
+def test_stream_transactions_sends_the_date_range():
+    """Test the date range is sent to Belvo as value date filters."""
+    client = FakeClient()
+
+    async def consume():
+        return [
+            transaction async for transaction in stream_transactions(
+                client, link="link_1", date_from=date(2024, 1, 1),
+                date_to=date(2024, 1, 31)
+            )
+        ]
+
+    assert len(asyncio.run(consume())) == 2
+    assert client.Transactions.calls == [{
+        "link": "link_1", "account": None, "page": 1,
+        "value_date__gte": "2024-01-01", "value_date__lte": "2024-01-31",
+    }]
+
+
+def _belvo_page(number):
+    """Create a page of Belvo transactions, new objects for each call."""
+    return [
+        {"id": f"t{number}_{index}", "category": f"Category {index % 7}",
+         "type": "INFLOW" if index % 3 else "OUTFLOW", "amount": index + 0.5,
+         "description": "x" * 50, "value_date": "2024-01-05"}
+        for index in range(DEFAULT_PAGE_SIZE)
+    ]
+
+
+def _fold_belvo_pages(pages):
+    """Fold the pages of a fake Belvo through the real client, with peak.
+
+    The HTTP requests are the only fake, so the pages are buffered by the
+    prefetch of the `AsyncTransactions` resource like in production.
+    """
+    url = "http://fake.url/api/transactions/"
+
+    async def get(self, endpoint, params=None, **policies):
+        number = int(endpoint.rsplit("=", 1)[1]) if "=" in endpoint else 1
+        await asyncio.sleep(0)
+        return {
+            "results": _belvo_page(number),
+            "next": f"{url}?page={number + 1}" if number < pages else None,
+        }
+
+    async def fold():
+        aggregator = Aggregator(["category", "type"], ["count"])
+        await aggregator.aupdate_stream(
+            stream_transactions(client, link="link_1"),
+            chunk_size=DEFAULT_PAGE_SIZE
+        )
+        return aggregator
+
+    client = AsyncClient("secret_id", "secret_password", "http://fake.url")
+    with patch.object(AsyncAPISession, "_get", get):
+        tracemalloc.start()
+        try:
+            aggregator = asyncio.run(fold())
+            return aggregator, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def test_stream_transactions_memory_is_bounded_by_the_prefetch():
+    """Test the peak memory of the real stream doesn't grow with its pages.
+
+    The page being folded and the `prefetch` pages fetched ahead are in
+    memory at once, so the bound is `prefetch + 1` pages.
+    """
+    tracemalloc.start()
+    _belvo_page(0)
+    page = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    aggregator, short_peak = _fold_belvo_pages(20)
+    assert sum(row["count"] for row in aggregator.rows()) == \
+        20 * DEFAULT_PAGE_SIZE
+    aggregator, long_peak = _fold_belvo_pages(200)
+    assert sum(row["count"] for row in aggregator.rows()) == \
+        200 * DEFAULT_PAGE_SIZE
+
+    # The bound, plus a page for the event loop and the columns
+    assert long_peak < (AsyncTransactions.prefetch + 2) * page
+    assert long_peak < short_peak + page
+
+
+def test_aggregate_links_merges_the_links():
+    """Test the totals of the links are merged, with a result for each."""
+    aggregator, results = asyncio.run(aggregate_links(
+        FakeClient(), ["link_1", "link_2", "link_1"]
+    ))
+
+    assert aggregator.rows() == [
+        {"category": "Food", "type": "OUTFLOW", "sum": 15.0},
+        {"category": "Salary", "type": "INFLOW", "sum": 100.0},
+    ]
+    assert [result["link"] for result in results] == ["link_1", "link_2"]
+    assert [result["count"] for result in results] == [2, 1]
+    assert all(result["success"] for result in results)
+    assert all(result["seconds"] > 0 for result in results)
+
+
+def test_aggregate_links_limits_the_concurrency():
+    """Test only `max_concurrency` links are listed at the same time."""
+    client = FakeClient()
+    links = [f"link_{number}" for number in range(10)]
+
+    asyncio.run(aggregate_links(client, links, max_concurrency=3))
+    assert len(client.Transactions.calls) == 10
+    assert client.Transactions.max_running == 3
+
+    client = FakeClient()
+    asyncio.run(aggregate_links(client, links, max_concurrency=20))
+    assert client.Transactions.max_running == 10
+
+
+def test_aggregate_links_filters_the_accounts():
+    """Test the accounts filter the transactions of the links."""
+    aggregator, _ = asyncio.run(aggregate_links(
+        FakeClient(), ["link_1", "link_2"], ["acc_1", "acc_3"]
+    ))
+    assert aggregator.rows() == \
+        [{"category": "Food", "type": "OUTFLOW", "sum": 15.0}]
+
+
+def test_aggregate_links_finds_the_link_of_the_accounts():
+    """Test the accounts without links are listed from their links."""
+    client = FakeClient()
+    aggregator, results = asyncio.run(aggregate_links(
+        client, accounts=["acc_1", "acc_3", "acc_9"]
+    ))
+
+    assert aggregator.rows() == [
+        {"category": "Food", "type": "OUTFLOW", "sum": 15.0},
+    ]
+    assert sorted(
+        (call["link"], call["account"]) for call in client.Transactions.calls
+    ) == [("link_1", "acc_1"), ("link_2", "acc_3")]
+    assert [result["link"] for result in results[:2]] == \
+        ["link_1", "link_2"]
+    assert results[2] == {
+        "account": "acc_9", "success": False, "status_code": 404,
+        "detail": {"error": "Not found"}, "count": 0, "seconds": 0.0,
+    }
+
+
+def test_aggregate_links_keeps_the_others_when_one_fails():
+    """Test a failed link is reported and excluded from the totals."""
+    aggregator, results = asyncio.run(aggregate_links(
+        FakeClient(), ["missing", "link_2", "broken"]
+    ))
+
+    assert aggregator.rows() == \
+        [{"category": "Food", "type": "OUTFLOW", "sum": 5.0}]
+    assert results[0]["success"] is False
+    assert results[0]["status_code"] == 404
+    assert results[0]["detail"] == {"error": "Not found"}
+    assert results[1]["success"] is True
+    assert results[2]["detail"] == "Connection reset"
+    assert results[2]["status_code"] is None
+
+
+def test_parse_filters():
+    """Test to parse the `key:value` filters, the keys can be repeated."""
+    assert parse_filters([]) == {}
+    assert parse_filters([
+        "type:OUTFLOW", "category:Food", "category:Fun", "category:Food",
+        "merchant:Shop: Centro",
+    ]) == {
+        "type": ["OUTFLOW"], "category": ["Food", "Fun"],
+        "merchant": ["Shop: Centro"],
+    }
+    with pytest.raises(ValueError, match="Invalid filter: type"):
+        parse_filters(["type"])
+    with pytest.raises(ValueError, match="Invalid filter: type:"):
+        parse_filters(["type:"])
+    with pytest.raises(ValueError, match="Unknown key: amount"):
+        parse_filters(["amount:10"])
+
+
+def test_parse_date_range():
+    """Test to parse the date ranges, with open ends."""
+    assert parse_date_range(None) == (None, None)
+    assert parse_date_range("2024-01-01..2024-01-31") == \
+        (date(2024, 1, 1), date(2024, 1, 31))
+    assert parse_date_range("2024-01-01..") == (date(2024, 1, 1), None)
+    assert parse_date_range("..2024-01-31") == (None, date(2024, 1, 31))
+    for value in ("2024-01-01", "2024-02-01..2024-01-01", "jan..feb"):
+        with pytest.raises(ValueError):
+            parse_date_range(value)
+
+
+def test_query_plan_pushes_down_the_supported_filters():
+    """Test only the single values that the source knows are pushed."""
+    filters = {
+        "type": ["OUTFLOW"], "category": ["Food", "Fun"],
+        "account": ["acc_1"], "currency": ["Unknown"],
+        "merchant": ["Oxxo"], "month": ["2024-01"],
+    }
+    plan = QueryPlan(filters, date(2024, 1, 1))
+    assert plan.pushed == {"type": "OUTFLOW", "account": "acc_1"}
+    assert plan.local == {
+        "category": ["Food", "Fun"], "currency": ["Unknown"],
+        "merchant": ["Oxxo"], "month": ["2024-01"],
+    }
+    assert plan.explain()["pushed_down"] == {
+        "type": "OUTFLOW", "account": "acc_1",
+        "date_from": "2024-01-01", "date_to": None,
+    }
+
+    plan = QueryPlan({"category": ["Food"], "type": ["INFLOW"]},
+                     source="local")
+    assert plan.pushed == {"type": "INFLOW"}
+    assert plan.local == {"category": ["Food"]}
+    assert plan.filters == {"type": ["INFLOW"], "category": ["Food"]}
+
+
+def test_run_query_in_belvo():
+    """Test the pushed filters are sent, the others applied locally."""
+    client = FakeClient()
+    plan = QueryPlan(
+        {"type": ["OUTFLOW"], "account": ["acc_1", "acc_3"]},
+        date_to=date(2024, 1, 31)
+    )
+
+    aggregator = asyncio.run(run_query(
+        client, None, plan, ["account"], ["sum", "count"], link="link_1"
+    ))
+
+    assert client.Transactions.calls == [{
+        "link": "link_1", "account": None, "page": 1, "type": "OUTFLOW",
+        "value_date__gte": None, "value_date__lte": "2024-01-31",
+    }]
+    assert aggregator.rows() == \
+        [{"account": "acc_1", "sum": 10.0, "count": 1}]
+
+
+def test_run_query_checks_the_pushed_filters():
+    """Test the pushed filters apply even if the source ignores them."""
+    plan = QueryPlan({"type": ["INFLOW"]})
+
+    aggregator = asyncio.run(run_query(
+        FakeClient(), None, plan, ["category"], link="link_1"
+    ))
+
+    assert aggregator.rows() == [{"category": "Salary", "sum": 100.0}]
+
+
+@pytest.fixture
+def db():
+    """Session of an in-memory database with all the tables."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_run_query_in_local(db):
+    """Test the query over the stored transactions, with exact sums."""
+    upsert_transactions(db, "link_1", [
+        {"id": "t1", "category": "Fees", "type": "OUTFLOW", "amount": 0.1,
+         "currency": "MXN", "value_date": "2024-01-05"},
+        {"id": "t2", "category": "Fees", "type": "OUTFLOW", "amount": 0.2,
+         "currency": "MXN", "value_date": "2024-02-05"},
+        {"id": "t3", "category": "Salary", "type": "INFLOW", "amount": 100,
+         "currency": "MXN", "value_date": "2024-01-01"},
+    ])
+    plan = QueryPlan({"type": ["OUTFLOW"]}, source="local")
+
+    aggregator = asyncio.run(run_query(
+        None, db, plan, ["category"], ["sum"], link="link_1", exact=True
+    ))
+
+    assert aggregator.rows() == \
+        [{"category": "Fees", "currency": "MXN", "sum": Decimal("0.30")}]
+    # The minor units were kept in the cached columns of the link
+    assert sorted(columnar_cache.get("link_1").units) == [10, 20, 10000]
+
+
+def test_run_query_in_local_caches_the_columns(db):
+    """Test the local queries of a link run over its cached columns."""
+    upsert_transactions(db, "link_1", [
+        {"id": "t1", "category": "Fees", "type": "OUTFLOW", "amount": 5,
+         "account": "acc_1", "value_date": "2024-01-05"},
+        {"id": "t2", "category": None, "type": "OUTFLOW", "amount": 7,
+         "account": "acc_1", "value_date": "2024-01-20"},
+        {"id": "t3", "category": "Fees", "type": "OUTFLOW", "amount": 9,
+         "account": "acc_2", "value_date": "2024-02-05"},
+        {"id": "t4", "category": "Salary", "type": "INFLOW", "amount": 100,
+         "account": "acc_1", "value_date": "2024-01-01"},
+    ])
+    plan = QueryPlan(
+        {"type": ["OUTFLOW"], "account": ["acc_1", "acc_2"]},
+        date_from=date(2024, 1, 2), source="local"
+    )
+
+    def query(link):
+        return asyncio.run(run_query(
+            None, db, plan, ["month", "category"], ["sum", "count"],
+            link=link
+        )).rows()
+
+    rows = query("link_1")
+    assert rows == [
+        {"month": "2024-02", "category": "Fees", "sum": 9.0, "count": 1},
+        {"month": "2024-01", "category": "Uncategorized", "sum": 7.0,
+         "count": 1},
+        {"month": "2024-01", "category": "Fees", "sum": 5.0, "count": 1},
+    ]
+    # The same rows as reading the database, without a link
+    assert query(None) == rows
+    assert len(columnar_cache.get("link_1")) == 4
+
+    # The new transactions are read after a sync drops the columns
+    upsert_transactions(db, "link_1", [
+        {"id": "t5", "category": "Fees", "type": "OUTFLOW", "amount": 1,
+         "account": "acc_1", "value_date": "2024-02-06"},
+    ])
+    assert query("link_1") == rows
+    columnar_cache.invalidate("link_1")
+    assert query("link_1")[0] == \
+        {"month": "2024-02", "category": "Fees", "sum": 10.0, "count": 2}
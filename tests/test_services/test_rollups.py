@@ -0,0 +1,171 @@
+"""Tests for the `rollups` Service Module."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.core.database import Base
+from src.models.transaction import DailyRollup, MonthlyRollup, Transaction
+from src.services.rollups import (
+    add_delta, apply_deltas, rebuild_rollups, rollup_rows, split_range
+)
+from src.services.transactions import upsert_transactions
+
+
+def _transaction(id, amount, value_date, category="Food", type="OUTFLOW",
+                 currency="MXN"):
+    """Create a Belvo transaction of the account acc_1."""
+    return {
+        "id": id, "amount": amount, "value_date": value_date,
+        "category": category, "type": type, "currency": currency,
+        "account": {"id": "acc_1"},
+    }
+
+
+@pytest.fixture
+def db():
+    """Session of an in-memory database with all the tables."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def _totals(rows):
+    """Map the (category, type) of the rows to their (sum, count)."""
+    return {
+        (row["category"], row["type"]): (row["sum"], row["count"])
+        for row in rows
+    }
+
+
+def test_split_range():
+    """Test the full months are monthly buckets and the edges daily."""
+    assert split_range() == [(MonthlyRollup, None, None)]
+    assert split_range(date(2024, 1, 5), date(2024, 1, 20)) == \
+        [(DailyRollup, date(2024, 1, 5), date(2024, 1, 20))]
+    assert split_range(date(2024, 1, 5), date(2024, 3, 10)) == [
+        (MonthlyRollup, date(2024, 2, 1), date(2024, 2, 29)),
+        (DailyRollup, date(2024, 1, 5), date(2024, 1, 31)),
+        (DailyRollup, date(2024, 3, 1), date(2024, 3, 10)),
+    ]
+    assert split_range(date(2024, 1, 1), date(2024, 2, 29)) == \
+        [(MonthlyRollup, date(2024, 1, 1), date(2024, 2, 29))]
+    assert split_range(date_to=date(2023, 12, 15)) == [
+        (MonthlyRollup, None, date(2023, 11, 30)),
+        (DailyRollup, date(2023, 12, 1), date(2023, 12, 15)),
+    ]
+    assert split_range(date_from=date(2023, 12, 31)) == [
+        (MonthlyRollup, date(2024, 1, 1), None),
+        (DailyRollup, date(2023, 12, 31), date(2023, 12, 31)),
+    ]
+
+
+def test_upsert_keeps_the_rollups(db):
+    """Test the rollups follow the inserted and updated transactions."""
+    upsert_transactions(db, "link_1", [
+        _transaction("t1", 10, "2024-01-09"),
+        _transaction("t2", 5, "2024-01-09"),
+        _transaction("t3", 100, "2024-02-01", "Salary", "INFLOW"),
+        _transaction("t4", 1, None),
+    ])
+    daily = db.query(DailyRollup).filter_by(day=date(2024, 1, 9)).one()
+    assert (daily.total, daily.count) == (15, 2)
+    assert db.query(MonthlyRollup).count() == 2
+
+    # t2 moves to another category, t3 to another month
+    upsert_transactions(db, "link_1", [
+        _transaction("t2", 7, "2024-01-09", "Fun"),
+        _transaction("t3", 90, "2024-03-01", "Salary", "INFLOW"),
+    ])
+    assert _totals(rollup_rows(db, link="link_1")) == {
+        ("Food", "OUTFLOW"): (10, 1),
+        ("Fun", "OUTFLOW"): (7, 1),
+        ("Salary", "INFLOW"): (90, 1),
+    }
+    months = {row.month for row in db.query(MonthlyRollup)}
+    assert months == {date(2024, 1, 1), date(2024, 3, 1)}
+
+
+def test_rollup_rows_are_exact_by_currency(db):
+    """Test the totals of each currency are apart and exact."""
+    upsert_transactions(db, "link_1", [
+        _transaction("t1", 0.1, "2024-01-09"),
+        _transaction("t2", 0.2, "2024-01-10"),
+        _transaction("t3", 500, "2024-01-10", currency="JPY"),
+    ])
+
+    rows = rollup_rows(db, link="link_1")
+
+    assert {row["currency"]: row["sum"] for row in rows} == \
+        {"MXN": Decimal("0.30"), "JPY": Decimal("500")}
+
+
+def test_apply_deltas_skips_unknown_removals(db):
+    """Test a removal without rollup (older data) doesn't go negative."""
+    deltas = {}
+    add_delta(deltas, {
+        "link": "link_1", "account": "acc_1", "category": "Food",
+        "type": "OUTFLOW", "amount": 10, "currency": "MXN",
+        "value_date": date(2024, 1, 9),
+    }, sign=-1)
+    apply_deltas(db, deltas)
+
+    assert db.query(DailyRollup).count() == 0
+    assert db.query(MonthlyRollup).count() == 0
+
+
+def test_rebuild_rollups(db):
+    """Test the rollups are computed again from the transactions."""
+    upsert_transactions(db, "link_1", [
+        _transaction("t1", 10, "2024-01-09"),
+        _transaction("t2", 5, "2024-01-31"),
+    ])
+    db.query(DailyRollup).delete()
+    db.query(MonthlyRollup).filter_by(link="link_1").update({"total": 0})
+    db.commit()
+
+    rebuild_rollups(db, "link_1")
+    db.commit()
+
+    assert _totals(rollup_rows(db, link="link_1")) == \
+        {("Food", "OUTFLOW"): (15, 2)}
+    assert db.query(DailyRollup).count() == 2
+
+
+def test_rollup_rows_match_the_transactions(db):
+    """Test the totals of any range are the sum of its transactions."""
+    days = [date(2024, month, day) for month in (1, 2, 3)
+            for day in (1, 10, 28)]
+    upsert_transactions(db, "link_1", [
+        _transaction(f"t{index}", index + 1, day.isoformat())
+        for index, day in enumerate(days)
+    ])
+    upsert_transactions(db, "link_2", [_transaction("other", 1000, None)])
+
+    for date_from, date_to in (
+        (None, None), (date(2024, 1, 5), date(2024, 3, 1)),
+        (date(2024, 2, 1), date(2024, 2, 29)), (None, date(2024, 2, 10)),
+        (date(2024, 3, 10), None), (date(2024, 4, 1), None),
+    ):
+        expected = [
+            transaction for transaction in db.query(Transaction).filter_by(
+                link="link_1"
+            )
+            if (date_from is None or transaction.value_date >= date_from)
+            and (date_to is None or transaction.value_date <= date_to)
+        ]
+        rows = rollup_rows(
+            db, link="link_1", account="acc_1", type="OUTFLOW",
+            date_from=date_from, date_to=date_to
+        )
+        assert _totals(rows) == ({
+            ("Food", "OUTFLOW"): (
+                sum(transaction.amount for transaction in expected),
+                len(expected)
+            )
+        } if expected else {})
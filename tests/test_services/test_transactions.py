@@ -0,0 +1,260 @@
+"""Tests for the `transactions` Service Module."""
+
+import asyncio
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.belvo.exceptions import RequestError
+from src.core.database import Base
+from src.models.transaction import (
+    MonthlyRollup, Transaction, TransactionSync
+)
+from src.services.transactions import (
+    iter_local_transactions, local_columns, local_page, parse_date,
+    parse_datetime, sync_transactions, transaction_values
+)
+
+
+def _transaction(id, amount=10, created_at="2024-01-10T10:00:00Z",
+                 **fields):
+    """Create a Belvo transaction."""
+    return {
+        "id": id, "amount": amount, "created_at": created_at,
+        "account": {"id": "acc_1"}, "merchant": {"name": "Oxxo"},
+        "category": "Food", "type": "OUTFLOW", "currency": "MXN",
+        "value_date": "2024-01-09", **fields,
+    }
+
+
+class FakeTransactions:
+    """Fake Transactions resource, yield the given pages of results."""
+
+    def __init__(self, results, error=None):
+        """Initialize with the results and the error raised at the end."""
+        self.results = results
+        self.error = error
+        self.calls = []
+
+    async def list(self, link, **params):
+        """Yield the results, record the params of the call."""
+        self.calls.append({"link": link, **params})
+        for result in self.results:
+            yield result
+        if self.error is not None:
+            raise self.error
+
+
+class FakeClient:
+    """Fake Belvo client with a Transactions resource."""
+
+    def __init__(self, results, error=None):
+        """Initialize with the results of the transactions."""
+        self.Transactions = FakeTransactions(results, error)
+
+
+@pytest.fixture
+def db():
+    """Session of an in-memory database with all the tables."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_parse_datetime_and_date():
+    """Test to parse the dates of Belvo, or None if they are invalid."""
+    assert parse_datetime("2024-01-10T11:45:24.001Z") == \
+        datetime(2024, 1, 10, 11, 45, 24, 1000)
+    assert parse_datetime("2024-01-10T05:00:00-06:00") == \
+        datetime(2024, 1, 10, 11, 0)
+    assert parse_datetime("2024-01-10T11:45:24") == \
+        datetime(2024, 1, 10, 11, 45, 24)
+    assert parse_datetime("yesterday") is None
+    assert parse_datetime(None) is None
+    assert parse_date("2024-01-09T00:00:00") == date(2024, 1, 9)
+    assert parse_date("09/01/2024") is None
+    assert parse_date(None) is None
+
+
+def test_transaction_values():
+    """Test the columns extracted from a Belvo transaction."""
+    transaction = _transaction("t1", merchant=None, account="acc_2")
+    del transaction["value_date"]
+    transaction["accounting_date"] = "2024-01-08T00:00:00"
+
+    values = transaction_values(transaction, "link_1")
+
+    assert values["link"] == "link_1"
+    assert values["account"] == "acc_2"
+    assert values["merchant"] is None
+    assert values["value_date"] == date(2024, 1, 8)
+    assert values["data"] is transaction
+
+
+def test_sync_transactions_incrementally(db):
+    """Test the sync stores the transactions and only asks for new ones."""
+    client = FakeClient([
+        _transaction("t1", created_at="2024-01-10T10:00:00Z"),
+        _transaction("t2", created_at="2024-01-11T10:00:00Z"),
+    ])
+    result = asyncio.run(sync_transactions(client, db, "link_1"))
+
+    assert result == {
+        "link": "link_1", "account": None, "synced": 2,
+        "watermark": "2024-01-11T10:00:00",
+    }
+    assert "created_at__gte" not in client.Transactions.calls[0]
+
+    # The second sync updates t2 and inserts t3
+    client = FakeClient([
+        _transaction("t2", amount=20, created_at="2024-01-11T10:00:00Z"),
+        _transaction("t3", created_at="2024-01-12T10:00:00Z"),
+    ])
+    result = asyncio.run(sync_transactions(client, db, "link_1"))
+
+    # The week before the watermark is requested again
+    assert client.Transactions.calls[0]["created_at__gte"] == \
+        "2024-01-04T10:00:00"
+    assert result["synced"] == 2
+    assert db.query(Transaction).count() == 3
+    assert db.get(Transaction, "t2").amount == 20
+    assert db.query(TransactionSync).one().watermark == \
+        datetime(2024, 1, 12, 10, 0)
+
+
+def test_sync_transactions_drops_the_cached_columns(db):
+    """Test the sync drops the cached columns of the link only."""
+    local_columns.set("link_1", "columns")
+    local_columns.set("link_2", "columns")
+
+    asyncio.run(sync_transactions(FakeClient([_transaction("t1")]), db,
+                                  "link_1"))
+
+    assert local_columns.get("link_1") is None
+    assert local_columns.get("link_2") == "columns"
+
+
+def test_sync_transactions_full(db):
+    """Test a full sync requests everything and deletes the missing ones."""
+    asyncio.run(sync_transactions(FakeClient([
+        _transaction("t1", created_at="2024-01-10T10:00:00Z"),
+        _transaction("t2", created_at="2024-01-11T10:00:00Z"),
+    ]), db, "link_1"))
+
+    # t1 was recategorized and t2 was deleted in Belvo
+    client = FakeClient([
+        _transaction("t1", category="Travel",
+                     created_at="2024-01-10T10:00:00Z"),
+    ])
+    result = asyncio.run(
+        sync_transactions(client, db, "link_1", full=True)
+    )
+
+    assert "created_at__gte" not in client.Transactions.calls[0]
+    assert result == {
+        "link": "link_1", "account": None, "synced": 1, "removed": 1,
+        "watermark": "2024-01-10T10:00:00",
+    }
+    assert [t.id for t in db.query(Transaction)] == ["t1"]
+    assert db.get(Transaction, "t1").category == "Travel"
+    assert [(row.category, row.count) for row in db.query(MonthlyRollup)] \
+        == [("Travel", 1)]
+
+
+def test_sync_transactions_full_repairs_the_rollups(db):
+    """Test a full sync computes again the rollups that drifted."""
+    client = FakeClient([_transaction("t1"), _transaction("t2", amount=5)])
+    asyncio.run(sync_transactions(client, db, "link_1"))
+    db.query(MonthlyRollup).update({"total": 0, "count": 7})
+    db.commit()
+
+    asyncio.run(sync_transactions(client, db, "link_1", full=True))
+
+    assert [(row.total, row.count) for row in db.query(MonthlyRollup)] == \
+        [(15, 2)]
+
+
+def test_sync_transactions_in_batches(db, monkeypatch):
+    """Test the transactions are stored in batches."""
+    monkeypatch.setattr("src.services.transactions.BATCH_SIZE", 2)
+    client = FakeClient([_transaction(f"t{number}") for number in range(5)])
+
+    result = asyncio.run(sync_transactions(client, db, "link_1", "acc_1"))
+
+    assert result["synced"] == 5
+    assert client.Transactions.calls[0]["account"] == "acc_1"
+    assert db.query(Transaction).count() == 5
+
+
+def test_sync_transactions_rollback_on_error(db):
+    """Test nothing is stored and the watermark stays if the sync fails."""
+    client = FakeClient(
+        [_transaction("t1")], error=RequestError(500, "Belvo is down")
+    )
+
+    with pytest.raises(RequestError):
+        asyncio.run(sync_transactions(client, db, "link_1"))
+
+    assert db.query(Transaction).count() == 0
+    assert db.query(TransactionSync).count() == 0
+
+
+def test_local_page_and_cursor(db):
+    """Test the pages of the stored transactions, the newest first."""
+    client = FakeClient([
+        _transaction("t1", value_date="2024-01-01"),
+        _transaction("t2", value_date="2024-01-03"),
+        _transaction("t3", value_date="2024-01-02"),
+        _transaction("t4", value_date="2024-01-04", account={"id": "acc_2"}),
+    ])
+    asyncio.run(sync_transactions(client, db, "link_1"))
+
+    first = local_page(db, page_size=2, link="link_1", account="acc_1")
+    last = local_page(db, cursor=first["next"])
+
+    assert first["count"] == 3
+    assert [row["id"] for row in first["results"]] == ["t2", "t3"]
+    assert [row["id"] for row in last["results"]] == ["t1"]
+    assert last["next"] is None
+
+
+def test_local_page_cursor_keeps_the_dates(db):
+    """Test the cursor of a page keeps the filters of dates."""
+    client = FakeClient([
+        _transaction(f"t{day}", value_date=f"2024-01-0{day}")
+        for day in range(1, 6)
+    ])
+    asyncio.run(sync_transactions(client, db, "link_1"))
+
+    first = local_page(
+        db, page_size=1, type="OUTFLOW",
+        date_from=date(2024, 1, 2), date_to=date(2024, 1, 3)
+    )
+    last = local_page(db, cursor=first["next"])
+
+    assert first["count"] == 2
+    assert [row["id"] for row in last["results"]] == ["t2"]
+    assert last["next"] is None
+
+
+def test_iter_local_transactions(db):
+    """Test the stored transactions can be aggregated."""
+    client = FakeClient([
+        _transaction("t1", amount=5, type="INFLOW"),
+        _transaction("t2", amount=7, value_date=None),
+    ])
+    asyncio.run(sync_transactions(client, db, "link_1"))
+
+    rows = list(iter_local_transactions(db, link="link_1", type="INFLOW"))
+
+    assert rows == [{
+        "category": "Food", "merchant": "Oxxo", "account": "acc_1",
+        "type": "INFLOW", "amount": 5.0, "currency": "MXN",
+        "value_date": "2024-01-09",
+    }]
+    assert list(iter_local_transactions(db, type="OUTFLOW"))[0][
+        "value_date"] is None
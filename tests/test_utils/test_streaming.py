@@ -0,0 +1,93 @@
+"""Tests for the `streaming` Module of the Utils Package."""
+
+import asyncio
+import json
+
+import pytest
+from src.belvo.exceptions import RequestError
+from src.utils.streaming import stream_items
+
+
+async def _items(*values, error=None):
+    """Async generator of the values, optionally fail at the end."""
+    for value in values:
+        yield value
+    if error:
+        raise error
+
+
+async def _read_body(response):
+    """Read all the chunks of the StreamingResponse."""
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+def _stream(items, stream_format="json"):
+    """Create the StreamingResponse and read the body."""
+    async def run():
+        response = await stream_items(
+            items, "accounts", "Belvo Accounts", stream_format
+        )
+        return response, await _read_body(response)
+
+    return asyncio.run(run())
+
+
+def test_stream_items_json_envelope():
+    """Test the JSON stream is the same document as SuccessResponse."""
+    response, body = _stream(_items({"id": "1"}, {"id": "2"}))
+
+    assert response.media_type == "application/json"
+    assert json.loads(body) == {
+        "success": True,
+        "data": {"accounts": [{"id": "1"}, {"id": "2"}]},
+        "message": "Belvo Accounts",
+    }
+
+
+def test_stream_items_json_empty_list():
+    """Test the JSON stream with no items."""
+    _, body = _stream(_items())
+
+    assert json.loads(body)["data"] == {"accounts": []}
+
+
+def test_stream_items_ndjson_lines():
+    """Test the NDJSON stream writes one item per line."""
+    response, body = _stream(_items({"id": "1"}, {"id": "2"}), "ndjson")
+
+    assert response.media_type == "application/x-ndjson"
+    assert [json.loads(line) for line in body.splitlines()] == [
+        {"id": "1"}, {"id": "2"}
+    ]
+
+
+def test_stream_items_raise_errors_before_first_item():
+    """Test the error of the first request is raised before the response."""
+    with pytest.raises(RequestError):
+        _stream(_items(error=RequestError(404, "Not found")))
+
+
+@pytest.mark.parametrize("stream_format", ["json", "ndjson"])
+def test_stream_items_stop_when_fail_in_the_middle(stream_format):
+    """Test the stream ends when an error happens after the first item."""
+    _, body = _stream(
+        _items({"id": "1"}, error=RequestError(500, "Error")), stream_format
+    )
+
+    assert b'{"id": "1"}' in body
+    assert b"message" not in body
+
+
+def test_stream_items_ndjson_error_line_when_fail_in_the_middle():
+    """Test the NDJSON stream ends with an error line if it's interrupted."""
+    _, body = _stream(
+        _items({"id": "1"}, {"id": "2"},
+               error=RequestError(502, {"detail": "Bad gateway"})),
+        "ndjson"
+    )
+
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert lines[:2] == [{"id": "1"}, {"id": "2"}]
+    assert lines[-1] == {
+        "error": {"detail": "Bad gateway"}, "status_code": 502
+    }